@@ -20,7 +20,7 @@ app.autodiscover_tasks()
 app.conf.beat_schedule = {
     'send-reservation-reminders': {
         'task': 'reservations.tasks.send_reservation_reminders',
-        'schedule': crontab(minute='*/30'),  # Every 30 minutes
+        'schedule': crontab(minute='*/15'),  # Every 15 minutes, queues reminders due within the horizon
     },
     'check-low-stock': {
         'task': 'inventory.tasks.check_low_stock_alerts',
@@ -34,6 +34,30 @@ app.conf.beat_schedule = {
         'task': 'reservations.tasks.auto_cancel_expired_reservations',
         'schedule': crontab(hour=0, minute=0),  # Every day at midnight
     },
+    'purge-slot-claims': {
+        'task': 'reservations.tasks.purge_slot_claims',
+        'schedule': crontab(hour=2, minute=30),  # Every day at 2:30 AM
+    },
+    'expire-waitlist': {
+        'task': 'reservations.tasks.expire_waitlist',
+        'schedule': crontab(hour=0, minute=30),  # Every day at 12:30 AM
+    },
+    'reconcile-restaurant-ratings': {
+        'task': 'restaurants.tasks.reconcile_restaurant_ratings',
+        'schedule': crontab(hour=3, minute=0),  # Every day at 3 AM
+    },
+    'dispatch-order-outbox': {
+        'task': 'orders.tasks.dispatch_order_outbox',
+        'schedule': crontab(minute='*'),  # Every minute, catches anything left behind
+    },
+    'archive-old-orders': {
+        'task': 'orders.tasks.archive_old_orders',
+        'schedule': crontab(hour=4, minute=0),  # Every day at 4 AM
+    },
+    'purge-idempotency-records': {
+        'task': 'idempotency.tasks.purge_expired_idempotency_records',
+        'schedule': crontab(minute=0),  # Every hour
+    },
 }
 
 
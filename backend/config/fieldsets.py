@@ -0,0 +1,84 @@
+"""
+Sparse fieldsets (``?fields=``) and expandable relations (``?expand=``).
+
+``DynamicFieldsMixin`` trims a serializer's output to the comma separated
+``?fields=`` list and leaves out nested relations named in
+``Meta.expandable_fields`` unless they are listed in ``?expand=``.
+``SparseFieldsetMixin`` makes the view's queryset follow along: it limits
+the SELECT to the kept columns with ``.only()`` and prefetches expanded
+relations. Both only apply to top-level serializers on read requests, so
+writes and nested or internal serializer use are unaffected.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework.permissions import SAFE_METHODS
+
+FIELDS_PARAM = 'fields'
+EXPAND_PARAM = 'expand'
+
+
+def requested_names(request, param):
+    """Return the set of names in a comma separated query param, or ``None``."""
+    raw = request.query_params.get(param)
+    if raw is None:
+        return None
+    return {name.strip() for name in raw.split(',') if name.strip()}
+
+
+class DynamicFieldsMixin:
+    """Serializer mixin honouring ``?fields=`` and ``?expand=``."""
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if request is None or request.method not in SAFE_METHODS:
+            return fields
+        # Only the serializer the view returns, not nested ones
+        if self.root is not self and self.root is not self.parent:
+            return fields
+
+        expand = requested_names(request, EXPAND_PARAM) or set()
+        for name in getattr(self.Meta, 'expandable_fields', ()):
+            if name not in expand:
+                fields.pop(name, None)
+
+        wanted = requested_names(request, FIELDS_PARAM)
+        if wanted:
+            for name in list(fields):
+                if name not in wanted and name not in expand:
+                    fields.pop(name)
+        return fields
+
+
+class SparseFieldsetMixin:
+    """ViewSet mixin matching the queryset to the requested fieldset."""
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        request = self.request
+        if request.method not in SAFE_METHODS:
+            return queryset
+
+        serializer = self.get_serializer()
+        fields = serializer.fields
+        model = queryset.model
+        expand = requested_names(request, EXPAND_PARAM) or set()
+
+        expandable = getattr(serializer.Meta, 'expandable_fields', ())
+        prefetch = [fields[name].source for name in expandable if name in expand and name in fields]
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+
+        if requested_names(request, FIELDS_PARAM):
+            columns = {model._meta.pk.name}
+            for name, field in fields.items():
+                if name in prefetch or field.source in prefetch:
+                    continue
+                try:
+                    model_field = model._meta.get_field(field.source)
+                except FieldDoesNotExist:
+                    # Computed or dotted sources need the full row
+                    return queryset
+                if model_field.concrete and not model_field.many_to_many:
+                    columns.add(model_field.name)
+            queryset = queryset.only(*columns)
+        return queryset
@@ -0,0 +1,29 @@
+"""
+Cache-backed mutual exclusion for periodic jobs.
+
+Celery beat fires on schedule whether or not the previous run has finished,
+so a slow maintenance job can overlap with itself. ``task_lock`` takes a
+lock in the shared cache (Redis in production) with ``cache.add``; a run
+that cannot get it skips instead of doing the same work twice. The timeout
+frees the lock if a worker dies while holding it.
+"""
+import uuid
+from contextlib import contextmanager
+
+from django.core.cache import cache
+
+KEY = 'task-lock:{name}'
+
+
+@contextmanager
+def task_lock(name, timeout):
+    """Yield ``True`` if the lock ``name`` was acquired, ``False`` if it is held."""
+    key = KEY.format(name=name)
+    token = uuid.uuid4().hex
+    acquired = cache.add(key, token, timeout)
+    try:
+        yield acquired
+    finally:
+        # Never release a lock that expired and was taken by another run
+        if acquired and cache.get(key) == token:
+            cache.delete(key)
@@ -14,6 +14,7 @@ from pathlib import Path
 from datetime import timedelta
 import os
 from decouple import config
+from corsheaders.defaults import default_headers
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -62,6 +63,8 @@ INSTALLED_APPS = [
     'promotions.apps.PromotionsConfig',
     'analytics.apps.AnalyticsConfig',
     'favorites.apps.FavoritesConfig',
+    'search.apps.SearchConfig',
+    'idempotency.apps.IdempotencyConfig',
 ]
 
 MIDDLEWARE = [
@@ -199,6 +202,8 @@ CORS_ALLOWED_ORIGINS = config(
     default='http://localhost:5173,http://127.0.0.1:5173'
 ).split(',')
 CORS_ALLOW_CREDENTIALS = True
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key')
+CORS_EXPOSE_HEADERS = ['Idempotent-Replayed']
 
 # Celery Configuration
 CELERY_BROKER_URL = config('CELERY_BROKER_URL', default='redis://localhost:6379/1')
@@ -229,6 +234,36 @@ else:
         }
     }
 
+# Live order updates (SSE) pub/sub
+# Redis pub/sub when REDIS_ENABLED, otherwise an in-process broker (single node only)
+ORDER_EVENTS_BROKER_URL = config(
+    'ORDER_EVENTS_BROKER_URL',
+    default=CACHES['default']['LOCATION'] if config('REDIS_ENABLED', default=False, cast=bool) else ''
+)
+
+# Per-restaurant order admission control: orders admitted per sliding window,
+# plus how many more are queued (accepted with a later ETA) before rejecting.
+# Off unless set here or per restaurant (Restaurant.order_capacity)
+ORDER_ADMISSION_CAPACITY = config('ORDER_ADMISSION_CAPACITY', default='', cast=lambda value: int(value) if value else None)
+ORDER_ADMISSION_WINDOW = config('ORDER_ADMISSION_WINDOW', default=15 * 60, cast=int)
+ORDER_ADMISSION_QUEUE = config('ORDER_ADMISSION_QUEUE', default=10, cast=int)
+
+# Completed/cancelled orders older than this move to the archive tables (orders/archive.py)
+ORDER_ARCHIVE_AFTER_DAYS = config('ORDER_ARCHIVE_AFTER_DAYS', default=180, cast=int)
+
+# Owner exports: larger exports run as a Celery job; stored files expire after EXPORT_TTL
+EXPORT_SYNC_MAX_ROWS = config('EXPORT_SYNC_MAX_ROWS', default=50000, cast=int)
+EXPORT_TTL = config('EXPORT_TTL', default=24 * 60 * 60, cast=int)
+
+# Reservations: how long a booking holds its table and how many tables a party may be seated at
+RESERVATION_DURATION_MINUTES = config('RESERVATION_DURATION_MINUTES', default=60, cast=int)
+RESERVATION_MAX_COMBINED_TABLES = config('RESERVATION_MAX_COMBINED_TABLES', default=3, cast=int)
+RESERVATION_GRID_CACHE_TIMEOUT = config('RESERVATION_GRID_CACHE_TIMEOUT', default=24 * 60 * 60, cast=int)
+# Reminders go out this long before a confirmed reservation; ones due within the
+# horizon are queued with a Celery eta (keep it below the broker visibility timeout)
+RESERVATION_REMINDER_LEAD_MINUTES = config('RESERVATION_REMINDER_LEAD_MINUTES', default=60, cast=int)
+RESERVATION_REMINDER_HORIZON_MINUTES = config('RESERVATION_REMINDER_HORIZON_MINUTES', default=45, cast=int)
+
 # Email Configuration
 EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.console.EmailBackend')
 EMAIL_HOST = config('EMAIL_HOST', default='smtp.gmail.com')
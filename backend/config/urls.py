@@ -45,6 +45,7 @@ urlpatterns = [
     path('api/promotions/', include('promotions.urls')),
     path('api/analytics/', include('analytics.urls')),
     path('api/favorites/', include('favorites.urls')),
+    path('api/search/', include('search.urls')),
     
     # JWT Authentication
     path('api/auth/', include('djoser.urls')),
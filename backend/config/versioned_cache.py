@@ -0,0 +1,64 @@
+"""
+Versioned cache entries.
+
+A cached value (a restaurant page bundle, a menu tree, a reservation grid)
+is stored under a key that includes a version. The version is kept in the
+cache per owning object and replaced on every write, once the write
+commits, so stale values are never served and simply expire. Callers pass
+a key ``prefix`` naming the kind of value and the id of the owning object.
+For rendered JSON blobs the version doubles as the ETag, so unchanged
+resources are answered with 304 without touching the blob.
+"""
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseNotModified
+
+VERSION_KEY = '{prefix}-version:{key}'
+BLOB_KEY = '{prefix}:{key}:{version}'
+
+
+def get_version(prefix, key):
+    """Return the current version of ``key``, minting one if none is cached."""
+    version_key = VERSION_KEY.format(prefix=prefix, key=key)
+    version = cache.get(version_key)
+    if version is None:
+        version = uuid.uuid4().hex
+        if not cache.add(version_key, version, None):
+            version = cache.get(version_key, version)
+    return version
+
+
+def bump_version(prefix, key):
+    """Invalidate everything cached under the current version of ``key`` once the write commits."""
+    version_key = VERSION_KEY.format(prefix=prefix, key=key)
+    transaction.on_commit(lambda: cache.set(version_key, uuid.uuid4().hex, None))
+
+
+def etag_for(prefix, key, version):
+    return f'"{prefix}-{key}-{version}"'
+
+
+def get_blob(prefix, key, version, render, timeout):
+    """Return the blob cached for ``version``, calling ``render()`` on a miss."""
+    blob_key = BLOB_KEY.format(prefix=prefix, key=key, version=version)
+    content = cache.get(blob_key)
+    if content is None:
+        content = render()
+        cache.set(blob_key, content, timeout)
+    return content
+
+
+def json_response(request, prefix, key, render, timeout):
+    """Serve the cached JSON blob of ``key``, or 304 if the client's ETag is current."""
+    version = get_version(prefix, key)
+    etag = etag_for(prefix, key, version)
+
+    if etag in request.headers.get('If-None-Match', ''):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(get_blob(prefix, key, version, render, timeout), content_type='application/json')
+    response['ETag'] = etag
+    response['Cache-Control'] = 'no-cache'
+    return response
@@ -0,0 +1,9 @@
+from django.contrib import admin
+from .models import IdempotencyRecord
+
+
+@admin.register(IdempotencyRecord)
+class IdempotencyRecordAdmin(admin.ModelAdmin):
+    list_display = ('key', 'scope', 'status_code', 'created_at', 'expires_at')
+    search_fields = ('key', 'scope')
+    readonly_fields = ('created_at',)
@@ -0,0 +1,141 @@
+"""
+``Idempotency-Key`` support for create endpoints.
+
+The first request with a key claims it by inserting an ``IdempotencyRecord``;
+the unique ``(scope, key)`` constraint makes the claim atomic across
+workers. When the view finishes, its response is stored on the record and
+replayed for every later request with the same key until the TTL expires.
+A request arriving while the first one is still running waits briefly for
+its response instead of running the view again. Reusing a key for a
+different request body is rejected, and a failed (5xx or raised) or
+throttled (429) request releases its key so the client can retry.
+
+A claim is a lease: an unfinished record whose ``locked_until`` has passed
+(``IDEMPOTENCY_LOCK_TIMEOUT``) belongs to a worker that was killed mid
+request, and the next request with the key takes it over instead of
+getting 409 until the TTL runs out.
+"""
+import hashlib
+import json
+import time
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import IdempotencyRecord
+
+HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+POLL_INTERVAL = 0.1
+
+
+def _ttl():
+    return timedelta(seconds=getattr(settings, 'IDEMPOTENCY_KEY_TTL', 24 * 60 * 60))
+
+
+def _lock_timeout():
+    return timedelta(seconds=getattr(settings, 'IDEMPOTENCY_LOCK_TIMEOUT', 60))
+
+
+def _wait_timeout():
+    return getattr(settings, 'IDEMPOTENCY_WAIT_TIMEOUT', 5)
+
+
+def fingerprint(request):
+    payload = json.dumps(request.data, sort_keys=True, cls=DjangoJSONEncoder, default=str)
+    return hashlib.sha256(f'{request.method} {request.path}\n{payload}'.encode()).hexdigest()
+
+
+def claim(scope, key, request_fingerprint):
+    """
+    Claim ``key`` or wait for the request holding it.
+
+    Returns ``(record, claimed)``; ``claimed`` is false when the record
+    belongs to an earlier request, which may still be running if the wait
+    timed out.
+    """
+    deadline = time.monotonic() + _wait_timeout()
+    while True:
+        now = timezone.now()
+        IdempotencyRecord.objects.filter(scope=scope, key=key, expires_at__lte=now).delete()
+        # Take over the key of a request whose worker died
+        IdempotencyRecord.objects.filter(
+            scope=scope, key=key, status_code__isnull=True, locked_until__lte=now,
+        ).delete()
+        try:
+            with transaction.atomic():
+                record = IdempotencyRecord.objects.create(
+                    scope=scope,
+                    key=key,
+                    fingerprint=request_fingerprint,
+                    locked_until=now + _lock_timeout(),
+                    expires_at=now + _ttl(),
+                )
+            return record, True
+        except IntegrityError:
+            pass
+
+        record = IdempotencyRecord.objects.filter(scope=scope, key=key).first()
+        if record is not None and (record.is_complete or time.monotonic() >= deadline):
+            return record, False
+        time.sleep(POLL_INTERVAL)
+
+
+def replay(record, request_fingerprint):
+    if record.fingerprint != request_fingerprint:
+        return Response(
+            {'error': f'{HEADER} was already used for a different request'},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+    if not record.is_complete:
+        return Response(
+            {'error': f'A request with this {HEADER} is still being processed'},
+            status=status.HTTP_409_CONFLICT,
+            headers={'Retry-After': '1'}
+        )
+    return Response(record.response_body, status=record.status_code, headers={REPLAYED_HEADER: 'true'})
+
+
+def idempotent(view_method):
+    """Make a viewset action honour the ``Idempotency-Key`` request header."""
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return view_method(self, request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return Response(
+                {'error': f'{HEADER} must be at most {MAX_KEY_LENGTH} characters'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        scope = f'{self.basename}.{self.action}:{request.user.pk or "anonymous"}'
+        request_fingerprint = fingerprint(request)
+        record, claimed = claim(scope, key, request_fingerprint)
+        if not claimed:
+            return replay(record, request_fingerprint)
+
+        # By pk: a request that outlived its lease may have lost the key,
+        # and must not touch the record of the one that took it over
+        claimed_record = IdempotencyRecord.objects.filter(pk=record.pk)
+        try:
+            response = view_method(self, request, *args, **kwargs)
+        except Exception:
+            claimed_record.delete()
+            raise
+
+        if response.status_code >= 500 or response.status_code == status.HTTP_429_TOO_MANY_REQUESTS:
+            claimed_record.delete()
+        else:
+            claimed_record.update(
+                status_code=response.status_code, response_body=response.data, locked_until=None,
+            )
+        return response
+    return wrapper
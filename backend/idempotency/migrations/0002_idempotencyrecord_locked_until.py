@@ -0,0 +1,30 @@
+# Generated by Django 5.1.14 on 2026-10-18 05:48
+
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def lease_unfinished(apps, schema_editor):
+    IdempotencyRecord = apps.get_model('idempotency', 'IdempotencyRecord')
+    # Requests cut off by the deploy itself would otherwise hold their key until the TTL
+    IdempotencyRecord.objects.filter(status_code__isnull=True).update(
+        locked_until=F('created_at') + timedelta(seconds=60),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('idempotency', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='idempotencyrecord',
+            name='locked_until',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='locked until'),
+        ),
+        migrations.RunPython(lease_unfinished, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class IdempotencyRecord(models.Model):
+    """A claimed Idempotency-Key and, once the request finished, its response."""
+    
+    scope = models.CharField(_('scope'), max_length=150)
+    key = models.CharField(_('key'), max_length=255)
+    fingerprint = models.CharField(_('request fingerprint'), max_length=64)
+    status_code = models.PositiveSmallIntegerField(_('status code'), blank=True, null=True)
+    response_body = models.JSONField(_('response body'), encoder=DjangoJSONEncoder, blank=True, null=True)
+    created_at = models.DateTimeField(_('created at'), auto_now_add=True)
+    # An unfinished record past this belongs to a request that died
+    locked_until = models.DateTimeField(_('locked until'), blank=True, null=True)
+    expires_at = models.DateTimeField(_('expires at'), db_index=True)
+    
+    class Meta:
+        verbose_name = _('idempotency record')
+        verbose_name_plural = _('idempotency records')
+        db_table = 'idempotency_records'
+        constraints = [
+            models.UniqueConstraint(fields=['scope', 'key'], name='idempotency_scope_key_uniq'),
+        ]
+    
+    def __str__(self):
+        return f'{self.scope} {self.key}'
+    
+    @property
+    def is_complete(self):
+        return self.status_code is not None
@@ -0,0 +1,11 @@
+from celery import shared_task
+from django.utils import timezone
+
+
+@shared_task
+def purge_expired_idempotency_records():
+    """Delete idempotency records past their TTL"""
+    from idempotency.models import IdempotencyRecord
+    
+    deleted, _ = IdempotencyRecord.objects.filter(expires_at__lte=timezone.now()).delete()
+    return deleted
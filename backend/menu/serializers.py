@@ -1,16 +1,34 @@
 from rest_framework import serializers
+from config.fieldsets import DynamicFieldsMixin
 from .models import MenuCategory, MenuItem
 
 
-class MenuCategorySerializer(serializers.ModelSerializer):
+class MenuCategorySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = MenuCategory
         fields = '__all__'
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
-class MenuItemSerializer(serializers.ModelSerializer):
+class MenuItemSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = MenuItem
         fields = '__all__'
         read_only_fields = ['id', 'created_at', 'updated_at', 'order_count']
+
+
+class MenuTreeItemSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = MenuItem
+        fields = [
+            'id', 'name', 'description', 'price', 'image', 'calories',
+            'allergens', 'dietary_tags', 'is_featured', 'preparation_time',
+        ]
+
+
+class MenuTreeCategorySerializer(serializers.ModelSerializer):
+    items = MenuTreeItemSerializer(source='tree_items', many=True, read_only=True)
+    
+    class Meta:
+        model = MenuCategory
+        fields = ['id', 'name', 'description', 'order', 'items']
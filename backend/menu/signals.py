@@ -0,0 +1,16 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import MenuCategory, MenuItem
+from .tree import bump_version
+
+
+@receiver([post_save, post_delete], sender=MenuCategory)
+def menu_category_tree_handler(sender, instance, **kwargs):
+    """Invalidate the cached menu tree when a category changes"""
+    bump_version(instance.restaurant_id)
+
+
+@receiver([post_save, post_delete], sender=MenuItem)
+def menu_item_tree_handler(sender, instance, **kwargs):
+    """Invalidate the cached menu tree when a menu item changes"""
+    bump_version(instance.category.restaurant_id)
@@ -0,0 +1,53 @@
+"""
+Precompiled restaurant menu tree.
+
+The tree is a restaurant's active categories in menu order, each with its
+available, non-deleted items, rendered to JSON once and cached under a
+per-restaurant menu version. Any write to a category or item bumps the
+version, and the version doubles as the ETag.
+"""
+from django.conf import settings
+from django.db.models import Prefetch
+from rest_framework.renderers import JSONRenderer
+
+from config import versioned_cache
+from .models import MenuCategory, MenuItem
+from .serializers import MenuTreeCategorySerializer
+
+CACHE_PREFIX = 'menu-tree'
+
+
+def _timeout():
+    return getattr(settings, 'MENU_TREE_CACHE_TIMEOUT', 24 * 60 * 60)
+
+
+def bump_version(restaurant_id):
+    """Invalidate the cached menu tree of a restaurant once the write commits."""
+    versioned_cache.bump_version(CACHE_PREFIX, restaurant_id)
+
+
+def render_tree(restaurant_id):
+    """Load and serialize the menu tree of a restaurant in two queries."""
+    categories = (
+        MenuCategory.objects
+        .filter(restaurant_id=restaurant_id, is_active=True)
+        .order_by('order', 'name', 'id')
+        .prefetch_related(
+            Prefetch(
+                'items',
+                queryset=MenuItem.objects.filter(is_available=True, is_deleted=False).order_by('name', 'id'),
+                to_attr='tree_items',
+            )
+        )
+    )
+    return JSONRenderer().render({
+        'restaurant': restaurant_id,
+        'categories': MenuTreeCategorySerializer(categories, many=True).data,
+    })
+
+
+def tree_response(request, restaurant_id):
+    """The rendered menu tree, built on a cache miss, or 304 for a current ETag."""
+    return versioned_cache.json_response(
+        request, CACHE_PREFIX, restaurant_id, lambda: render_tree(restaurant_id), _timeout(),
+    )
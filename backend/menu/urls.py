@@ -1,10 +1,11 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import MenuCategoryViewSet, MenuItemViewSet
+from .views import MenuCategoryViewSet, MenuItemViewSet, MenuTreeViewSet
 
 router = DefaultRouter()
 router.register(r'categories', MenuCategoryViewSet, basename='menu-category')
 router.register(r'items', MenuItemViewSet, basename='menu-item')
+router.register(r'restaurants', MenuTreeViewSet, basename='menu-tree')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -1,15 +1,34 @@
 from rest_framework import viewsets, permissions
+from rest_framework.decorators import action
+from rest_framework.generics import get_object_or_404
+from restaurants.models import Restaurant
 from .models import MenuCategory, MenuItem
 from .serializers import MenuCategorySerializer, MenuItemSerializer
+from . import tree
+from config.fieldsets import SparseFieldsetMixin
 
 
-class MenuCategoryViewSet(viewsets.ModelViewSet):
+class MenuCategoryViewSet(SparseFieldsetMixin, viewsets.ModelViewSet):
     queryset = MenuCategory.objects.all()
     serializer_class = MenuCategorySerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
 
-class MenuItemViewSet(viewsets.ModelViewSet):
+class MenuItemViewSet(SparseFieldsetMixin, viewsets.ModelViewSet):
     queryset = MenuItem.objects.all()
     serializer_class = MenuItemSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+
+
+class MenuTreeViewSet(viewsets.ViewSet):
+    permission_classes = [permissions.AllowAny]
+    
+    @action(detail=True, methods=['get'])
+    def tree(self, request, pk=None):
+        """Active categories with their available items, in menu order"""
+        restaurant_id = get_object_or_404(
+            Restaurant.objects.values_list('id', flat=True),
+            pk=pk,
+            is_deleted=False
+        )
+        return tree.tree_response(request, restaurant_id)
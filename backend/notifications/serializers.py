@@ -1,8 +1,9 @@
 from rest_framework import serializers
+from config.fieldsets import DynamicFieldsMixin
 from .models import Notification
 
 
-class NotificationSerializer(serializers.ModelSerializer):
+class NotificationSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Notification
         fields = '__all__'
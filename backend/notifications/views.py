@@ -4,15 +4,19 @@ from rest_framework.response import Response
 from django.utils import timezone
 from .models import Notification
 from .serializers import NotificationSerializer
+from config.pagination import KeysetPagination
+from config.fieldsets import SparseFieldsetMixin
 
 
-class NotificationViewSet(viewsets.ModelViewSet):
+class NotificationViewSet(SparseFieldsetMixin, viewsets.ModelViewSet):
+    queryset = Notification.objects.all()
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
     
     def get_queryset(self):
         """Return notifications for the current user."""
-        return Notification.objects.filter(user=self.request.user)
+        return super().get_queryset().filter(user=self.request.user)
     
     @action(detail=True, methods=['patch'])
     def mark_as_read(self, request, pk=None):
@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Order, OrderItem
+from .models import ArchivedOrder, ArchivedOrderItem, Order, OrderItem, OrderStatusEvent
+from .transitions import transition_many
 
 
 class OrderItemInline(admin.TabularInline):
@@ -9,15 +10,25 @@ class OrderItemInline(admin.TabularInline):
     can_delete = False
 
 
+class OrderStatusEventInline(admin.TabularInline):
+    model = OrderStatusEvent
+    extra = 0
+    readonly_fields = ('from_status', 'to_status', 'source', 'actor', 'created_at')
+    can_delete = False
+    
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
     list_display = ('order_number', 'user', 'restaurant', 'order_type', 'status', 'total', 'created_at')
     list_filter = ('status', 'order_type', 'created_at')
     search_fields = ('order_number', 'user__email', 'restaurant__name')
     ordering = ('-created_at',)
-    inlines = [OrderItemInline]
+    inlines = [OrderItemInline, OrderStatusEventInline]
     raw_id_fields = ('user', 'restaurant')
-    readonly_fields = ('order_number', 'created_at', 'updated_at', 'subtotal', 'tax', 'delivery_fee', 'discount', 'total')
+    readonly_fields = ('order_number', 'status', 'created_at', 'updated_at', 'subtotal', 'tax', 'delivery_fee', 'discount', 'total')
     
     fieldsets = (
         ('Order Info', {
@@ -38,27 +49,71 @@ class OrderAdmin(admin.ModelAdmin):
     
     actions = ['mark_as_confirmed', 'mark_as_preparing', 'mark_as_ready', 'mark_as_delivered', 'mark_as_cancelled']
     
+    def _mark(self, request, queryset, to_status, label):
+        moved = transition_many(queryset, to_status, actor=request.user)
+        skipped = queryset.count() - moved
+        message = f'{moved} order(s) marked as {label}.'
+        if skipped:
+            message += f' {skipped} skipped: their status does not allow it.'
+        self.message_user(request, message)
+    
     def mark_as_confirmed(self, request, queryset):
-        updated = queryset.update(status='CONFIRMED')
-        self.message_user(request, f'{updated} order(s) marked as confirmed.')
+        self._mark(request, queryset, Order.Status.CONFIRMED, 'confirmed')
     mark_as_confirmed.short_description = "Mark as Confirmed"
     
     def mark_as_preparing(self, request, queryset):
-        updated = queryset.update(status='PREPARING')
-        self.message_user(request, f'{updated} order(s) marked as preparing.')
+        self._mark(request, queryset, Order.Status.PREPARING, 'preparing')
     mark_as_preparing.short_description = "Mark as Preparing"
     
     def mark_as_ready(self, request, queryset):
-        updated = queryset.update(status='READY')
-        self.message_user(request, f'{updated} order(s) marked as ready.')
+        self._mark(request, queryset, Order.Status.READY, 'ready')
     mark_as_ready.short_description = "Mark as Ready"
     
     def mark_as_delivered(self, request, queryset):
-        updated = queryset.update(status='DELIVERED')
-        self.message_user(request, f'{updated} order(s) marked as delivered.')
+        self._mark(request, queryset, Order.Status.DELIVERED, 'delivered')
     mark_as_delivered.short_description = "Mark as Delivered"
     
     def mark_as_cancelled(self, request, queryset):
-        updated = queryset.update(status='CANCELLED')
-        self.message_user(request, f'{updated} order(s) marked as cancelled.')
+        self._mark(request, queryset, Order.Status.CANCELLED, 'cancelled')
     mark_as_cancelled.short_description = "Mark as Cancelled"
+
+
+@admin.register(OrderStatusEvent)
+class OrderStatusEventAdmin(admin.ModelAdmin):
+    list_display = ('order', 'from_status', 'to_status', 'source', 'actor', 'created_at')
+    list_filter = ('to_status', 'source', 'created_at')
+    search_fields = ('order__order_number',)
+    raw_id_fields = ('order', 'actor')
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+class ArchivedOrderItemInline(admin.TabularInline):
+    model = ArchivedOrderItem
+    extra = 0
+    readonly_fields = ('name', 'quantity', 'unit_price', 'subtotal', 'special_instructions')
+    fields = readonly_fields
+    can_delete = False
+    
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ArchivedOrder)
+class ArchivedOrderAdmin(admin.ModelAdmin):
+    list_display = ('order_number', 'user', 'restaurant', 'order_type', 'status', 'total', 'created_at', 'archived_at')
+    list_filter = ('status', 'order_type')
+    search_fields = ('order_number',)
+    ordering = ('-created_at',)
+    inlines = [ArchivedOrderItemInline]
+    raw_id_fields = ('user', 'restaurant')
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,159 @@
+"""
+Per-restaurant admission control for order placement.
+
+Each restaurant has a sliding-window counter of admitted orders in the
+shared cache: one counter per ``ORDER_ADMISSION_WINDOW`` seconds, with the
+load taken as the current window's count plus the previous window's count
+weighted by how much of it still overlaps the sliding window. Up to the
+restaurant's capacity (``Restaurant.order_capacity`` or
+``ORDER_ADMISSION_CAPACITY``) orders are admitted; the next
+``ORDER_ADMISSION_QUEUE`` orders are queued, i.e. accepted with their ETA
+pushed back until the window has room; anything beyond is rejected with
+``Retry-After`` before it touches the database.
+
+The counter is of orders admitted per window, not of orders still open:
+an order is not given back when it completes or is cancelled, only when
+it fails to be placed. Capacity is thus an intake rate the kitchen can
+work off, and the count needs no decrement on every terminal transition
+(the set-based auto-complete and the archive mover included); a lost
+update can only skew it until the window rolls over.
+"""
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+
+KEY = 'order-admission:{restaurant_id}:{bucket}'
+
+ACCEPTING = 'ACCEPTING'
+QUEUEING = 'QUEUEING'
+FULL = 'FULL'
+
+ADMITTED = 'ADMITTED'
+QUEUED = 'QUEUED'
+
+
+class AdmissionRejected(Exception):
+    """The restaurant is over capacity; retry after ``retry_after`` seconds."""
+
+    def __init__(self, load, retry_after):
+        self.load = load
+        self.retry_after = retry_after
+        super().__init__('This restaurant is not accepting more orders right now')
+
+
+@dataclass
+class Ticket:
+    restaurant_id: int
+    key: str
+    status: str
+    delay: timedelta
+    load: dict
+
+
+def window():
+    return getattr(settings, 'ORDER_ADMISSION_WINDOW', 15 * 60)
+
+
+def capacity_for(restaurant):
+    """Orders per window, or ``None`` if admission control is off."""
+    if restaurant.order_capacity is not None:
+        return restaurant.order_capacity
+    return getattr(settings, 'ORDER_ADMISSION_CAPACITY', None)
+
+
+def queue_size():
+    return getattr(settings, 'ORDER_ADMISSION_QUEUE', 10)
+
+
+def _buckets(now):
+    size = window()
+    bucket = int(now // size)
+    # Share of the previous window that still overlaps the sliding window
+    overlap = 1 - (now % size) / size
+    return bucket, overlap
+
+
+def _key(restaurant_id, bucket):
+    return KEY.format(restaurant_id=restaurant_id, bucket=bucket)
+
+
+def _describe(count, capacity):
+    count = round(count)
+    if capacity is None:
+        state = ACCEPTING
+    elif count < capacity:
+        state = ACCEPTING
+    elif count < capacity + queue_size():
+        state = QUEUEING
+    else:
+        state = FULL
+    return {'orders': count, 'capacity': capacity, 'state': state}
+
+
+def loads(restaurants, now=None):
+    """Current load of each restaurant by id, in one cache round trip."""
+    now = time.time() if now is None else now
+    bucket, overlap = _buckets(now)
+    keys = {}
+    for restaurant in restaurants:
+        keys[restaurant.id] = (_key(restaurant.id, bucket), _key(restaurant.id, bucket - 1))
+    counts = cache.get_many([key for pair in keys.values() for key in pair])
+    return {
+        restaurant.id: _describe(
+            counts.get(keys[restaurant.id][0], 0) + counts.get(keys[restaurant.id][1], 0) * overlap,
+            capacity_for(restaurant),
+        )
+        for restaurant in restaurants
+    }
+
+
+def load(restaurant):
+    return loads([restaurant])[restaurant.id]
+
+
+def admit(restaurant, now=None):
+    """
+    Count an order against ``restaurant`` and return its ``Ticket``.
+
+    Raises ``AdmissionRejected`` once the restaurant is past capacity and its
+    queue is full; a rejected order is not counted.
+    """
+    now = time.time() if now is None else now
+    size = window()
+    bucket, overlap = _buckets(now)
+    key = _key(restaurant.id, bucket)
+    cache.add(key, 0, 2 * size)
+    try:
+        count = cache.incr(key)
+    except ValueError:
+        # Expired between add() and incr()
+        cache.add(key, 1, 2 * size)
+        count = 1
+    current = count + (cache.get(_key(restaurant.id, bucket - 1)) or 0) * overlap
+    capacity = capacity_for(restaurant)
+
+    if capacity is None or current <= capacity:
+        return Ticket(restaurant.id, key, ADMITTED, timedelta(), _describe(current, capacity))
+
+    # The excess drains at roughly ``capacity`` orders per window
+    delay = timedelta(seconds=size * (current - capacity) / max(capacity, 1))
+    if current <= capacity + queue_size():
+        return Ticket(restaurant.id, key, QUEUED, delay, _describe(current, capacity))
+
+    _decrement(key)
+    raise AdmissionRejected(_describe(current - 1, capacity), int(delay.total_seconds()) + 1)
+
+
+def _decrement(key):
+    try:
+        cache.decr(key)
+    except ValueError:
+        pass
+
+
+def release(ticket):
+    """Give back the slot of an order that was not placed after all."""
+    _decrement(ticket.key)
@@ -0,0 +1,160 @@
+"""
+Hot/cold split of orders.
+
+Completed and cancelled orders older than ``ORDER_ARCHIVE_AFTER_DAYS`` are
+moved from ``orders``/``order_items`` to ``orders_archive``/
+``order_items_archive``, with their status events folded into
+``ArchivedOrder.status_history``. The live tables, and every index on them,
+then only hold the working set that owner lists, the kitchen queue and the
+admin scan.
+
+The mover works in id-ordered chunks, each copied and deleted in its own
+transaction, so an interrupted run leaves every order either live or
+archived and the next run carries on with whatever is left. ``find`` and
+``history`` read both sides, so order lookups and history keep working.
+Payments move along: the same transaction re-points them from the order
+to its archived copy (``Payment.archived_order``).
+"""
+import heapq
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from payments.models import Payment
+
+from .models import ArchivedOrder, ArchivedOrderItem, Order, OrderItem, OrderStatusEvent
+
+TERMINAL_STATUSES = [Order.Status.COMPLETED, Order.Status.CANCELLED]
+CHUNK_SIZE = 1000
+
+ORDER_FIELDS = (
+    'id', 'user_id', 'restaurant_id', 'order_number', 'order_type', 'status',
+    'subtotal', 'tax', 'delivery_fee', 'discount', 'total',
+    'delivery_address', 'delivery_instructions', 'estimated_delivery_time', 'actual_delivery_time',
+    'created_at', 'updated_at',
+)
+
+
+def archive_after():
+    return timedelta(days=getattr(settings, 'ORDER_ARCHIVE_AFTER_DAYS', 180))
+
+
+def candidates(cutoff):
+    return Order.objects.filter(status__in=TERMINAL_STATUSES, created_at__lt=cutoff)
+
+
+def _status_history(order_ids):
+    history = defaultdict(list)
+    events = (
+        OrderStatusEvent.objects
+        .filter(order_id__in=order_ids)
+        .order_by('created_at', 'id')
+        .values('order_id', 'from_status', 'to_status', 'source', 'actor_id', 'created_at')
+    )
+    for event in events:
+        history[event['order_id']].append({
+            'from_status': event['from_status'],
+            'to_status': event['to_status'],
+            'source': event['source'],
+            'actor_id': event['actor_id'],
+            'at': event['created_at'].isoformat(),
+        })
+    return history
+
+
+def archive_chunk(cutoff, chunk_size=CHUNK_SIZE):
+    """Move up to ``chunk_size`` orders to the archive; returns how many moved."""
+    with transaction.atomic():
+        orders = list(
+            candidates(cutoff)
+            .select_for_update(skip_locked=True, of=('self',))
+            .order_by('id')
+            .only(*ORDER_FIELDS)[:chunk_size]
+        )
+        if not orders:
+            return 0
+        ids = [order.id for order in orders]
+        history = _status_history(ids)
+        items = OrderItem.objects.filter(order_id__in=ids).select_related('menu_item').only(
+            'id', 'order_id', 'menu_item_id', 'menu_item__name', 'quantity', 'unit_price', 'subtotal',
+            'special_instructions', 'modifiers',
+        )
+
+        ArchivedOrder.objects.bulk_create(
+            ArchivedOrder(
+                status_history=history.get(order.id, []),
+                **{field: getattr(order, field) for field in ORDER_FIELDS},
+            )
+            for order in orders
+        )
+        ArchivedOrderItem.objects.bulk_create(
+            ArchivedOrderItem(
+                id=item.id,
+                order_id=item.order_id,
+                menu_item_id=item.menu_item_id,
+                name=item.menu_item.name,
+                quantity=item.quantity,
+                unit_price=item.unit_price,
+                subtotal=item.subtotal,
+                special_instructions=item.special_instructions,
+                modifiers=item.modifiers,
+            )
+            for item in items
+        )
+
+        Payment.objects.filter(order_id__in=ids).update(archived_order_id=F('order_id'), order=None)
+        # Cascades to the items, status events and outbox rows
+        Order.objects.filter(id__in=ids).delete()
+    return len(ids)
+
+
+def archive_orders(cutoff=None, chunk_size=CHUNK_SIZE, max_chunks=None):
+    """Archive every eligible order, chunk by chunk; returns how many moved."""
+    cutoff = cutoff or timezone.now() - archive_after()
+    moved = 0
+    chunks = 0
+    while max_chunks is None or chunks < max_chunks:
+        count = archive_chunk(cutoff, chunk_size)
+        if not count:
+            break
+        moved += count
+        chunks += 1
+    return moved
+
+
+def find(order_id):
+    """The archived order with ``order_id`` and its items, or ``None``."""
+    return (
+        ArchivedOrder.objects
+        .select_related('restaurant')
+        .prefetch_related('items')
+        .filter(pk=order_id)
+        .first()
+    )
+
+
+def history(limit, before=None, live=True, **filters):
+    """
+    Up to ``limit`` live and archived orders matching ``filters``, newest
+    first, as ``(archived, order)`` pairs.
+
+    ``before`` is the ``(created_at, id)`` of the last order already seen;
+    both sides are read with the same keyset and merged, one query each
+    (plus one for each side's items). ``live=False`` reads the archive only.
+    """
+    models = ((False, Order), (True, ArchivedOrder)) if live else ((True, ArchivedOrder),)
+    sides = []
+    for archived, model in models:
+        queryset = model.objects.filter(**filters)
+        if before is not None:
+            created_at, order_id = before
+            queryset = queryset.filter(created_at__lte=created_at).exclude(created_at=created_at, id__gte=order_id)
+        orders = list(queryset.order_by('-created_at', '-id').prefetch_related('items')[:limit])
+        sides.append([(archived, order) for order in orders])
+
+    merged = heapq.merge(*sides, key=lambda entry: (entry[1].created_at, entry[1].id), reverse=True)
+    return list(merged)[:limit]
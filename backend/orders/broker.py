@@ -0,0 +1,138 @@
+"""
+Pub/sub fan-out for live order updates.
+
+State changes publish a small JSON message on the order's channel once they
+commit; the SSE stream subscribes to that channel. With
+``ORDER_EVENTS_BROKER_URL`` set, Redis pub/sub carries the messages between
+processes. Without it an in-process broker is used, which only reaches
+streams served by the same process (single node, tests).
+"""
+import asyncio
+import json
+import logging
+import threading
+from contextlib import asynccontextmanager
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'orders:{order_id}'
+
+
+class InProcessSubscription:
+    def __init__(self, queue):
+        self.queue = queue
+
+    async def get(self, timeout):
+        """Return the next message, or ``None`` after ``timeout`` seconds."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class InProcessBroker:
+    def __init__(self):
+        self._subscribers = {}
+        self._lock = threading.Lock()
+
+    def publish(self, channel, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(queue.put_nowait, message)
+
+    @asynccontextmanager
+    async def subscribe(self, channel):
+        entry = (asyncio.get_running_loop(), asyncio.Queue())
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(entry)
+        try:
+            yield InProcessSubscription(entry[1])
+        finally:
+            with self._lock:
+                subscribers = self._subscribers.get(channel, set())
+                subscribers.discard(entry)
+                if not subscribers:
+                    self._subscribers.pop(channel, None)
+
+
+class RedisSubscription:
+    def __init__(self, pubsub):
+        self.pubsub = pubsub
+
+    async def get(self, timeout):
+        """Return the next message, or ``None`` after ``timeout`` seconds."""
+        message = await self.pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+        if message is None:
+            return None
+        data = message['data']
+        return data.decode() if isinstance(data, bytes) else data
+
+
+class RedisBroker:
+    def __init__(self, url):
+        self.url = url
+        self._client = None
+
+    def publish(self, channel, message):
+        import redis
+
+        if self._client is None:
+            self._client = redis.Redis.from_url(self.url)
+        self._client.publish(channel, message)
+
+    @asynccontextmanager
+    async def subscribe(self, channel):
+        import redis.asyncio
+
+        client = redis.asyncio.Redis.from_url(self.url)
+        pubsub = client.pubsub()
+        await pubsub.subscribe(channel)
+        try:
+            yield RedisSubscription(pubsub)
+        finally:
+            await pubsub.unsubscribe(channel)
+            await pubsub.aclose()
+            await client.aclose()
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                url = getattr(settings, 'ORDER_EVENTS_BROKER_URL', '')
+                _broker = RedisBroker(url) if url else InProcessBroker()
+    return _broker
+
+
+def channel_for(order_id):
+    return CHANNEL.format(order_id=order_id)
+
+
+def order_message(event, order):
+    """Payload pushed to order subscribers."""
+    return {
+        'event': event,
+        'order_id': order.id,
+        'status': order.status,
+        'estimated_delivery_time': order.estimated_delivery_time,
+        'at': timezone.now(),
+    }
+
+
+def publish_order_event(event, order):
+    """Push ``event`` for ``order``; a broker outage never fails the caller."""
+    message = json.dumps(order_message(event, order), cls=DjangoJSONEncoder)
+    try:
+        get_broker().publish(channel_for(order.id), message)
+    except Exception:
+        logger.exception('Could not publish %s event for order %s', event, order.id)
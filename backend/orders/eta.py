@@ -0,0 +1,166 @@
+"""
+Order ETA prediction.
+
+An estimate is the sum of the stages an order still has ahead of it:
+
+* queue: the restaurant's active kitchen orders ahead of it, times
+  ``ORDER_ETA_QUEUE_MINUTES``;
+* preparation: the slowest item's ``preparation_time`` (dishes are cooked
+  in parallel) plus ``ORDER_ETA_ITEM_MINUTES`` per additional item;
+* delivery: ``ORDER_ETA_TRAVEL_MINUTES`` plus the restaurant's correction.
+
+The estimate is made at placement and refreshed in the same UPDATE as
+every status change, from the stages left at the new status. Corrections
+are the mean of ``actual_delivery_time - estimated_delivery_time`` per
+restaurant over recent deliveries, computed for all restaurants in one
+grouped query and kept in process memory for ``ORDER_ETA_STATS_TTL``
+seconds. The estimate set when an order goes out for delivery never
+includes the correction, so those deltas measure the model's error rather
+than the correction's own.
+"""
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, Max, Sum
+from django.utils import timezone
+
+from .models import KITCHEN_STATUSES, Order, OrderItem
+
+Status = Order.Status
+
+HISTORY = timedelta(days=30)
+# Fewer deliveries than this are noise, not a trend
+MIN_SAMPLES = 5
+MAX_CORRECTION = timedelta(hours=1)
+
+_stats = {'expires': 0.0, 'corrections': {}}
+_stats_lock = threading.Lock()
+
+
+def _minutes(name, default):
+    return timedelta(minutes=getattr(settings, name, default))
+
+
+def queue_minutes():
+    return _minutes('ORDER_ETA_QUEUE_MINUTES', 3)
+
+
+def item_minutes():
+    return _minutes('ORDER_ETA_ITEM_MINUTES', 1)
+
+
+def travel_minutes():
+    return _minutes('ORDER_ETA_TRAVEL_MINUTES', 20)
+
+
+def load_corrections(now=None):
+    """Per-restaurant delivery corrections from recent actual-vs-estimated deltas."""
+    now = now or timezone.now()
+    delta = ExpressionWrapper(F('actual_delivery_time') - F('estimated_delivery_time'), output_field=DurationField())
+    rows = (
+        Order.objects
+        .filter(
+            order_type=Order.OrderType.DELIVERY,
+            actual_delivery_time__gte=now - HISTORY,
+            estimated_delivery_time__isnull=False,
+        )
+        .values('restaurant_id')
+        .annotate(delta=Avg(delta), samples=Count('id'))
+    )
+    return {
+        row['restaurant_id']: max(-MAX_CORRECTION, min(MAX_CORRECTION, row['delta']))
+        for row in rows if row['samples'] >= MIN_SAMPLES and row['delta'] is not None
+    }
+
+
+def corrections():
+    """The cached corrections, reloaded once they are older than the TTL."""
+    if time.monotonic() >= _stats['expires']:
+        with _stats_lock:
+            if time.monotonic() >= _stats['expires']:
+                _stats['corrections'] = load_corrections()
+                _stats['expires'] = time.monotonic() + getattr(settings, 'ORDER_ETA_STATS_TTL', 300)
+    return _stats['corrections']
+
+
+def reset():
+    """Drop the cached corrections (tests, manual recalibration)."""
+    with _stats_lock:
+        _stats['expires'] = 0.0
+
+
+def queue_depths(restaurant_ids, exclude_ids=()):
+    """Active kitchen orders per restaurant, in one grouped COUNT."""
+    rows = (
+        Order.objects
+        .filter(restaurant_id__in=restaurant_ids, status__in=KITCHEN_STATUSES)
+        .exclude(id__in=exclude_ids)
+        .values('restaurant_id')
+        .annotate(depth=Count('id'))
+    )
+    return {row['restaurant_id']: row['depth'] for row in rows}
+
+
+def preparation(max_preparation_time, quantity):
+    return timedelta(minutes=max_preparation_time or 0) + item_minutes() * max((quantity or 1) - 1, 0)
+
+
+def delivery(restaurant_id, order_type, corrected=True):
+    if order_type != Order.OrderType.DELIVERY:
+        return timedelta()
+    correction = corrections().get(restaurant_id, timedelta()) if corrected else timedelta()
+    return max(travel_minutes() + correction, timedelta())
+
+
+def predict(restaurant_id, order_type, max_preparation_time, quantity, depth, now=None):
+    """Full estimate for an order that has not reached the kitchen yet."""
+    now = now or timezone.now()
+    return (
+        now
+        + queue_minutes() * depth
+        + preparation(max_preparation_time, quantity)
+        + delivery(restaurant_id, order_type)
+    )
+
+
+def estimate_many(orders, to_status, now=None):
+    """
+    Refreshed estimates for ``orders`` moving to ``to_status``, by order id.
+
+    Orders whose estimate does not change at that status are left out. Costs
+    at most one grouped query for queue depths and one for order items.
+    """
+    now = now or timezone.now()
+    if to_status not in (Status.CONFIRMED, Status.PREPARING, Status.READY, Status.OUT_FOR_DELIVERY):
+        return {}
+
+    if to_status == Status.OUT_FOR_DELIVERY:
+        return {order.id: now + delivery(order.restaurant_id, order.order_type, corrected=False) for order in orders}
+    if to_status == Status.READY:
+        return {order.id: now + delivery(order.restaurant_id, order.order_type) for order in orders}
+
+    ids = [order.id for order in orders]
+    items = {
+        row['order_id']: row
+        for row in OrderItem.objects.filter(order_id__in=ids).values('order_id').annotate(
+            max_preparation_time=Max('menu_item__preparation_time'), quantity=Sum('quantity'),
+        )
+    }
+    depths = {}
+    if to_status == Status.CONFIRMED:
+        depths = queue_depths({order.restaurant_id for order in orders}, exclude_ids=ids)
+
+    estimates = {}
+    for order in orders:
+        row = items.get(order.id, {})
+        estimates[order.id] = predict(
+            order.restaurant_id,
+            order.order_type,
+            row.get('max_preparation_time'),
+            row.get('quantity'),
+            depths.get(order.restaurant_id, 0),
+            now,
+        )
+    return estimates
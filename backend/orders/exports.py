@@ -0,0 +1,247 @@
+"""
+Owner exports of orders, order items and payments.
+
+Rows are read with ``values_list().iterator(chunk_size=...)``, so neither
+the web worker nor the Celery worker holds more than one chunk of a
+restaurant's history in memory. CSV is streamed straight into a
+``StreamingHttpResponse``. XLSX is written by xlsxwriter in
+``constant_memory`` mode, which flushes every row to a temporary file. Exports
+larger than ``EXPORT_SYNC_MAX_ROWS`` rows (and any export requested with
+``async``) run as a Celery job that stores the file and leaves a download
+link for the owner. Every dataset reads the live table and its archive
+counterpart side by side and merges them in date order, so orders past
+``ORDER_ARCHIVE_AFTER_DAYS`` are exported like any other.
+"""
+import csv
+import heapq
+import os
+import tempfile
+import uuid
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from payments.models import Payment
+from .models import ArchivedOrder, ArchivedOrderItem, Order, OrderItem
+
+CHUNK_SIZE = 2000
+JOB_KEY = 'export-job:{job_id}'
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+
+ORDER_COLUMNS = [
+    ('Order number', 'order_number'),
+    ('Created at', 'created_at'),
+    ('Status', 'status'),
+    ('Type', 'order_type'),
+    ('Customer', 'user__email'),
+    ('Subtotal', 'subtotal'),
+    ('Tax', 'tax'),
+    ('Delivery fee', 'delivery_fee'),
+    ('Discount', 'discount'),
+    ('Total', 'total'),
+    ('Estimated delivery', 'estimated_delivery_time'),
+    ('Delivered at', 'actual_delivery_time'),
+]
+
+# dataset -> one (model, restaurant lookup, date lookup, [(header, column), ...])
+# per table it is read from: live rows and rows moved by the archive mover
+# (see ``orders.archive``), merged in date order
+DATASETS = {
+    'orders': [
+        (Order, 'restaurant_id', 'created_at', ORDER_COLUMNS),
+        (ArchivedOrder, 'restaurant_id', 'created_at', ORDER_COLUMNS),
+    ],
+    'items': [
+        (OrderItem, 'order__restaurant_id', 'order__created_at', [
+            ('Order number', 'order__order_number'),
+            ('Ordered at', 'order__created_at'),
+            ('Item', 'menu_item__name'),
+            ('Quantity', 'quantity'),
+            ('Unit price', 'unit_price'),
+            ('Subtotal', 'subtotal'),
+            ('Special instructions', 'special_instructions'),
+        ]),
+        (ArchivedOrderItem, 'order__restaurant_id', 'order__created_at', [
+            ('Order number', 'order__order_number'),
+            ('Ordered at', 'order__created_at'),
+            ('Item', 'name'),
+            ('Quantity', 'quantity'),
+            ('Unit price', 'unit_price'),
+            ('Subtotal', 'subtotal'),
+            ('Special instructions', 'special_instructions'),
+        ]),
+    ],
+    'payments': [
+        (Payment, f'{order}__restaurant_id', 'created_at', [
+            ('Transaction', 'transaction_id'),
+            ('Order number', f'{order}__order_number'),
+            ('Created at', 'created_at'),
+            ('Method', 'method'),
+            ('Status', 'status'),
+            ('Amount', 'amount'),
+        ])
+        for order in ('order', 'archived_order')
+    ],
+}
+FORMATS = tuple(CONTENT_TYPES)
+
+
+class ExportError(Exception):
+    """The export parameters are invalid."""
+
+
+def sync_max_rows():
+    return getattr(settings, 'EXPORT_SYNC_MAX_ROWS', 50000)
+
+
+def job_ttl():
+    return getattr(settings, 'EXPORT_TTL', 24 * 60 * 60)
+
+
+def date_bounds(date_from, date_to):
+    """Aware ``[start, end)`` datetimes for an inclusive range of dates."""
+    if date_from > date_to:
+        raise ExportError('date_from must not be after date_to')
+    start = timezone.make_aware(datetime.combine(date_from, time.min))
+    end = timezone.make_aware(datetime.combine(date_to + timedelta(days=1), time.min))
+    return start, end
+
+
+def querysets(dataset, restaurant_id, date_from, date_to):
+    """One queryset per table of ``dataset``, each ordered by date and id."""
+    if dataset not in DATASETS:
+        raise ExportError(f'dataset must be one of: {", ".join(DATASETS)}')
+    start, end = date_bounds(date_from, date_to)
+    return [
+        model.objects
+        .filter(**{restaurant_lookup: restaurant_id, f'{date_lookup}__gte': start, f'{date_lookup}__lt': end})
+        .order_by(date_lookup, 'id')
+        # The merge key rides along at the end of each row
+        .values_list(*[column for _, column in columns], date_lookup, 'id')
+        for model, restaurant_lookup, date_lookup, columns in DATASETS[dataset]
+    ]
+
+
+def count(dataset, restaurant_id, date_from, date_to):
+    return sum(queryset.count() for queryset in querysets(dataset, restaurant_id, date_from, date_to))
+
+
+def headers(dataset):
+    return [header for header, _ in DATASETS[dataset][0][3]]
+
+
+def _cell(value):
+    if isinstance(value, datetime):
+        value = timezone.localtime(value).replace(tzinfo=None) if timezone.is_aware(value) else value
+        return value.replace(microsecond=0)
+    return value
+
+
+def rows(dataset, restaurant_id, date_from, date_to):
+    sources = [
+        queryset.iterator(chunk_size=CHUNK_SIZE)
+        for queryset in querysets(dataset, restaurant_id, date_from, date_to)
+    ]
+    for row in heapq.merge(*sources, key=lambda row: row[-2:]):
+        yield [_cell(value) for value in row[:-2]]
+
+
+def filename(dataset, date_from, date_to, fmt):
+    return f'{dataset}-{date_from:%Y%m%d}-{date_to:%Y%m%d}.{fmt}'
+
+
+class Echo:
+    """File-like object that hands back what is written, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(dataset, restaurant_id, date_from, date_to):
+    """Yield the export as CSV lines."""
+    writer = csv.writer(Echo())
+    yield writer.writerow(headers(dataset))
+    for row in rows(dataset, restaurant_id, date_from, date_to):
+        yield writer.writerow(row)
+
+
+def write_xlsx(path, dataset, restaurant_id, date_from, date_to):
+    """Write the export to ``path`` with xlsxwriter's constant-memory mode."""
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(path, {'constant_memory': True})
+    worksheet = workbook.add_worksheet(dataset.capitalize())
+    date_format = workbook.add_format({'num_format': 'yyyy-mm-dd hh:mm'})
+    bold = workbook.add_format({'bold': True})
+    worksheet.write_row(0, 0, headers(dataset), bold)
+    count = 0
+    for count, row in enumerate(rows(dataset, restaurant_id, date_from, date_to), start=1):
+        for column, value in enumerate(row):
+            if isinstance(value, datetime):
+                worksheet.write_datetime(count, column, value, date_format)
+            elif value is None:
+                worksheet.write_blank(count, column, None)
+            else:
+                worksheet.write(count, column, value)
+    workbook.close()
+    return count
+
+
+def write_csv(path, dataset, restaurant_id, date_from, date_to):
+    count = 0
+    with open(path, 'w', newline='') as output:
+        for count, line in enumerate(stream_csv(dataset, restaurant_id, date_from, date_to)):
+            output.write(line)
+    return count
+
+
+def write_file(dataset, fmt, restaurant_id, date_from, date_to):
+    """Write the export to a temporary file and return ``(path, rows)``."""
+    handle, path = tempfile.mkstemp(suffix=f'.{fmt}')
+    os.close(handle)
+    writer = write_xlsx if fmt == 'xlsx' else write_csv
+    try:
+        return path, writer(path, dataset, restaurant_id, date_from, date_to)
+    except Exception:
+        os.remove(path)
+        raise
+
+
+def get_job(job_id):
+    return cache.get(JOB_KEY.format(job_id=job_id))
+
+
+def set_job(job_id, **state):
+    cache.set(JOB_KEY.format(job_id=job_id), state, job_ttl())
+
+
+def start_job(owner_id, restaurant_id, dataset, fmt, date_from, date_to):
+    """Queue an export job and return its id."""
+    from .tasks import generate_export
+
+    job_id = uuid.uuid4().hex
+    set_job(job_id, owner_id=owner_id, status='PENDING', filename=filename(dataset, date_from, date_to, fmt))
+    generate_export.delay(job_id, owner_id, restaurant_id, dataset, fmt, date_from.isoformat(), date_to.isoformat())
+    return job_id
+
+
+def run_job(job_id, owner_id, restaurant_id, dataset, fmt, date_from, date_to):
+    """Write the export into storage and mark the job ready."""
+    name = filename(dataset, date_from, date_to, fmt)
+    set_job(job_id, owner_id=owner_id, status='RUNNING', filename=name)
+    path, count = write_file(dataset, fmt, restaurant_id, date_from, date_to)
+    try:
+        with open(path, 'rb') as source:
+            stored = default_storage.save(f'exports/{job_id}/{name}', File(source))
+    finally:
+        os.remove(path)
+    set_job(job_id, owner_id=owner_id, status='READY', filename=name, path=stored, rows=count)
+    return stored, count
@@ -0,0 +1,76 @@
+"""
+Kitchen display queue.
+
+The queue is a restaurant's orders in ``KITCHEN_STATUSES``, soonest promised
+first, served from the partial ``orders_kitchen_queue_idx`` index. Every
+status change appends an ``OrderStatusEvent``, and event ids are the sync
+sequence: a tablet that passes back the last sequence it saw only receives
+the orders with events after it, plus the ids of those that left the queue.
+
+Event ids are handed out on insert but become visible on commit, so a
+lower id can show up after a higher one. The sequence returned is therefore
+not the latest id but the latest one older than ``SETTLE``: any transaction
+still open that long is assumed to have finished, so every event below the sequence is
+already visible. Changes inside the window are sent again on the next sync;
+orders are full snapshots, so tablets simply apply them again.
+"""
+from datetime import timedelta
+
+from django.db.models import F, Prefetch
+from django.utils import timezone
+
+from .models import KITCHEN_STATUSES, Order, OrderItem, OrderStatusEvent
+
+KITCHEN_FIELDS = (
+    'id', 'order_number', 'status', 'order_type', 'estimated_delivery_time',
+    'created_at', 'delivery_instructions',
+)
+
+# Longest an order status change may stay uncommitted
+SETTLE = timedelta(seconds=60)
+
+
+def settled_sequence(now=None):
+    """Highest event id below which no event can still appear."""
+    cutoff = (now or timezone.now()) - SETTLE
+    return (
+        OrderStatusEvent.objects
+        .filter(created_at__lt=cutoff)
+        .order_by('-id')
+        .values_list('id', flat=True)
+        .first()
+    ) or 0
+
+
+def queue(restaurant, since=None):
+    """
+    Return ``(sequence, orders, removed_ids)`` for the kitchen of ``restaurant``.
+
+    Without ``since`` the whole active queue is returned; with it only orders
+    that changed after that sequence.
+    """
+    # Read the sequence first; events after it, including those committing
+    # while this runs, are re-sent by the next sync
+    sequence = settled_sequence()
+
+    orders = Order.objects.filter(restaurant=restaurant)
+    if since is None:
+        orders = orders.filter(status__in=KITCHEN_STATUSES)
+    else:
+        changed = OrderStatusEvent.objects.filter(id__gt=since, order__restaurant=restaurant).values('order_id')
+        orders = orders.filter(id__in=changed)
+
+    orders = list(
+        orders
+        .only(*KITCHEN_FIELDS)
+        .order_by(F('estimated_delivery_time').asc(nulls_last=True), 'created_at', 'id')
+        .prefetch_related(Prefetch(
+            'items',
+            queryset=OrderItem.objects.select_related('menu_item').only(
+                'order_id', 'quantity', 'special_instructions', 'modifiers', 'menu_item__name'
+            ),
+        ))
+    )
+    active = [order for order in orders if order.status in KITCHEN_STATUSES]
+    removed = [order.id for order in orders if order.status not in KITCHEN_STATUSES]
+    return sequence, active, removed
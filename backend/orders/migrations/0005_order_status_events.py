@@ -0,0 +1,57 @@
+# Generated by Django 5.1.14 on 2026-10-18 04:50
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_status_events(apps, schema_editor):
+    """Record the current status of existing orders as their last transition"""
+    Order = apps.get_model('orders', 'Order')
+    OrderStatusEvent = apps.get_model('orders', 'OrderStatusEvent')
+    batch = []
+    orders = Order.objects.exclude(status='PENDING').only('id', 'status', 'updated_at')
+    for order in orders.iterator(chunk_size=2000):
+        batch.append(OrderStatusEvent(
+            order_id=order.id,
+            to_status=order.status,
+            source='SYSTEM',
+            created_at=order.updated_at,
+        ))
+        if len(batch) >= 2000:
+            OrderStatusEvent.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        OrderStatusEvent.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_remove_order_orders_created_77e2b9_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderStatusEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_status', models.CharField(blank=True, choices=[('PENDING', 'Pending'), ('CONFIRMED', 'Confirmed'), ('PREPARING', 'Preparing'), ('READY', 'Ready'), ('OUT_FOR_DELIVERY', 'Out for Delivery'), ('DELIVERED', 'Delivered'), ('COMPLETED', 'Completed'), ('CANCELLED', 'Cancelled')], max_length=20, verbose_name='from status')),
+                ('to_status', models.CharField(choices=[('PENDING', 'Pending'), ('CONFIRMED', 'Confirmed'), ('PREPARING', 'Preparing'), ('READY', 'Ready'), ('OUT_FOR_DELIVERY', 'Out for Delivery'), ('DELIVERED', 'Delivered'), ('COMPLETED', 'Completed'), ('CANCELLED', 'Cancelled')], max_length=20, verbose_name='to status')),
+                ('source', models.CharField(choices=[('CUSTOMER', 'Customer'), ('RESTAURANT', 'Restaurant'), ('ADMIN', 'Admin'), ('SYSTEM', 'System')], default='SYSTEM', max_length=20, verbose_name='source')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='created at')),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_events', to='orders.order')),
+            ],
+            options={
+                'verbose_name': 'order status event',
+                'verbose_name_plural': 'order status events',
+                'db_table': 'order_status_events',
+                'ordering': ['created_at', 'id'],
+                'indexes': [models.Index(fields=['order', 'created_at'], name='order_statu_order_i_1b1eb0_idx'), models.Index(fields=['to_status', 'created_at'], name='order_statu_to_stat_153417_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_status_events, migrations.RunPython.noop),
+    ]
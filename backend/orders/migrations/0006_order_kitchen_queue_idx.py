@@ -0,0 +1,20 @@
+# Generated by Django 5.1.14 on 2026-10-18 04:53
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0005_order_status_events'),
+        ('restaurants', '0006_remove_review_reviews_created_53b5d6_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(condition=models.Q(('status__in', ['CONFIRMED', 'PREPARING', 'READY'])), fields=['restaurant', 'estimated_delivery_time', 'created_at'], name='orders_kitchen_queue_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.14 on 2026-10-18 04:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0006_order_kitchen_queue_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderOutboxEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('CREATED', 'Created'), ('STATUS', 'Status changed')], max_length=20, verbose_name='kind')),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('CONFIRMED', 'Confirmed'), ('PREPARING', 'Preparing'), ('READY', 'Ready'), ('OUT_FOR_DELIVERY', 'Out for Delivery'), ('DELIVERED', 'Delivered'), ('COMPLETED', 'Completed'), ('CANCELLED', 'Cancelled')], max_length=20, verbose_name='status')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='created at')),
+                ('claim', models.CharField(blank=True, max_length=32, verbose_name='claim')),
+                ('claimed_at', models.DateTimeField(blank=True, null=True, verbose_name='claimed at')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='orders.order')),
+            ],
+            options={
+                'verbose_name': 'order outbox event',
+                'verbose_name_plural': 'order outbox events',
+                'db_table': 'order_outbox',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['claimed_at', 'id'], name='order_outbo_claimed_c51ec8_idx')],
+            },
+        ),
+    ]
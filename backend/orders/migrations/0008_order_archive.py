@@ -0,0 +1,76 @@
+# Generated by Django 5.1.14 on 2026-10-18 05:04
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0002_initial'),
+        ('orders', '0007_order_outbox'),
+        ('restaurants', '0007_restaurant_order_capacity'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedOrder',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('order_number', models.CharField(max_length=50, unique=True, verbose_name='order number')),
+                ('order_type', models.CharField(choices=[('DELIVERY', 'Delivery'), ('TAKEOUT', 'Takeout'), ('DINE_IN', 'Dine In')], max_length=20, verbose_name='order type')),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('CONFIRMED', 'Confirmed'), ('PREPARING', 'Preparing'), ('READY', 'Ready'), ('OUT_FOR_DELIVERY', 'Out for Delivery'), ('DELIVERED', 'Delivered'), ('COMPLETED', 'Completed'), ('CANCELLED', 'Cancelled')], max_length=20, verbose_name='status')),
+                ('subtotal', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='subtotal')),
+                ('tax', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='tax')),
+                ('delivery_fee', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='delivery fee')),
+                ('discount', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='discount')),
+                ('total', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='total')),
+                ('delivery_address', models.JSONField(blank=True, null=True, verbose_name='delivery address')),
+                ('delivery_instructions', models.TextField(blank=True, verbose_name='delivery instructions')),
+                ('estimated_delivery_time', models.DateTimeField(blank=True, null=True, verbose_name='estimated delivery time')),
+                ('actual_delivery_time', models.DateTimeField(blank=True, null=True, verbose_name='actual delivery time')),
+                ('status_history', models.JSONField(default=list, verbose_name='status history')),
+                ('created_at', models.DateTimeField(verbose_name='created at')),
+                ('updated_at', models.DateTimeField(verbose_name='updated at')),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='archived at')),
+                ('restaurant', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='restaurants.restaurant')),
+                ('user', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'archived order',
+                'verbose_name_plural': 'archived orders',
+                'db_table': 'orders_archive',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedOrderItem',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=255, verbose_name='name')),
+                ('quantity', models.IntegerField(verbose_name='quantity')),
+                ('unit_price', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='unit price')),
+                ('subtotal', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='subtotal')),
+                ('special_instructions', models.TextField(blank=True, verbose_name='special instructions')),
+                ('modifiers', models.JSONField(default=list, verbose_name='modifiers')),
+                ('menu_item', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='menu.menuitem')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='orders.archivedorder')),
+            ],
+            options={
+                'verbose_name': 'archived order item',
+                'verbose_name_plural': 'archived order items',
+                'db_table': 'order_items_archive',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='archivedorder',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='orders_arch_user_id_851b94_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedorder',
+            index=models.Index(fields=['restaurant', 'created_at', 'id'], name='orders_arch_restaur_1c5475_idx'),
+        ),
+    ]
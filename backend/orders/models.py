@@ -1,10 +1,15 @@
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from users.models import User
 from restaurants.models import Restaurant
 from menu.models import MenuItem
 
 
+# Orders the kitchen is working on, in queue order of their promised time
+KITCHEN_STATUSES = ['CONFIRMED', 'PREPARING', 'READY']
+
+
 class Order(models.Model):
     """Order model."""
     
@@ -57,7 +62,13 @@ class Order(models.Model):
             models.Index(fields=['order_number']),
             models.Index(fields=['user', 'status']),
             models.Index(fields=['restaurant', 'status']),
-            models.Index(fields=['created_at']),
+            models.Index(fields=['created_at', 'id']),
+            models.Index(fields=['user', 'created_at', 'id']),
+            models.Index(
+                fields=['restaurant', 'estimated_delivery_time', 'created_at'],
+                condition=models.Q(status__in=KITCHEN_STATUSES),
+                name='orders_kitchen_queue_idx',
+            ),
         ]
     
     def __str__(self):
@@ -82,3 +93,132 @@ class OrderItem(models.Model):
     
     def __str__(self):
         return f'{self.menu_item.name} x {self.quantity}'
+
+
+class OrderStatusEvent(models.Model):
+    """Append-only log of order status transitions."""
+    
+    class Source(models.TextChoices):
+        CUSTOMER = 'CUSTOMER', _('Customer')
+        RESTAURANT = 'RESTAURANT', _('Restaurant')
+        ADMIN = 'ADMIN', _('Admin')
+        SYSTEM = 'SYSTEM', _('System')
+    
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='status_events')
+    from_status = models.CharField(_('from status'), max_length=20, choices=Order.Status.choices, blank=True)
+    to_status = models.CharField(_('to status'), max_length=20, choices=Order.Status.choices)
+    actor = models.ForeignKey(User, on_delete=models.SET_NULL, blank=True, null=True, related_name='+')
+    source = models.CharField(_('source'), max_length=20, choices=Source.choices, default=Source.SYSTEM)
+    created_at = models.DateTimeField(_('created at'), default=timezone.now)
+    
+    class Meta:
+        verbose_name = _('order status event')
+        verbose_name_plural = _('order status events')
+        db_table = 'order_status_events'
+        ordering = ['created_at', 'id']
+        indexes = [
+            models.Index(fields=['order', 'created_at']),
+            models.Index(fields=['to_status', 'created_at']),
+        ]
+    
+    def __str__(self):
+        return f'{self.order_id}: {self.from_status or "-"} -> {self.to_status}'
+
+
+class OrderOutboxEvent(models.Model):
+    """Pending customer/restaurant notification, written in the order's transaction."""
+    
+    class Kind(models.TextChoices):
+        CREATED = 'CREATED', _('Created')
+        STATUS = 'STATUS', _('Status changed')
+    
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='+')
+    kind = models.CharField(_('kind'), max_length=20, choices=Kind.choices)
+    status = models.CharField(_('status'), max_length=20, choices=Order.Status.choices)
+    created_at = models.DateTimeField(_('created at'), auto_now_add=True)
+    claim = models.CharField(_('claim'), max_length=32, blank=True)
+    claimed_at = models.DateTimeField(_('claimed at'), blank=True, null=True)
+    
+    class Meta:
+        verbose_name = _('order outbox event')
+        verbose_name_plural = _('order outbox events')
+        db_table = 'order_outbox'
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['claimed_at', 'id']),
+        ]
+    
+    def __str__(self):
+        return f'{self.order_id}: {self.kind} {self.status}'
+
+
+class ArchivedOrder(models.Model):
+    """Completed or cancelled order moved out of the working set (see ``orders.archive``)."""
+    
+    # Same id as the live order it replaces
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(
+        User, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+'
+    )
+    restaurant = models.ForeignKey(
+        Restaurant, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+'
+    )
+    order_number = models.CharField(_('order number'), max_length=50, unique=True)
+    order_type = models.CharField(_('order type'), max_length=20, choices=Order.OrderType.choices)
+    status = models.CharField(_('status'), max_length=20, choices=Order.Status.choices)
+    
+    subtotal = models.DecimalField(_('subtotal'), max_digits=10, decimal_places=2)
+    tax = models.DecimalField(_('tax'), max_digits=10, decimal_places=2)
+    delivery_fee = models.DecimalField(_('delivery fee'), max_digits=10, decimal_places=2)
+    discount = models.DecimalField(_('discount'), max_digits=10, decimal_places=2)
+    total = models.DecimalField(_('total'), max_digits=10, decimal_places=2)
+    
+    delivery_address = models.JSONField(_('delivery address'), blank=True, null=True)
+    delivery_instructions = models.TextField(_('delivery instructions'), blank=True)
+    estimated_delivery_time = models.DateTimeField(_('estimated delivery time'), blank=True, null=True)
+    actual_delivery_time = models.DateTimeField(_('actual delivery time'), blank=True, null=True)
+    
+    # The order's OrderStatusEvent rows
+    status_history = models.JSONField(_('status history'), default=list)
+    
+    created_at = models.DateTimeField(_('created at'))
+    updated_at = models.DateTimeField(_('updated at'))
+    archived_at = models.DateTimeField(_('archived at'), default=timezone.now)
+    
+    class Meta:
+        verbose_name = _('archived order')
+        verbose_name_plural = _('archived orders')
+        db_table = 'orders_archive'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'created_at', 'id']),
+            models.Index(fields=['restaurant', 'created_at', 'id']),
+        ]
+    
+    def __str__(self):
+        return f'Order #{self.order_number} (archived)'
+
+
+class ArchivedOrderItem(models.Model):
+    """Item of an ``ArchivedOrder``."""
+    
+    id = models.BigIntegerField(primary_key=True)
+    order = models.ForeignKey(ArchivedOrder, on_delete=models.CASCADE, related_name='items')
+    menu_item = models.ForeignKey(
+        MenuItem, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+'
+    )
+    # Kept so history survives the menu item being removed
+    name = models.CharField(_('name'), max_length=255)
+    quantity = models.IntegerField(_('quantity'))
+    unit_price = models.DecimalField(_('unit price'), max_digits=10, decimal_places=2)
+    subtotal = models.DecimalField(_('subtotal'), max_digits=10, decimal_places=2)
+    special_instructions = models.TextField(_('special instructions'), blank=True)
+    modifiers = models.JSONField(_('modifiers'), default=list)
+    
+    class Meta:
+        verbose_name = _('archived order item')
+        verbose_name_plural = _('archived order items')
+        db_table = 'order_items_archive'
+    
+    def __str__(self):
+        return f'{self.name} x {self.quantity}'
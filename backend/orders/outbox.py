@@ -0,0 +1,208 @@
+"""
+Transactional outbox for order notifications.
+
+Order creation and real status transitions write an ``OrderOutboxEvent``
+in the same transaction as the change, so nothing is sent for a rolled back
+write or for a save that did not change the status. Once the transaction
+commits, at most one dispatcher run is scheduled per
+``ORDER_OUTBOX_WINDOW`` seconds. The dispatcher claims everything pending,
+coalesces it per order (one confirmation, one restaurant alert and only
+the latest customer-facing status), and sends the batch over one mail
+connection with one ``bulk_create`` for in-app notifications.
+"""
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Q, prefetch_related_objects
+from django.utils import timezone
+
+from .models import Order, OrderOutboxEvent
+
+DISPATCH_SCHEDULED_KEY = 'order-outbox-dispatch-scheduled'
+BATCH_SIZE = 500
+# Claims older than this belong to a dispatcher that died; retry them
+STALE_CLAIM = timedelta(minutes=10)
+
+STATUS_MESSAGES = {
+    'CONFIRMED': 'Your order has been confirmed and will be prepared soon.',
+    'PREPARING': 'Your order is being prepared.',
+    'READY': 'Your order is ready!',
+    'OUT_FOR_DELIVERY': 'Your order is out for delivery.',
+    'DELIVERED': 'Your order has been delivered. Enjoy your meal!',
+}
+
+
+def _window():
+    return getattr(settings, 'ORDER_OUTBOX_WINDOW', 5)
+
+
+def _frontend_url():
+    return getattr(settings, 'FRONTEND_URL', 'http://localhost:5173')
+
+
+def record(order, kind, status):
+    """Add an outbox event in the current transaction and dispatch after commit."""
+    OrderOutboxEvent.objects.create(order_id=order.pk, kind=kind, status=status)
+    transaction.on_commit(schedule_dispatch)
+
+
+def record_many(order_ids, kind, status):
+    """``record`` for a batch of orders: one INSERT and one dispatch."""
+    OrderOutboxEvent.objects.bulk_create(
+        OrderOutboxEvent(order_id=order_id, kind=kind, status=status) for order_id in order_ids
+    )
+    transaction.on_commit(schedule_dispatch)
+
+
+def schedule_dispatch():
+    """Enqueue one dispatcher run per window, however many events arrive."""
+    from .tasks import dispatch_order_outbox
+
+    window = _window()
+    if cache.add(DISPATCH_SCHEDULED_KEY, True, window):
+        dispatch_order_outbox.apply_async(countdown=window)
+
+
+def confirmation_email(order):
+    return EmailMessage(
+        f'Order Confirmation - #{order.order_number}',
+        f"""
+    Dear {order.user.get_full_name()},
+
+    Your order has been confirmed!
+
+    Order Number: {order.order_number}
+    Restaurant: {order.restaurant.name}
+    Total: ${order.total}
+
+    Estimated delivery time: {order.estimated_delivery_time}
+
+    Thank you for your order!
+    """,
+        settings.DEFAULT_FROM_EMAIL,
+        [order.user.email],
+    )
+
+
+def status_email(order, status):
+    """Customer email for ``status``, or ``None`` for statuses we don't announce."""
+    if status not in STATUS_MESSAGES:
+        return None
+    return EmailMessage(
+        f'Order Update - #{order.order_number}',
+        f"""
+    Dear {order.user.get_full_name()},
+
+    {STATUS_MESSAGES[status]}
+
+    Order Number: {order.order_number}
+    Restaurant: {order.restaurant.name}
+
+    Track your order: {_frontend_url()}/orders/{order.id}
+    """,
+        settings.DEFAULT_FROM_EMAIL,
+        [order.user.email],
+    )
+
+
+def restaurant_notification(order):
+    from notifications.models import Notification
+
+    return Notification(
+        user=order.restaurant.owner,
+        type=Notification.Type.ORDER,
+        title='New Order',
+        message=f'New order #{order.order_number} - ${order.total}',
+        data={'order_id': order.id, 'link': f'/dashboard/orders/{order.id}'},
+    )
+
+
+def restaurant_email(order):
+    items_list = '\n'.join(f'- {item.menu_item.name} x{item.quantity}' for item in order.items.all())
+    return EmailMessage(
+        f'New Order - #{order.order_number}',
+        f"""
+    New order received!
+
+    Order Number: {order.order_number}
+    Customer: {order.user.get_full_name()}
+    Total: ${order.total}
+    Type: {order.order_type}
+
+    Items:
+    {items_list}
+
+    View order: {_frontend_url()}/dashboard/orders/{order.id}
+    """,
+        settings.DEFAULT_FROM_EMAIL,
+        [order.restaurant.email],
+    )
+
+
+def claim_batch():
+    """Claim up to ``BATCH_SIZE`` pending events and return them."""
+    now = timezone.now()
+    token = uuid.uuid4().hex
+    claimable = Q(claimed_at__isnull=True) | Q(claimed_at__lt=now - STALE_CLAIM)
+    ids = list(
+        OrderOutboxEvent.objects.filter(claimable).order_by('id').values_list('id', flat=True)[:BATCH_SIZE]
+    )
+    if not ids:
+        return []
+    # The claimable condition is re-checked in the UPDATE, so concurrent
+    # dispatchers never take the same event
+    OrderOutboxEvent.objects.filter(claimable, id__in=ids).update(claim=token, claimed_at=now)
+    return list(OrderOutboxEvent.objects.filter(claim=token).order_by('id'))
+
+
+def send_batch(events):
+    """Coalesce ``events`` per order and send the result in bulk."""
+    from notifications.models import Notification
+
+    by_order = {}
+    for event in events:
+        by_order.setdefault(event.order_id, []).append(event)
+
+    orders = Order.objects.select_related('user', 'restaurant', 'restaurant__owner').in_bulk(by_order)
+    created = [
+        orders[order_id] for order_id, order_events in by_order.items()
+        if order_id in orders and any(event.kind == OrderOutboxEvent.Kind.CREATED for event in order_events)
+    ]
+    prefetch_related_objects(created, 'items__menu_item')
+
+    messages = []
+    notifications = []
+    for order in created:
+        messages += [confirmation_email(order), restaurant_email(order)]
+        notifications.append(restaurant_notification(order))
+
+    for order_id, order_events in by_order.items():
+        statuses = [event.status for event in order_events if event.kind == OrderOutboxEvent.Kind.STATUS]
+        if order_id in orders and statuses:
+            # Only the latest status is worth telling the customer about
+            email = status_email(orders[order_id], statuses[-1])
+            if email is not None:
+                messages.append(email)
+
+    if messages:
+        get_connection().send_messages(messages)
+    Notification.objects.bulk_create(notifications)
+    return len(messages), len(notifications)
+
+
+def dispatch():
+    """Send every pending event; returns the number of events handled."""
+    # Events committed from now on schedule a run of their own
+    cache.delete(DISPATCH_SCHEDULED_KEY)
+    handled = 0
+    while True:
+        events = claim_batch()
+        if not events:
+            return handled
+        send_batch(events)
+        OrderOutboxEvent.objects.filter(id__in=[event.id for event in events]).delete()
+        handled += len(events)
@@ -1,17 +1,86 @@
 from rest_framework import serializers
-from .models import Order, OrderItem
+from config.fieldsets import DynamicFieldsMixin
+from restaurants.models import Restaurant
+from .models import ArchivedOrder, ArchivedOrderItem, Order, OrderItem
 
 
-class OrderItemSerializer(serializers.ModelSerializer):
+class OrderItemSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = OrderItem
         fields = '__all__'
 
 
-class OrderSerializer(serializers.ModelSerializer):
+class OrderSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     items = OrderItemSerializer(many=True, read_only=True)
     
     class Meta:
         model = Order
         fields = '__all__'
-        read_only_fields = ['id', 'created_at', 'updated_at', 'order_number']
+        read_only_fields = ['id', 'created_at', 'updated_at', 'order_number', 'status', 'actual_delivery_time']
+        expandable_fields = ['items']
+
+
+class ArchivedOrderItemSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ArchivedOrderItem
+        fields = '__all__'
+
+
+class ArchivedOrderSerializer(serializers.ModelSerializer):
+    """Read-only order from the archive, shaped like ``OrderSerializer``"""
+    
+    items = ArchivedOrderItemSerializer(many=True, read_only=True)
+    archived = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = ArchivedOrder
+        fields = '__all__'
+        read_only_fields = [field.name for field in ArchivedOrder._meta.fields]
+    
+    def get_archived(self, obj):
+        return True
+
+
+class OrderLineSerializer(serializers.Serializer):
+    menu_item = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=1, max_value=99)
+    special_instructions = serializers.CharField(required=False, allow_blank=True, default='')
+    modifiers = serializers.ListField(child=serializers.CharField(), required=False, default=list)
+
+
+class OrderCreateSerializer(serializers.Serializer):
+    """Cart submitted for order placement; prices are taken from the menu"""
+    
+    restaurant = serializers.PrimaryKeyRelatedField(queryset=Restaurant.objects.filter(is_deleted=False))
+    order_type = serializers.ChoiceField(choices=Order.OrderType.choices)
+    items = OrderLineSerializer(many=True, allow_empty=False, max_length=100)
+    delivery_address = serializers.JSONField(required=False, allow_null=True, default=None)
+    delivery_instructions = serializers.CharField(required=False, allow_blank=True, default='')
+    
+    def validate(self, attrs):
+        if attrs['order_type'] == Order.OrderType.DELIVERY and not attrs['delivery_address']:
+            raise serializers.ValidationError({'delivery_address': 'Required for delivery orders'})
+        if attrs['restaurant'].status in (Restaurant.Status.INACTIVE, Restaurant.Status.SUSPENDED):
+            raise serializers.ValidationError({'restaurant': 'This restaurant is not accepting orders'})
+        return attrs
+
+
+class KitchenOrderItemSerializer(serializers.ModelSerializer):
+    name = serializers.CharField(source='menu_item.name', read_only=True)
+    
+    class Meta:
+        model = OrderItem
+        fields = ['name', 'quantity', 'special_instructions', 'modifiers']
+
+
+class KitchenOrderSerializer(serializers.ModelSerializer):
+    """Compact order for the kitchen display queue"""
+    
+    items = KitchenOrderItemSerializer(many=True, read_only=True)
+    
+    class Meta:
+        model = Order
+        fields = [
+            'id', 'order_number', 'status', 'order_type', 'estimated_delivery_time',
+            'created_at', 'delivery_instructions', 'items',
+        ]
@@ -0,0 +1,96 @@
+"""
+Server-Sent Events stream of an order's status and ETA.
+
+``order_stream`` is an async view: under ASGI each open stream is a
+coroutine waiting on the pub/sub broker rather than a worker thread, so
+clients can hold one connection per active order instead of polling
+``/track/``. The stream opens with a snapshot, then forwards every
+published change, sends a comment line as heartbeat, and closes once the
+order reaches a final status or ``ORDER_STREAM_MAX_SECONDS`` passes
+(``EventSource`` reconnects on its own).
+"""
+import json
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+from .broker import channel_for, get_broker, order_message
+from .models import Order
+
+FINAL_STATUSES = {Order.Status.COMPLETED, Order.Status.CANCELLED}
+HEARTBEAT_SECONDS = 15
+
+
+def _max_seconds():
+    return getattr(settings, 'ORDER_STREAM_MAX_SECONDS', 30 * 60)
+
+
+def _authenticate(request):
+    """Resolve the user from a Bearer header or, for EventSource, ``?token=``."""
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = authentication.get_raw_token(header) if header else None
+    if raw_token is None:
+        raw_token = request.GET.get('token')
+    if not raw_token:
+        return None
+    try:
+        return authentication.get_user(authentication.get_validated_token(raw_token))
+    except (InvalidToken, AuthenticationFailed):
+        return None
+
+
+def _load_order(user, pk):
+    """Return the order if ``user`` may follow it, mirroring the order API."""
+    order = Order.objects.select_related('restaurant').filter(pk=pk).first()
+    if order is None:
+        return None
+    if user.role == 'ADMIN' or order.user_id == user.id:
+        return order
+    if user.role == 'RESTAURANT_OWNER' and order.restaurant.owner_id == user.id:
+        return order
+    return None
+
+
+def _sse(event, data):
+    return f'event: {event}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n'
+
+
+async def order_stream(request, pk):
+    """Live status and ETA updates of an order (text/event-stream)"""
+    user = await sync_to_async(_authenticate)(request)
+    if user is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+
+    order = await sync_to_async(_load_order)(user, pk)
+    if order is None:
+        return JsonResponse({'detail': 'Not found.'}, status=404)
+
+    async def events():
+        async with get_broker().subscribe(channel_for(order.id)) as subscription:
+            # Subscribed before the snapshot is read, so no change is missed
+            current = await sync_to_async(Order.objects.get)(pk=order.id)
+            yield _sse('snapshot', order_message('snapshot', current))
+            if current.status in FINAL_STATUSES:
+                return
+
+            deadline = time.monotonic() + _max_seconds()
+            while time.monotonic() < deadline:
+                message = await subscription.get(HEARTBEAT_SECONDS)
+                if message is None:
+                    yield ': keepalive\n\n'
+                    continue
+                data = json.loads(message)
+                yield _sse(data['event'], data)
+                if data['status'] in FINAL_STATUSES:
+                    return
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -5,136 +5,95 @@ from django.utils import timezone
 from datetime import timedelta
 
 
+@shared_task
+def dispatch_order_outbox():
+    """Send pending order notifications from the outbox in coalesced batches"""
+    from orders.outbox import dispatch
+    
+    return dispatch()
+
+
+@shared_task
+def generate_export(job_id, owner_id, restaurant_id, dataset, fmt, date_from, date_to):
+    """Write a large owner export to storage and notify the owner"""
+    from datetime import date
+    from django.urls import reverse
+    from notifications.models import Notification
+    from orders import exports
+    
+    try:
+        path, rows = exports.run_job(
+            job_id, owner_id, restaurant_id, dataset, fmt,
+            date.fromisoformat(date_from), date.fromisoformat(date_to)
+        )
+    except Exception:
+        exports.set_job(job_id, owner_id=owner_id, status='FAILED')
+        raise
+    
+    delete_export.apply_async((path,), countdown=exports.job_ttl())
+    link = reverse('owner-order-export-download', kwargs={'job_id': job_id})
+    Notification.objects.create(
+        user_id=owner_id,
+        type=Notification.Type.SYSTEM,
+        title='Export Ready',
+        message=f'Your {dataset} export ({rows} rows) is ready to download.',
+        data={'job_id': job_id, 'link': link},
+    )
+    return {'job_id': job_id, 'rows': rows}
+
+
+@shared_task
+def delete_export(path):
+    """Remove an expired export file from storage"""
+    from django.core.files.storage import default_storage
+    
+    default_storage.delete(path)
+
+
 @shared_task
 def send_order_confirmation_email(order_id):
     """Send order confirmation email to customer"""
     from orders.models import Order
+    from orders.outbox import confirmation_email
     
     try:
-        order = Order.objects.get(id=order_id)
+        order = Order.objects.select_related('user', 'restaurant').get(id=order_id)
     except Order.DoesNotExist:
         return
     
-    subject = f'Order Confirmation - #{order.order_number}'
-    message = f"""
-    Dear {order.user.get_full_name()},
-    
-    Your order has been confirmed!
-    
-    Order Number: {order.order_number}
-    Restaurant: {order.restaurant.name}
-    Total: ${order.total}
-    
-    Estimated delivery time: {order.estimated_delivery_time}
-    
-    Thank you for your order!
-    """
-    
-    send_mail(
-        subject,
-        message,
-        settings.DEFAULT_FROM_EMAIL,
-        [order.user.email],
-        fail_silently=False,
-    )
+    confirmation_email(order).send()
 
 
 @shared_task
 def send_order_status_update(order_id, new_status):
     """Send email when order status changes"""
     from orders.models import Order
-    from django.conf import settings
+    from orders.outbox import status_email
     
     try:
-        order = Order.objects.get(id=order_id)
+        order = Order.objects.select_related('user', 'restaurant').get(id=order_id)
     except Order.DoesNotExist:
         return
     
     # Only send email for certain status changes that customers care about
-    status_messages = {
-        'CONFIRMED': 'Your order has been confirmed and will be prepared soon.',
-        'PREPARING': 'Your order is being prepared.',
-        'READY': 'Your order is ready!',
-        'OUT_FOR_DELIVERY': 'Your order is out for delivery.',
-        'DELIVERED': 'Your order has been delivered. Enjoy your meal!',
-    }
-    
-    # Skip if status is not in messages (e.g., PENDING, COMPLETED, CANCELLED)
-    if new_status not in status_messages:
-        return
-    
-    message_text = status_messages[new_status]
-    
-    frontend_url = getattr(settings, 'FRONTEND_URL', 'http://localhost:5173')
-    
-    subject = f'Order Update - #{order.order_number}'
-    message = f"""
-    Dear {order.user.get_full_name()},
-    
-    {message_text}
-    
-    Order Number: {order.order_number}
-    Restaurant: {order.restaurant.name}
-    
-    Track your order: {frontend_url}/orders/{order.id}
-    """
-    
-    send_mail(
-        subject,
-        message,
-        settings.DEFAULT_FROM_EMAIL,
-        [order.user.email],
-        fail_silently=False,
-    )
+    email = status_email(order, new_status)
+    if email is not None:
+        email.send()
 
 
 @shared_task
 def notify_restaurant_new_order(order_id):
     """Notify restaurant owner about new order"""
     from orders.models import Order
-    from notifications.models import Notification
+    from orders.outbox import restaurant_email, restaurant_notification
     
     try:
-        order = Order.objects.get(id=order_id)
+        order = Order.objects.select_related('user', 'restaurant', 'restaurant__owner').get(id=order_id)
     except Order.DoesNotExist:
         return
     
-    frontend_url = getattr(settings, 'FRONTEND_URL', 'http://localhost:5173')
-    
-    # Create notification for restaurant owner
-    Notification.objects.create(
-        user=order.restaurant.owner,
-        type='ORDER',
-        title='New Order',
-        message=f'New order #{order.order_number} - ${order.total}',
-        link=f'/dashboard/orders/{order.id}'
-    )
-    
-    # Send email to restaurant
-    items_list = '\n'.join([f'- {item.menu_item.name} x{item.quantity}' for item in order.items.all()])
-    
-    subject = f'New Order - #{order.order_number}'
-    message = f"""
-    New order received!
-    
-    Order Number: {order.order_number}
-    Customer: {order.user.get_full_name()}
-    Total: ${order.total}
-    Type: {order.order_type}
-    
-    Items:
-    {items_list}
-    
-    View order: {frontend_url}/dashboard/orders/{order.id}
-    """
-    
-    send_mail(
-        subject,
-        message,
-        settings.DEFAULT_FROM_EMAIL,
-        [order.restaurant.email],
-        fail_silently=False,
-    )
+    restaurant_notification(order).save()
+    restaurant_email(order).send()
 
 
 @shared_task
@@ -170,15 +129,36 @@ def handle_order_cancellation(order_id):
 @shared_task
 def auto_complete_delivered_orders():
     """Automatically complete orders that have been delivered for 1+ hours"""
-    from orders.models import Order
-    
-    cutoff_time = timezone.now() - timedelta(hours=1)
-    
-    orders_to_complete = Order.objects.filter(
-        status='DELIVERED',
-        updated_at__lte=cutoff_time
-    )
-    
-    for order in orders_to_complete:
-        order.status = 'COMPLETED'
-        order.save()
+    from config.locks import task_lock
+    from orders.models import Order, OrderStatusEvent
+    from orders.transitions import transition_many
+    
+    with task_lock('auto-complete-orders', timeout=15 * 60) as acquired:
+        if not acquired:
+            return {'skipped': True, 'completed': 0}
+        
+        cutoff_time = timezone.now() - timedelta(hours=1)
+        
+        delivered = OrderStatusEvent.objects.filter(
+            to_status='DELIVERED',
+            created_at__lte=cutoff_time
+        ).values('order_id')
+        orders_to_complete = Order.objects.filter(
+            status='DELIVERED',
+            id__in=delivered
+        )
+        
+        completed = transition_many(orders_to_complete, 'COMPLETED', source=OrderStatusEvent.Source.SYSTEM)
+        return {'skipped': False, 'completed': completed}
+
+
+@shared_task
+def archive_old_orders():
+    """Move old completed/cancelled orders to the archive tables (runs daily)"""
+    from config.locks import task_lock
+    from orders.archive import archive_orders
+    
+    with task_lock('archive-old-orders', timeout=6 * 60 * 60) as acquired:
+        if not acquired:
+            return {'skipped': True, 'archived': 0}
+        return {'skipped': False, 'archived': archive_orders()}
@@ -0,0 +1,194 @@
+"""
+Order status state machine.
+
+Every status change goes through ``transition``: it is applied as one
+conditional ``UPDATE ... WHERE status = <expected>``, so concurrent
+kitchen, courier and customer updates never overwrite each other and no
+row lock is held. The winning update appends an ``OrderStatusEvent`` in the
+same transaction; the loser gets ``TransitionConflict`` with the status it
+lost to. The same UPDATE refreshes the order's ETA from the stages it has
+left (see ``orders.eta``). Customer notifications go through the outbox in
+the same transaction; once the change commits it is pushed to live
+subscribers.
+"""
+from django.db import transaction
+from django.db.models import Case, DateTimeField, F, Value, When
+from django.utils import timezone
+
+from . import eta, outbox
+from .broker import publish_order_event
+from .models import Order, OrderOutboxEvent, OrderStatusEvent
+
+Status = Order.Status
+
+BULK_CHUNK_SIZE = 500
+
+TRANSITIONS = {
+    Status.PENDING: {Status.CONFIRMED, Status.CANCELLED},
+    Status.CONFIRMED: {Status.PREPARING, Status.CANCELLED},
+    Status.PREPARING: {Status.READY},
+    Status.READY: {Status.OUT_FOR_DELIVERY, Status.COMPLETED},
+    Status.OUT_FOR_DELIVERY: {Status.DELIVERED},
+    Status.DELIVERED: {Status.COMPLETED},
+}
+
+# Progress steps shown by order tracking
+TRACKING_STEPS = [
+    Status.PENDING, Status.CONFIRMED, Status.PREPARING, Status.READY,
+    Status.OUT_FOR_DELIVERY, Status.DELIVERED, Status.COMPLETED,
+]
+
+
+class InvalidTransition(Exception):
+    """The requested status cannot follow the order's current status."""
+
+
+class TransitionConflict(Exception):
+    """The order's status changed concurrently; ``current`` is the new one."""
+
+    def __init__(self, current):
+        self.current = current
+        super().__init__(f'Order status changed concurrently to {current}')
+
+
+def can_transition(from_status, to_status):
+    return to_status in TRANSITIONS.get(from_status, ())
+
+
+def sources_for(to_status):
+    """Statuses from which ``to_status`` can be reached."""
+    return [from_status for from_status, targets in TRANSITIONS.items() if to_status in targets]
+
+
+def transition(order, to_status, actor=None, source=OrderStatusEvent.Source.SYSTEM):
+    """
+    Move ``order`` from the status it was read with to ``to_status``.
+
+    Raises ``InvalidTransition`` for a move the state machine does not allow
+    and ``TransitionConflict`` if the stored status is no longer the one on
+    ``order``. On success ``order`` is updated in place and the event returned.
+    """
+    from_status = order.status
+    if not can_transition(from_status, to_status):
+        raise InvalidTransition(f'Invalid status transition from {from_status} to {to_status}')
+
+    now = timezone.now()
+    changes = {'status': to_status, 'updated_at': now}
+    if to_status == Status.DELIVERED:
+        changes['actual_delivery_time'] = now
+
+    with transaction.atomic():
+        estimate = eta.estimate_many([order], to_status, now).get(order.pk)
+        if estimate is not None:
+            changes['estimated_delivery_time'] = estimate
+        updated = Order.objects.filter(pk=order.pk, status=from_status).update(**changes)
+        if not updated:
+            current = Order.objects.filter(pk=order.pk).values_list('status', flat=True).first()
+            raise TransitionConflict(current)
+        event = OrderStatusEvent.objects.create(
+            order_id=order.pk,
+            from_status=from_status,
+            to_status=to_status,
+            actor=actor,
+            source=source,
+            created_at=now,
+        )
+        for field, value in changes.items():
+            setattr(order, field, value)
+        outbox.record(order, OrderOutboxEvent.Kind.STATUS, to_status)
+        transaction.on_commit(lambda: _status_changed(order))
+
+    return event
+
+
+def transition_many(queryset, to_status, actor=None, source=OrderStatusEvent.Source.ADMIN,
+                    chunk_size=BULK_CHUNK_SIZE):
+    """
+    Apply ``to_status`` to every order in ``queryset`` that allows it.
+
+    Works set-based in chunks of ``chunk_size`` orders: each chunk is one
+    locking SELECT, one UPDATE per source status, one INSERT of events and
+    one batch for the outbox, in its own transaction. Rows locked by a
+    concurrent transition are skipped. Returns the number of orders moved.
+    """
+    sources = sources_for(to_status)
+    moved = 0
+    last_id = 0
+    while True:
+        with transaction.atomic():
+            orders = list(
+                queryset.filter(status__in=sources, id__gt=last_id)
+                .select_for_update(skip_locked=True, of=('self',))
+                .order_by('id')
+                .only('id', 'status', 'restaurant_id', 'order_type', 'estimated_delivery_time')[:chunk_size]
+            )
+            if not orders:
+                return moved
+            last_id = orders[-1].id
+            moved += _transition_chunk(orders, to_status, actor, source)
+
+
+def _transition_chunk(orders, to_status, actor, source):
+    now = timezone.now()
+    changes = {'status': to_status, 'updated_at': now}
+    if to_status == Status.DELIVERED:
+        changes['actual_delivery_time'] = now
+
+    by_status = {}
+    for order in orders:
+        by_status.setdefault(order.status, []).append(order)
+
+    estimates = eta.estimate_many(orders, to_status, now)
+    if estimates:
+        changes['estimated_delivery_time'] = Case(
+            *[When(id=order_id, then=Value(estimate)) for order_id, estimate in estimates.items()],
+            default=F('estimated_delivery_time'),
+            output_field=DateTimeField(),
+        )
+
+    moved = []
+    for from_status, group in by_status.items():
+        ids = [order.id for order in group]
+        updated = Order.objects.filter(id__in=ids, status=from_status).update(**changes)
+        if updated != len(ids):
+            # Only possible without row locks (SQLite): keep the rows this UPDATE changed
+            changed = set(
+                Order.objects.filter(id__in=ids, status=to_status, updated_at=now).values_list('id', flat=True)
+            )
+            group = [order for order in group if order.id in changed]
+        moved += group
+
+    OrderStatusEvent.objects.bulk_create(
+        OrderStatusEvent(
+            order_id=order.id,
+            from_status=order.status,
+            to_status=to_status,
+            actor=actor,
+            source=source,
+            created_at=now,
+        )
+        for order in moved
+    )
+    for order in moved:
+        order.status = to_status
+        order.updated_at = now
+        if to_status == Status.DELIVERED:
+            order.actual_delivery_time = now
+        if order.id in estimates:
+            order.estimated_delivery_time = estimates[order.id]
+    outbox.record_many([order.id for order in moved], OrderOutboxEvent.Kind.STATUS, to_status)
+    transaction.on_commit(lambda: _statuses_changed(moved))
+    return len(moved)
+
+
+def _statuses_changed(orders):
+    for order in orders:
+        _status_changed(order)
+
+
+def _status_changed(order):
+    from .tasks import handle_order_cancellation
+
+    publish_order_event('status', order)
+    if order.status == Status.CANCELLED:
+        handle_order_cancellation.delay(order.pk)
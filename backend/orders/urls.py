@@ -1,5 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from .streams import order_stream
 from .views import OrderViewSet, OrderItemViewSet
 
 router = DefaultRouter()
@@ -7,5 +8,6 @@ router.register(r'', OrderViewSet, basename='order')
 router.register(r'items', OrderItemViewSet, basename='order-item')
 
 urlpatterns = [
+    path('<int:pk>/stream/', order_stream, name='order-stream'),
     path('', include(router.urls)),
 ]
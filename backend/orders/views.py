@@ -1,25 +1,132 @@
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from django.http import Http404
 from django.shortcuts import get_object_or_404
+from django.utils.dateparse import parse_datetime
 from decimal import Decimal
-from .models import Order, OrderItem
-from .serializers import OrderSerializer, OrderItemSerializer
+from .models import Order, OrderItem, OrderStatusEvent
+from .serializers import ArchivedOrderSerializer, OrderSerializer, OrderItemSerializer, OrderCreateSerializer
+from .services import OrderPlacementError, place_order
+from . import admission, archive
+from .admission import AdmissionRejected
 from .permissions import IsOrderOwnerOrRestaurantOwner, CanModifyOrderStatus
-from .tasks import handle_order_cancellation
+from .transitions import InvalidTransition, TransitionConflict, TRACKING_STEPS, transition
 from promotions.models import Promotion
+from config.pagination import KeysetPagination
+from config.fieldsets import SparseFieldsetMixin
+from idempotency.keys import idempotent
 
 
-class OrderViewSet(viewsets.ModelViewSet):
+def serialize_history(entries):
+    """Serialize ``archive.history`` entries, flagging each with ``archived``."""
+    results = []
+    for archived, order in entries:
+        if archived:
+            results.append(ArchivedOrderSerializer(order).data)
+        else:
+            results.append(dict(OrderSerializer(order).data, archived=False))
+    return results
+
+
+def history_page(request, live=True, **filters):
+    """One ``{results, next_before}`` page of ``archive.history`` for ``filters``."""
+    try:
+        page_size = min(int(request.query_params.get('page_size', 20)), 100)
+    except ValueError:
+        page_size = 20
+    page_size = max(page_size, 1)
+    
+    before = request.query_params.get('before')
+    if before:
+        created_at, _, order_id = before.rpartition('_')
+        created_at = parse_datetime(created_at)
+        if created_at is None or not order_id.isdigit():
+            return Response(
+                {'error': 'before must be a next_before value from a previous page'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        before = (created_at, int(order_id))
+    
+    entries = archive.history(page_size + 1, before=before or None, live=live, **filters)
+    
+    next_before = None
+    if len(entries) > page_size:
+        last = entries[page_size - 1][1]
+        next_before = f'{last.created_at.isoformat()}_{last.id}'
+    return Response({'results': serialize_history(entries[:page_size]), 'next_before': next_before})
+
+
+class OrderViewSet(SparseFieldsetMixin, viewsets.ModelViewSet):
     queryset = Order.objects.all()
     serializer_class = OrderSerializer
     permission_classes = [permissions.IsAuthenticated, IsOrderOwnerOrRestaurantOwner]
+    pagination_class = KeysetPagination
     
     def get_permissions(self):
         if self.action == 'update_status':
             return [permissions.IsAuthenticated(), CanModifyOrderStatus()]
         return super().get_permissions()
     
+    def retrieve(self, request, *args, **kwargs):
+        """Get an order, falling back to the archive for old ones"""
+        try:
+            return super().retrieve(request, *args, **kwargs)
+        except Http404:
+            archived = archive.find(kwargs['pk']) if str(kwargs['pk']).isdigit() else None
+            if archived is None:
+                raise
+        self.check_object_permissions(request, archived)
+        return Response(ArchivedOrderSerializer(archived).data)
+    
+    @action(detail=False, methods=['get'])
+    def history(self, request):
+        """
+        The user's live and archived orders, newest first.
+        
+        ?page_size= (max 100) and ?before=<next_before of the previous page>
+        """
+        return history_page(request, user=request.user)
+    
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        """Place an order from a cart, pricing it from the menu"""
+        serializer = OrderCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        
+        # Throttle per restaurant before any database write
+        try:
+            ticket = admission.admit(data['restaurant'])
+        except AdmissionRejected as exc:
+            return Response(
+                {'error': str(exc), 'load': exc.load, 'retry_after': exc.retry_after},
+                status=status.HTTP_429_TOO_MANY_REQUESTS,
+                headers={'Retry-After': str(exc.retry_after)}
+            )
+        
+        try:
+            order = place_order(
+                request.user,
+                data['restaurant'],
+                data['order_type'],
+                data['items'],
+                delivery_address=data['delivery_address'],
+                delivery_instructions=data['delivery_instructions'],
+                eta_delay=ticket.delay,
+            )
+        except OrderPlacementError as exc:
+            admission.release(ticket)
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception:
+            # Whatever failed, the order was not placed; do not count it
+            admission.release(ticket)
+            raise
+        
+        response_data = self.get_serializer(order).data
+        response_data['admission'] = {'status': ticket.status, **ticket.load}
+        return Response(response_data, status=status.HTTP_201_CREATED)
+    
     @action(detail=True, methods=['post'])
     def apply_promo(self, request, pk=None):
         """Apply promo code to order"""
@@ -80,7 +187,7 @@ class OrderViewSet(viewsets.ModelViewSet):
         # Update order
         order.discount = discount
         order.total = order.subtotal + order.tax + order.delivery_fee - order.discount
-        order.save()
+        order.save(update_fields=['discount', 'total', 'updated_at'])
         
         # Increment promo usage
         promotion.current_uses += 1
@@ -100,17 +207,15 @@ class OrderViewSet(viewsets.ModelViewSet):
         order = self.get_object()
         
         # Can only cancel pending or confirmed orders
-        if order.status not in ['PENDING', 'CONFIRMED']:
+        try:
+            transition(order, Order.Status.CANCELLED, actor=request.user, source=OrderStatusEvent.Source.CUSTOMER)
+        except InvalidTransition:
             return Response(
                 {'error': 'Can only cancel pending or confirmed orders'},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        
-        order.status = 'CANCELLED'
-        order.save()
-        
-        # Trigger cancellation tasks
-        handle_order_cancellation.delay(order.id)
+        except TransitionConflict as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_409_CONFLICT)
         
         return Response({'message': 'Order cancelled successfully'})
     
@@ -126,24 +231,12 @@ class OrderViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Validate status transition
-        valid_transitions = {
-            'PENDING': ['CONFIRMED', 'CANCELLED'],
-            'CONFIRMED': ['PREPARING', 'CANCELLED'],
-            'PREPARING': ['READY'],
-            'READY': ['OUT_FOR_DELIVERY', 'COMPLETED'],
-            'OUT_FOR_DELIVERY': ['DELIVERED'],
-            'DELIVERED': ['COMPLETED'],
-        }
-        
-        if new_status not in valid_transitions.get(order.status, []):
-            return Response(
-                {'error': f'Invalid status transition from {order.status} to {new_status}'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        order.status = new_status
-        order.save()
+        try:
+            transition(order, new_status, actor=request.user, source=OrderStatusEvent.Source.RESTAURANT)
+        except InvalidTransition as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        except TransitionConflict as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_409_CONFLICT)
         
         serializer = self.get_serializer(order)
         return Response(serializer.data)
@@ -152,27 +245,26 @@ class OrderViewSet(viewsets.ModelViewSet):
     def track(self, request, pk=None):
         """Track order in real-time"""
         order = self.get_object()
+        events = list(order.status_events.values('to_status', 'created_at'))
         
-        status_steps = [
-            'PENDING', 'CONFIRMED', 'PREPARING', 'READY', 
-            'OUT_FOR_DELIVERY', 'DELIVERED', 'COMPLETED'
-        ]
-        
-        current_index = status_steps.index(order.status) if order.status in status_steps else 0
+        current_index = TRACKING_STEPS.index(order.status) if order.status in TRACKING_STEPS else 0
         
         return Response({
             'order_id': order.id,
             'order_number': order.order_number,
             'status': order.status,
             'current_step': current_index + 1,
-            'total_steps': len(status_steps),
+            'total_steps': len(TRACKING_STEPS),
             'estimated_delivery_time': order.estimated_delivery_time,
             'created_at': order.created_at,
-            'updated_at': order.updated_at,
+            'status_changed_at': events[-1]['created_at'] if events else order.created_at,
+            'history': [{'status': Order.Status.PENDING, 'at': order.created_at}] + [
+                {'status': event['to_status'], 'at': event['created_at']} for event in events
+            ],
         })
 
 
-class OrderItemViewSet(viewsets.ModelViewSet):
+class OrderItemViewSet(SparseFieldsetMixin, viewsets.ModelViewSet):
     queryset = OrderItem.objects.all()
     serializer_class = OrderItemSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
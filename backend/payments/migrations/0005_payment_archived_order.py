@@ -0,0 +1,41 @@
+# Generated by Django 5.1.14 on 2026-10-18 05:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import F
+
+
+def repoint_archived_payments(apps, schema_editor):
+    Payment = apps.get_model('payments', 'Payment')
+    Order = apps.get_model('orders', 'Order')
+    ArchivedOrder = apps.get_model('orders', 'ArchivedOrder')
+    Payment.objects.filter(order_id__in=ArchivedOrder.objects.values('id')).update(
+        archived_order_id=F('order_id'), order_id=None,
+    )
+    # Payments of orders deleted while the foreign key had no constraint;
+    # the CASCADE restored next would have removed them with their order
+    Payment.objects.filter(archived_order__isnull=True).exclude(
+        order_id__in=Order.objects.values('id'),
+    ).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0008_order_archive'),
+        ('payments', '0004_payment_order_without_constraint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payment',
+            name='archived_order',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='payments', to='orders.archivedorder'),
+        ),
+        migrations.AlterField(
+            model_name='payment',
+            name='order',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='payments', to='orders.order'),
+        ),
+        migrations.RunPython(repoint_archived_payments, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.14 on 2026-10-18 05:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0008_order_archive'),
+        ('payments', '0005_payment_archived_order'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='payment',
+            name='order',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='payments', to='orders.order'),
+        ),
+        migrations.AddConstraint(
+            model_name='payment',
+            constraint=models.CheckConstraint(condition=models.Q(models.Q(('archived_order__isnull', True), ('order__isnull', False)), models.Q(('archived_order__isnull', False), ('order__isnull', True)), _connector='OR'), name='payment_live_or_archived_order'),
+        ),
+    ]
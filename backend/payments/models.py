@@ -1,7 +1,7 @@
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 from users.models import User
-from orders.models import Order
+from orders.models import ArchivedOrder, Order
 
 
 class Payment(models.Model):
@@ -21,7 +21,14 @@ class Payment(models.Model):
         STRIPE = 'STRIPE', _('Stripe')
     
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='payments')
-    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='payments')
+    # Exactly one is set: the archive mover re-points a payment from its
+    # order to the archived copy (see ``orders.archive``)
+    order = models.ForeignKey(
+        Order, on_delete=models.CASCADE, blank=True, null=True, related_name='payments'
+    )
+    archived_order = models.ForeignKey(
+        ArchivedOrder, on_delete=models.CASCADE, blank=True, null=True, editable=False, related_name='payments'
+    )
     
     transaction_id = models.CharField(_('transaction ID'), max_length=255, unique=True)
     amount = models.DecimalField(_('amount'), max_digits=10, decimal_places=2)
@@ -42,6 +49,15 @@ class Payment(models.Model):
         indexes = [
             models.Index(fields=['transaction_id']),
             models.Index(fields=['user', 'status']),
+            models.Index(fields=['created_at', 'id']),
+            models.Index(fields=['user', 'created_at', 'id']),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(order__isnull=False, archived_order__isnull=True)
+                | models.Q(order__isnull=True, archived_order__isnull=False),
+                name='payment_live_or_archived_order',
+            ),
         ]
     
     def __str__(self):
@@ -1,9 +1,12 @@
 from rest_framework import serializers
+from config.fieldsets import DynamicFieldsMixin
 from .models import Payment
 
 
-class PaymentSerializer(serializers.ModelSerializer):
+class PaymentSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Payment
         fields = '__all__'
-        read_only_fields = ['id', 'created_at', 'updated_at', 'transaction_id']
+        read_only_fields = ['id', 'created_at', 'updated_at', 'transaction_id', 'archived_order']
+        # Only the archive mover leaves a payment without a live order
+        extra_kwargs = {'order': {'required': True, 'allow_null': False}}
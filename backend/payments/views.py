@@ -1,9 +1,17 @@
 from rest_framework import viewsets, permissions
 from .models import Payment
 from .serializers import PaymentSerializer
+from config.pagination import KeysetPagination
+from config.fieldsets import SparseFieldsetMixin
+from idempotency.keys import idempotent
 
 
-class PaymentViewSet(viewsets.ModelViewSet):
+class PaymentViewSet(SparseFieldsetMixin, viewsets.ModelViewSet):
     queryset = Payment.objects.all()
     serializer_class = PaymentSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    pagination_class = KeysetPagination
+    
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Table, Reservation
+from .models import Table, Reservation, WaitlistEntry
 
 
 @admin.register(Table)
@@ -26,7 +26,7 @@ class ReservationAdmin(admin.ModelAdmin):
     list_display = ('reservation_number', 'user', 'restaurant', 'reservation_date', 'reservation_time', 'guest_count', 'status', 'created_at')
     list_filter = ('status', 'reservation_date', 'restaurant', 'created_at')
     search_fields = ('reservation_number', 'user__email', 'restaurant__name')
-    ordering = ('-reservation_date', '-reservation_time')
+    ordering = ('-reservation_at',)
     raw_id_fields = ('user', 'restaurant', 'table')
     readonly_fields = ('reservation_number', 'created_at', 'updated_at')
     
@@ -45,27 +45,45 @@ class ReservationAdmin(admin.ModelAdmin):
     
     actions = ['confirm_reservations', 'cancel_reservations', 'mark_seated', 'mark_completed', 'mark_no_show']
     
+    def _set_status(self, queryset, new_status):
+        # save() per row so slot claims, the slot grid and reminders follow
+        updated = 0
+        for reservation in queryset.exclude(status=new_status):
+            reservation.status = new_status
+            reservation.save(update_fields=['status', 'updated_at'])
+            updated += 1
+        return updated
+    
     def confirm_reservations(self, request, queryset):
-        updated = queryset.update(status='CONFIRMED')
+        updated = self._set_status(queryset, 'CONFIRMED')
         self.message_user(request, f'{updated} reservation(s) confirmed.')
     confirm_reservations.short_description = "Confirm Reservations"
     
     def cancel_reservations(self, request, queryset):
-        updated = queryset.update(status='CANCELLED')
+        updated = self._set_status(queryset, 'CANCELLED')
         self.message_user(request, f'{updated} reservation(s) cancelled.')
     cancel_reservations.short_description = "Cancel Reservations"
     
     def mark_seated(self, request, queryset):
-        updated = queryset.update(status='SEATED')
+        updated = self._set_status(queryset, 'SEATED')
         self.message_user(request, f'{updated} reservation(s) marked as seated.')
     mark_seated.short_description = "Mark as Seated"
     
     def mark_completed(self, request, queryset):
-        updated = queryset.update(status='COMPLETED')
+        updated = self._set_status(queryset, 'COMPLETED')
         self.message_user(request, f'{updated} reservation(s) marked as completed.')
     mark_completed.short_description = "Mark as Completed"
     
     def mark_no_show(self, request, queryset):
-        updated = queryset.update(status='NO_SHOW')
+        updated = self._set_status(queryset, 'NO_SHOW')
         self.message_user(request, f'{updated} reservation(s) marked as no-show.')
     mark_no_show.short_description = "Mark as No-Show"
+
+
+@admin.register(WaitlistEntry)
+class WaitlistEntryAdmin(admin.ModelAdmin):
+    list_display = ('restaurant', 'user', 'reservation_date', 'reservation_time', 'guest_count', 'status', 'created_at')
+    list_filter = ('status', 'reservation_date', 'restaurant')
+    search_fields = ('user__email', 'restaurant__name')
+    raw_id_fields = ('user', 'restaurant', 'reservation')
+    readonly_fields = ('slot', 'promoted_at', 'created_at')
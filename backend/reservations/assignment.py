@@ -0,0 +1,187 @@
+"""
+Table assignment for reservations.
+
+A booking without a table gets the best-fit seating that is free for its
+whole duration: the smallest table that seats the party or, for a party
+no single free table seats, the tightest combination of tables from one
+combine group (see ``grid.seatings``). Seatings are picked from the cached
+slot grid and then claimed (see ``claims``); a seating someone else got
+first is skipped for the next best one.
+
+``repack`` re-seats a whole day at once, e.g. after tables were added,
+removed or regrouped. It reads the day's bookings and tables in two
+queries, packs them in memory on per-table slot bitmaps (largest parties
+first, each on its best free seating, keeping the current seating when it
+fits just as well) and writes the changed rows back in one bulk UPDATE.
+Seated guests and bookings of the neighbouring days stay where they are.
+Locking the day's rows does not stop a new booking from claiming a slot
+in between; its claims then collide with the repack's, and the day is
+packed again from a fresh read.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+
+from . import claims, grid
+from .models import Reservation
+
+Status = Reservation.Status
+
+MOVABLE_STATUSES = (Status.PENDING, Status.CONFIRMED)
+REPACK_ATTEMPTS = 3
+
+
+def seat(reservation):
+    """
+    Save a new reservation, on the best-fit free seating if it has no table.
+
+    Raises ``claims.SlotTaken`` when the requested table, or every free
+    seating, is already held. Restaurants that do not manage tables take
+    bookings without one.
+    """
+    if reservation.table_id is not None:
+        reservation.save()
+        return reservation
+    day_grid = grid.get_grid(reservation.restaurant_id, reservation.reservation_date)
+    if not day_grid['tables']:
+        reservation.save()
+        return reservation
+    seatings = grid.free_seatings(
+        reservation.restaurant_id,
+        reservation.reservation_date,
+        grid.slot_of(reservation.reservation_time),
+        reservation.guest_count,
+    )
+    return claims.book(reservation, seatings)
+
+
+def _mask(reservation, first_day, length):
+    """Slot bitmap of a booking on a timeline starting at ``first_day``."""
+    offset = (reservation.reservation_date - first_day).days * grid.SLOTS_PER_DAY
+    return grid.span(grid.slot_of(reservation.reservation_time) + offset, length)
+
+
+def pack(tables, fixed, movable, first_day):
+    """
+    Seat ``movable`` bookings around ``fixed`` ones, in memory.
+
+    Returns ``{reservation_id: seating or None}`` for the movable bookings.
+    """
+    length = grid.duration_slots()
+    busy = {table_id: 0 for table_id, _, _ in tables}
+    for reservation in fixed:
+        mask = _mask(reservation, first_day, length)
+        for table_id in grid.held_tables(reservation.table_id, reservation.joined_tables):
+            if table_id in busy:
+                busy[table_id] |= mask
+
+    options = {}
+    placement = {}
+    ordered = sorted(movable, key=lambda r: (-r.guest_count, r.reservation_time, r.id))
+    for reservation in ordered:
+        if reservation.guest_count not in options:
+            options[reservation.guest_count] = grid.seatings(tables, reservation.guest_count)
+        mask = _mask(reservation, first_day, length)
+        current = grid.held_tables(reservation.table_id, reservation.joined_tables)
+        chosen = None
+        for seating in options[reservation.guest_count]:
+            if all(not busy[table_id] & mask for table_id in seating):
+                chosen = seating
+                break
+        if chosen is not None and set(current) != set(chosen) and _fits_as_well(current, chosen, tables, busy, mask):
+            chosen = current
+        if chosen is not None:
+            for table_id in chosen:
+                busy[table_id] |= mask
+        placement[reservation.id] = chosen
+    return placement
+
+
+def _fits_as_well(current, chosen, tables, busy, mask):
+    """Whether the current seating is free and wastes no more seats than ``chosen``."""
+    capacities = {table_id: capacity for table_id, capacity, _ in tables}
+    if current[0] is None or any(table_id not in capacities or busy[table_id] & mask for table_id in current):
+        return False
+    groups = {group for table_id, _, group in tables if table_id in current}
+    if len(current) > 1 and (len(groups) != 1 or '' in groups):
+        return False
+    return (
+        (sum(capacities[table_id] for table_id in current), len(current))
+        <= (sum(capacities[table_id] for table_id in chosen), len(chosen))
+    )
+
+
+def repack(restaurant_id, day):
+    """
+    Re-seat the pending and confirmed bookings of ``day``.
+
+    Returns ``{'moved': n, 'unseated': [reservation ids]}``; bookings that
+    no longer fit anywhere lose their table so the restaurant can follow up.
+    Raises ``claims.SlotTaken`` if new bookings kept taking the slots it
+    picked for ``REPACK_ATTEMPTS`` tries.
+    """
+    for _ in range(REPACK_ATTEMPTS):
+        try:
+            return _repack(restaurant_id, day)
+        except claims.SlotTaken:
+            # Rolled back; the next try sees the new booking as fixed
+            continue
+    raise claims.SlotTaken('Bookings kept changing while re-seating; try again')
+
+
+def _repack(restaurant_id, day):
+    with transaction.atomic():
+        tables = grid.tables_of(restaurant_id)
+        # The day's bookings plus everything they could collide with: those
+        # spilling in from the day before and those starting while the
+        # day's last bookings still hold their tables
+        start, end = grid.day_bounds(day, day)
+        active = Reservation.objects.filter(restaurant_id=restaurant_id, status__in=grid.ACTIVE_STATUSES)
+        reservations = list(
+            grid.overlapping(active, start, end + grid.duration())
+            .select_for_update()
+            .only('id', 'restaurant_id', 'table_id', 'joined_tables', 'reservation_date', 'reservation_time',
+                  'guest_count', 'status')
+        )
+        movable = [r for r in reservations if r.reservation_date == day and r.status in MOVABLE_STATUSES]
+        moving = {r.id for r in movable}
+        fixed = [r for r in reservations if r.id not in moving and r.table_id is not None]
+        placement = pack(tables, fixed, movable, day - timedelta(days=1))
+
+        changed = []
+        touched = []
+        for reservation in movable:
+            seating = placement[reservation.id]
+            current = grid.held_tables(reservation.table_id, reservation.joined_tables)
+            if seating is not None and seating == current:
+                continue
+            if seating is None and reservation.table_id is None:
+                continue
+            if reservation.table_id is not None:
+                touched.extend((table_id, day, reservation.reservation_time) for table_id in current)
+            reservation.table_id = seating[0] if seating else None
+            reservation.joined_tables = list(seating[1:]) if seating else []
+            if seating:
+                touched.extend((table_id, day, reservation.reservation_time) for table_id in seating)
+            changed.append(reservation)
+
+        if changed:
+            # bulk_update skips the model signals, so move the claims and patch the grid here
+            Reservation.objects.bulk_update(changed, ['table', 'joined_tables'])
+            claims.release([reservation.id for reservation in changed])
+            claims.claim([
+                claim
+                for reservation in changed if reservation.table_id is not None
+                for claim in claims.build_claims(
+                    reservation.id,
+                    grid.held_tables(reservation.table_id, reservation.joined_tables),
+                    day,
+                    reservation.reservation_time,
+                )
+            ])
+            grid.touch(restaurant_id, touched)
+
+    return {
+        'moved': len(changed),
+        'unseated': [reservation.id for reservation in movable if placement[reservation.id] is None],
+    }
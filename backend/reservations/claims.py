@@ -0,0 +1,87 @@
+"""
+Slot claims: the guarantee that a table is never booked twice.
+
+Every active reservation with a table owns one ``TableSlotClaim`` row per
+table and slot it holds, and ``(table, date, slot)`` is unique. A
+reservation's claims are written in the same transaction as the
+reservation itself (see the ``post_save`` handler and ``Reservation.save``),
+so of two concurrent bookings of overlapping slots the unique index lets
+exactly one commit; the other gets an ``IntegrityError``, raised as
+``SlotTaken``, and its INSERT is rolled back. Nothing is locked beyond the
+index entries involved, so bookings of other tables or times never wait on
+each other. The same unique index works on PostgreSQL and SQLite.
+
+The cached slot grid only decides which seating to try first; the claims
+decide whether it is really free.
+"""
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from . import grid
+from .models import TableSlotClaim
+
+BOOKING_ATTEMPTS = 5
+
+
+class SlotTaken(Exception):
+    """Another booking already holds one of the table slots."""
+
+    def __init__(self, message='No tables available for this time slot'):
+        super().__init__(message)
+
+
+def build_claims(reservation_id, table_ids, day, reserved_at):
+    return [
+        TableSlotClaim(table_id=table_id, reservation_id=reservation_id, date=claimed_on, slot=slot)
+        for table_id in table_ids
+        for claimed_on, slot in grid.held_slots(day, reserved_at)
+    ]
+
+
+def claim(claims):
+    """Insert ``claims``; raises ``SlotTaken`` and leaves nothing behind if any slot is held."""
+    try:
+        with transaction.atomic():
+            TableSlotClaim.objects.bulk_create(claims)
+    except IntegrityError:
+        raise SlotTaken()
+
+
+def release(reservation_ids):
+    TableSlotClaim.objects.filter(reservation_id__in=reservation_ids).delete()
+
+
+def sync(reservation_id, held):
+    """Replace a reservation's claims with those of ``held`` (``grid`` slot tuple or ``None``)."""
+    release([reservation_id])
+    if held is not None:
+        _, table_ids, day, reserved_at = held
+        claim(build_claims(reservation_id, table_ids, grid.as_date(day), reserved_at))
+
+
+def book(reservation, seatings):
+    """
+    Save a new reservation on the first of ``seatings`` whose slots can be claimed.
+
+    Raises ``SlotTaken`` if every seating (at most ``BOOKING_ATTEMPTS``) is taken.
+    """
+    for table_ids in seatings[:BOOKING_ATTEMPTS]:
+        reservation.table_id = table_ids[0]
+        reservation.joined_tables = list(table_ids[1:])
+        try:
+            reservation.save()
+            return reservation
+        except SlotTaken:
+            # The INSERT was rolled back together with the claims
+            reservation.pk = None
+            reservation._state.adding = True
+    raise SlotTaken()
+
+
+def purge(before=None):
+    """Delete claims of days that are over; returns how many were removed."""
+    before = before or timezone.localdate() - timedelta(days=1)
+    deleted, _ = TableSlotClaim.objects.filter(date__lt=before).delete()
+    return deleted
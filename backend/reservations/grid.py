@@ -0,0 +1,427 @@
+"""
+Per-restaurant, per-day reservation slot grid.
+
+A day is cut into ``SLOT_MINUTES`` slots and every table gets an integer
+bitmap of the slots held by its active reservations; a reservation holds
+``RESERVATION_DURATION_MINUTES`` from its start, spilling into the next
+day's bitmap when it runs past midnight. A day's grid (the restaurant's
+available tables with their capacity, plus the bitmaps) is built from one
+query and cached, so availability, the day's free start times, the next
+free slot and month calendars are shifts and ANDs over the tables instead
+of a scan of the restaurant's reservation history. Large parties can be
+seated at several tables of the same combine group; ``seatings`` lists the
+options best fit first, which is also what table assignment picks from.
+
+The cache stays current incrementally: once a reservation write commits,
+the rows of the tables it touched are recomputed and written into a new
+generation of the grid under a short lock. If the lock is busy, or another
+write got in between, the generation is bumped without a grid and the next
+read rebuilds the day. Table changes bump a per-restaurant version that
+invalidates every day at once.
+"""
+import time as time_module
+from calendar import monthrange
+from collections import defaultdict
+from datetime import date as date_type, datetime, time, timedelta
+from itertools import combinations
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from config import versioned_cache
+from restaurants.hours import MINUTES_PER_DAY, build_intervals
+
+from .models import Reservation, Table, reservation_duration
+
+SLOT_MINUTES = 15
+SLOTS_PER_DAY = MINUTES_PER_DAY // SLOT_MINUTES
+DAY_MASK = (1 << SLOTS_PER_DAY) - 1
+ACTIVE_STATUSES = (Reservation.Status.PENDING, Reservation.Status.CONFIRMED, Reservation.Status.SEATED)
+NEXT_AVAILABLE_DAYS = 14
+LOCK_TIMEOUT = 10
+
+CACHE_PREFIX = 'reservation-grid'
+GENERATION_KEY = 'reservation-grid-generation:{restaurant_id}:{day}'
+GRID_KEY = 'reservation-grid:{restaurant_id}:{version}:{day}:{generation}'
+LOCK_KEY = 'reservation-grid-lock:{restaurant_id}:{day}'
+
+
+def _timeout():
+    return getattr(settings, 'RESERVATION_GRID_CACHE_TIMEOUT', 24 * 60 * 60)
+
+
+def duration():
+    return reservation_duration()
+
+
+def duration_slots():
+    return max(1, -(-int(duration().total_seconds()) // (SLOT_MINUTES * 60)))
+
+
+def slot_of(value):
+    """The slot a ``time`` (or ``HH:MM[:SS]`` string) falls in."""
+    if isinstance(value, str):
+        value = time.fromisoformat(value)
+    return (value.hour * 60 + value.minute) // SLOT_MINUTES
+
+
+def time_of(slot):
+    minutes = slot * SLOT_MINUTES
+    return time(minutes // 60, minutes % 60)
+
+
+def span(slot, length=None):
+    """Bitmap of the slots a reservation starting at ``slot`` holds; may run past the day."""
+    length = duration_slots() if length is None else length
+    return ((1 << length) - 1) << slot
+
+
+def held_slots(day, reserved_at, length=None):
+    """``(date, slot)`` of every slot a reservation starting at ``reserved_at`` on ``day`` holds."""
+    length = duration_slots() if length is None else length
+    start = slot_of(reserved_at)
+    return [
+        (day + timedelta(days=slot // SLOTS_PER_DAY), slot % SLOTS_PER_DAY)
+        for slot in range(start, start + length)
+    ]
+
+
+def as_date(value):
+    return date_type.fromisoformat(value) if isinstance(value, str) else value
+
+
+# Versions and generations
+
+def get_version(restaurant_id):
+    """Return the current table version of a restaurant."""
+    return versioned_cache.get_version(CACHE_PREFIX, restaurant_id)
+
+
+def bump_version(restaurant_id):
+    """Invalidate every cached day of a restaurant once the write commits."""
+    versioned_cache.bump_version(CACHE_PREFIX, restaurant_id)
+
+
+def _generation_keys(restaurant_id, days):
+    return {day: GENERATION_KEY.format(restaurant_id=restaurant_id, day=day.isoformat()) for day in days}
+
+
+def _generations(restaurant_id, days):
+    """Current generation of each day, in one round trip; missing ones are minted."""
+    keys = _generation_keys(restaurant_id, days)
+    found = cache.get_many(list(keys.values()))
+    generations = {}
+    for day, key in keys.items():
+        generation = found.get(key)
+        if generation is None:
+            # Never restart from a number an evicted counter may have used
+            generation = time_module.time_ns()
+            if not cache.add(key, generation, _timeout()):
+                generation = cache.get(key, generation)
+        generations[day] = generation
+    return generations
+
+
+def _advance(key):
+    """Bump a day's generation and return the new one."""
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.add(key, time_module.time_ns(), _timeout())
+        return None
+
+
+def _grid_key(restaurant_id, version, day, generation):
+    return GRID_KEY.format(restaurant_id=restaurant_id, version=version, day=day.isoformat(), generation=generation)
+
+
+# Building
+
+def held_tables(table_id, joined_tables):
+    """Every table a reservation holds: its ``table`` plus any joined to it."""
+    return (table_id, *(joined_tables or ()))
+
+
+def _occupancy(rows, days):
+    """Fold ``(table_id, joined_tables, date, time)`` rows into ``{day: {table_id: bitmap}}`` for ``days``."""
+    length = duration_slots()
+    busy = {day: defaultdict(int) for day in days}
+    for table_id, joined_tables, reserved_on, reserved_at in rows:
+        bits = span(slot_of(reserved_at), length)
+        spill = bits >> SLOTS_PER_DAY
+        following = reserved_on + timedelta(days=1)
+        for held in held_tables(table_id, joined_tables):
+            if reserved_on in busy:
+                busy[reserved_on][held] |= bits & DAY_MASK
+            if spill and following in busy:
+                busy[following][held] |= spill
+    return busy
+
+
+def day_bounds(first, last):
+    """Aware ``[start, end)`` covering the days ``first`` through ``last``."""
+    start = timezone.make_aware(datetime.combine(first, time.min))
+    end = timezone.make_aware(datetime.combine(last + timedelta(days=1), time.min))
+    return start, end
+
+
+def overlapping(queryset, start, end):
+    """Bookings of ``queryset`` that overlap ``[start, end)``, as a range scan on ``reservation_at``."""
+    # Every booking lasts duration(), so the start bound keeps the scan tight
+    return queryset.filter(reservation_at__gte=start - duration(), reservation_at__lt=end, ends_at__gt=start)
+
+
+def _reservation_rows(restaurant_id, first, last):
+    """Active, seated-at-a-table reservations overlapping the days ``first`` through ``last``."""
+    queryset = Reservation.objects.filter(restaurant_id=restaurant_id, status__in=ACTIVE_STATUSES, table__isnull=False)
+    return overlapping(queryset, *day_bounds(first, last)).values_list(
+        'table_id', 'joined_tables', 'reservation_date', 'reservation_time',
+    )
+
+
+def tables_of(restaurant_id):
+    """``[(id, capacity, combine_group)]`` of the restaurant's bookable tables, smallest first."""
+    return list(
+        Table.objects
+        .filter(restaurant_id=restaurant_id, is_available=True)
+        .order_by('capacity', 'id')
+        .values_list('id', 'capacity', 'combine_group')
+    )
+
+
+def build(restaurant_id, days):
+    """Build the grids of ``days`` from two queries, by day."""
+    days = sorted(set(days))
+    tables = tables_of(restaurant_id)
+    busy = _occupancy(_reservation_rows(restaurant_id, days[0], days[-1]), days)
+    return {
+        day: {
+            'tables': tables,
+            'busy': {table_id: busy[day][table_id] for table_id, _, _ in tables if busy[day].get(table_id)},
+        }
+        for day in days
+    }
+
+
+def get_grids(restaurant_id, days):
+    """The grids of ``days`` by day: one cache round trip, one build for all misses."""
+    days = sorted(set(days))
+    version = get_version(restaurant_id)
+    generations = _generations(restaurant_id, days)
+    keys = {day: _grid_key(restaurant_id, version, day, generations[day]) for day in days}
+    found = cache.get_many(list(keys.values()))
+    grids = {day: found[key] for day, key in keys.items() if key in found}
+
+    missing = [day for day in days if day not in grids]
+    if missing:
+        built = build(restaurant_id, missing)
+        cache.set_many({keys[day]: built[day] for day in missing}, _timeout())
+        grids.update(built)
+    return grids
+
+
+def get_grid(restaurant_id, day):
+    return get_grids(restaurant_id, [day])[day]
+
+
+# Incremental maintenance
+
+def refresh(restaurant_id, day, table_ids):
+    """Recompute the rows of ``table_ids`` in the cached grid of ``day``."""
+    generation_key = _generation_keys(restaurant_id, [day])[day]
+    lock_key = LOCK_KEY.format(restaurant_id=restaurant_id, day=day.isoformat())
+    if not cache.add(lock_key, 1, LOCK_TIMEOUT):
+        # Another write is patching this day; make the next read rebuild it
+        _advance(generation_key)
+        return
+    try:
+        version = get_version(restaurant_id)
+        generation = cache.get(generation_key)
+        grid = None if generation is None else cache.get(_grid_key(restaurant_id, version, day, generation))
+        if grid is not None:
+            # The day's bookings are one small query; joined tables rule out a table_id filter
+            busy = _occupancy(_reservation_rows(restaurant_id, day, day), [day])[day]
+            grid = {'tables': grid['tables'], 'busy': dict(grid['busy'])}
+            for table_id in table_ids:
+                grid['busy'].pop(table_id, None)
+                if busy.get(table_id):
+                    grid['busy'][table_id] = busy[table_id]
+        advanced = _advance(generation_key)
+        # A generation that moved under us means a write we did not see
+        if grid is not None and advanced == generation + 1:
+            cache.set(_grid_key(restaurant_id, version, day, advanced), grid, _timeout())
+    finally:
+        cache.delete(lock_key)
+
+
+def touch(restaurant_id, entries):
+    """
+    Refresh the grid once the current transaction commits, for ``entries``
+    of ``(table_id, date, time)`` that were added, moved or released.
+    """
+    length = duration_slots()
+    tables_by_day = defaultdict(set)
+    for table_id, reserved_on, reserved_at in entries:
+        if table_id is None:
+            continue
+        reserved_on = as_date(reserved_on)
+        tables_by_day[reserved_on].add(table_id)
+        if slot_of(reserved_at) + length > SLOTS_PER_DAY:
+            tables_by_day[reserved_on + timedelta(days=1)].add(table_id)
+    for day, table_ids in tables_by_day.items():
+        transaction.on_commit(lambda day=day, table_ids=sorted(table_ids): refresh(restaurant_id, day, table_ids))
+
+
+# Queries
+
+def _free_starts(busy, busy_next, length):
+    """Bitmap of the slots a reservation can start at without overlapping ``busy``."""
+    combined = busy | (busy_next << SLOTS_PER_DAY)
+    blocked = 0
+    for shift in range(length):
+        blocked |= combined >> shift
+    return ~blocked & DAY_MASK
+
+
+def opening_slots(business_hours, day):
+    """
+    Bitmap of the slots of ``day`` a reservation fits in before closing.
+
+    Restaurants without parseable business hours take bookings all day.
+    """
+    intervals = build_intervals(business_hours)
+    if not intervals:
+        return DAY_MASK
+    minutes = int(duration().total_seconds() // 60)
+    day_start = day.weekday() * MINUTES_PER_DAY
+    bits = 0
+    for start, end in intervals:
+        first = max(start, day_start) - day_start
+        last = min(end - minutes, day_start + MINUTES_PER_DAY - 1) - day_start
+        if last < first:
+            continue
+        first_slot = -(-first // SLOT_MINUTES)
+        last_slot = last // SLOT_MINUTES
+        if last_slot >= first_slot:
+            bits |= ((1 << (last_slot - first_slot + 1)) - 1) << first_slot
+    return bits & DAY_MASK
+
+
+def max_combined_tables():
+    return getattr(settings, 'RESERVATION_MAX_COMBINED_TABLES', 3)
+
+
+def seatings(tables, guests):
+    """
+    Every way to seat ``guests``, best fit first, as tuples of table ids.
+
+    A seating is one table, or up to ``RESERVATION_MAX_COMBINED_TABLES``
+    tables of the same combine group with no table to spare. Seatings are
+    ordered by seats wasted, then by number of tables, so the first free
+    one is the best fit.
+    """
+    options = [((capacity, 1), (table_id,)) for table_id, capacity, _ in tables if capacity >= guests]
+    groups = defaultdict(list)
+    for table_id, capacity, group in tables:
+        if group:
+            groups[group].append((table_id, capacity))
+    for members in groups.values():
+        for size in range(2, min(max_combined_tables(), len(members)) + 1):
+            for combo in combinations(members, size):
+                seats = sum(capacity for _, capacity in combo)
+                # Skip combinations that would still fit without their smallest table
+                if seats >= guests and seats - min(capacity for _, capacity in combo) < guests:
+                    options.append(((seats, size), tuple(table_id for table_id, _ in combo)))
+    options.sort()
+    return [seating for _, seating in options]
+
+
+def _day_free(grids, day, guests, length):
+    """``[(seating, free start bitmap)]`` of the seatings for ``guests`` on ``day``, best fit first."""
+    grid = grids[day]
+    following = grids.get(day + timedelta(days=1), {'busy': {}})
+    free = {
+        table_id: _free_starts(grid['busy'].get(table_id, 0), following['busy'].get(table_id, 0), length)
+        for table_id, _, _ in grid['tables']
+    }
+    result = []
+    for seating in seatings(grid['tables'], guests):
+        mask = DAY_MASK
+        for table_id in seating:
+            mask &= free[table_id]
+        result.append((seating, mask))
+    return result
+
+
+def _days(first, count):
+    return [first + timedelta(days=offset) for offset in range(count)]
+
+
+def free_seatings(restaurant_id, day, slot, guests):
+    """Seatings for ``guests`` free from ``slot`` for the reservation duration, best fit first."""
+    length = duration_slots()
+    days = [day, day + timedelta(days=1)] if slot + length > SLOTS_PER_DAY else [day]
+    grids = get_grids(restaurant_id, days)
+    return [seating for seating, free in _day_free(grids, day, guests, length) if free >> slot & 1]
+
+
+def day_slots(restaurant, day, guests, after=None):
+    """``[(slot, free seatings)]`` for every bookable start slot of ``day``."""
+    length = duration_slots()
+    grids = get_grids(restaurant.id, _days(day, 2))
+    allowed = opening_slots(restaurant.business_hours, day)
+    if after is not None:
+        allowed &= DAY_MASK << after
+    tables = _day_free(grids, day, guests, length)
+    slots = []
+    for slot in range(SLOTS_PER_DAY):
+        if allowed >> slot & 1:
+            count = sum(free >> slot & 1 for _, free in tables)
+            if count:
+                slots.append((slot, count))
+    return slots
+
+
+def next_available(restaurant, day, slot, guests, horizon=NEXT_AVAILABLE_DAYS):
+    """The first ``(date, slot)`` at or after ``slot`` on ``day`` with a free table, or ``None``."""
+    length = duration_slots()
+    days = _days(day, horizon + 1)
+    grids = get_grids(restaurant.id, days)
+    for current in days[:-1]:
+        free = 0
+        for _, table_free in _day_free(grids, current, guests, length):
+            free |= table_free
+        free &= opening_slots(restaurant.business_hours, current)
+        if current == day:
+            free &= DAY_MASK << slot
+        if free:
+            return current, (free & -free).bit_length() - 1
+    return None
+
+
+def calendar(restaurant, year, month, guests, today=None):
+    """``{date: bookable start slots}`` for every day of a month, from one batched grid read."""
+    length = duration_slots()
+    count = monthrange(year, month)[1]
+    first = date_type(year, month, 1)
+    days = _days(first, count + 1)
+    grids = get_grids(restaurant.id, days)
+    result = {}
+    for current in days[:-1]:
+        free = 0
+        if today is None or current >= today:
+            for _, table_free in _day_free(grids, current, guests, length):
+                free |= table_free
+            free &= opening_slots(restaurant.business_hours, current)
+        result[current] = bin(free).count('1')
+    return result
+
+
+def parse_day(value):
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+def parse_slot(value):
+    return slot_of(datetime.strptime(value[:5], '%H:%M').time())
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.14 on 2026-10-18 05:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0004_alter_reservation_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reservation',
+            name='joined_tables',
+            field=models.JSONField(blank=True, default=list, verbose_name='joined tables'),
+        ),
+        migrations.AddField(
+            model_name='table',
+            name='combine_group',
+            field=models.CharField(blank=True, max_length=50, verbose_name='combine group'),
+        ),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 5.1.14 on 2026-10-18 05:13
+
+from datetime import timedelta
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+# Frozen here so later changes to reservations.grid do not rewrite history
+ACTIVE_STATUSES = ('PENDING', 'CONFIRMED', 'SEATED')
+SLOT_MINUTES = 15
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+
+
+def held_slots(day, reserved_at):
+    """``(date, slot)`` of every slot a booking starting at ``reserved_at`` on ``day`` holds."""
+    minutes = getattr(settings, 'RESERVATION_DURATION_MINUTES', 60)
+    length = max(1, -(-minutes // SLOT_MINUTES))
+    start = (reserved_at.hour * 60 + reserved_at.minute) // SLOT_MINUTES
+    return [
+        (day + timedelta(days=slot // SLOTS_PER_DAY), slot % SLOTS_PER_DAY)
+        for slot in range(start, start + length)
+    ]
+
+
+def backfill_claims(apps, schema_editor):
+    Reservation = apps.get_model('reservations', 'Reservation')
+    TableSlotClaim = apps.get_model('reservations', 'TableSlotClaim')
+    upcoming = Reservation.objects.filter(
+        status__in=ACTIVE_STATUSES,
+        table__isnull=False,
+        reservation_date__gte=timezone.localdate() - timedelta(days=1),
+    ).order_by('reservation_date', 'reservation_time', 'id')
+    batch = []
+    rows = upcoming.values_list('id', 'table_id', 'joined_tables', 'reservation_date', 'reservation_time')
+    for reservation_id, table_id, joined_tables, reserved_on, reserved_at in rows.iterator(chunk_size=2000):
+        for held in (table_id, *(joined_tables or ())):
+            for day, slot in held_slots(reserved_on, reserved_at):
+                batch.append(TableSlotClaim(table_id=held, reservation_id=reservation_id, date=day, slot=slot))
+        if len(batch) >= 2000:
+            # Existing double bookings keep the earlier booking's claim
+            TableSlotClaim.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    if batch:
+        TableSlotClaim.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0005_table_combining'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TableSlotClaim',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='date')),
+                ('slot', models.PositiveSmallIntegerField(verbose_name='slot')),
+                ('reservation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slot_claims', to='reservations.reservation')),
+                ('table', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slot_claims', to='reservations.table')),
+            ],
+            options={
+                'verbose_name': 'table slot claim',
+                'verbose_name_plural': 'table slot claims',
+                'db_table': 'reservation_slot_claims',
+                'indexes': [models.Index(fields=['date'], name='slot_claim_date_idx')],
+                'constraints': [models.UniqueConstraint(fields=('table', 'date', 'slot'), name='unique_table_slot_claim')],
+            },
+        ),
+        migrations.RunPython(backfill_claims, migrations.RunPython.noop),
+    ]
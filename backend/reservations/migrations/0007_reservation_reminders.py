@@ -0,0 +1,57 @@
+# Generated by Django 5.1.14 on 2026-10-18 05:15
+
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_reminder_at(apps, schema_editor):
+    Reservation = apps.get_model('reservations', 'Reservation')
+    # Already-past reminders stay empty: nobody should get one now
+    upcoming = Reservation.objects.filter(status='CONFIRMED', reservation_date__gte=timezone.localdate())
+    lead = timedelta(minutes=getattr(settings, 'RESERVATION_REMINDER_LEAD_MINUTES', 60))
+    batch = []
+    for reservation in upcoming.only('id', 'reservation_date', 'reservation_time').iterator(chunk_size=2000):
+        moment = timezone.make_aware(datetime.combine(reservation.reservation_date, reservation.reservation_time))
+        if moment > timezone.now():
+            reservation.reminder_at = moment - lead
+            batch.append(reservation)
+        if len(batch) >= 2000:
+            Reservation.objects.bulk_update(batch, ['reminder_at'])
+            batch = []
+    if batch:
+        Reservation.objects.bulk_update(batch, ['reminder_at'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0006_table_slot_claims'),
+        ('restaurants', '0007_restaurant_order_capacity'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reservation',
+            name='reminder_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='reminder at'),
+        ),
+        migrations.AddField(
+            model_name='reservation',
+            name='reminder_sent_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='reminder sent at'),
+        ),
+        migrations.AddField(
+            model_name='reservation',
+            name='reminder_task_id',
+            field=models.CharField(blank=True, max_length=255, verbose_name='reminder task id'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['status', 'reminder_at'], name='reservation_reminder_idx'),
+        ),
+        migrations.RunPython(backfill_reminder_at, migrations.RunPython.noop),
+    ]
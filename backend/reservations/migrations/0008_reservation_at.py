@@ -0,0 +1,67 @@
+# Generated by Django 5.1.14 on 2026-10-18 05:17
+
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import migrations, models, transaction
+from django.utils import timezone
+
+CHUNK_SIZE = 2000
+
+
+def backfill_reservation_at(apps, schema_editor):
+    Reservation = apps.get_model('reservations', 'Reservation')
+    duration = timedelta(minutes=getattr(settings, 'RESERVATION_DURATION_MINUTES', 60))
+    # Keyset chunks, each committed on its own (the migration is not atomic),
+    # so a large table is never locked or held in memory as a whole
+    last_id = 0
+    while True:
+        with transaction.atomic():
+            chunk = list(
+                Reservation.objects
+                .filter(id__gt=last_id, reservation_at__isnull=True)
+                .order_by('id')
+                .only('id', 'reservation_date', 'reservation_time')[:CHUNK_SIZE]
+            )
+            if not chunk:
+                break
+            for reservation in chunk:
+                reservation.reservation_at = timezone.make_aware(
+                    datetime.combine(reservation.reservation_date, reservation.reservation_time)
+                )
+                reservation.ends_at = reservation.reservation_at + duration
+            Reservation.objects.bulk_update(chunk, ['reservation_at', 'ends_at'])
+        last_id = chunk[-1].id
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('reservations', '0007_reservation_reminders'),
+        ('restaurants', '0007_restaurant_order_capacity'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reservation',
+            name='ends_at',
+            field=models.DateTimeField(editable=False, null=True, verbose_name='ends at'),
+        ),
+        migrations.AddField(
+            model_name='reservation',
+            name='reservation_at',
+            field=models.DateTimeField(editable=False, null=True, verbose_name='reservation at'),
+        ),
+        migrations.RunPython(backfill_reservation_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['restaurant', 'reservation_at'], name='reservation_restaurant_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['status', 'reservation_at'], name='reservation_status_at_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.1.14 on 2026-10-18 05:18
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0008_reservation_at'),
+        ('restaurants', '0007_restaurant_order_capacity'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WaitlistEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reservation_date', models.DateField(verbose_name='reservation date')),
+                ('reservation_time', models.TimeField(verbose_name='reservation time')),
+                ('slot', models.PositiveSmallIntegerField(editable=False, verbose_name='slot')),
+                ('guest_count', models.PositiveIntegerField(verbose_name='guest count')),
+                ('special_requests', models.TextField(blank=True, verbose_name='special requests')),
+                ('status', models.CharField(choices=[('WAITING', 'Waiting'), ('PROMOTED', 'Promoted'), ('CANCELLED', 'Cancelled'), ('EXPIRED', 'Expired')], default='WAITING', max_length=20, verbose_name='status')),
+                ('promoted_at', models.DateTimeField(blank=True, null=True, verbose_name='promoted at')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='created at')),
+                ('reservation', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='waitlist_entry', to='reservations.reservation')),
+                ('restaurant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to='restaurants.restaurant')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'waitlist entry',
+                'verbose_name_plural': 'waitlist entries',
+                'db_table': 'reservation_waitlist',
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['restaurant', 'reservation_date', 'status', 'slot'], name='waitlist_slot_idx')],
+            },
+        ),
+    ]
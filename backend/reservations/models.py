@@ -1,16 +1,37 @@
-from django.db import models
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.db import models, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_time
 from django.utils.translation import gettext_lazy as _
 from users.models import User
 from restaurants.models import Restaurant
 import uuid
 
 
+def reservation_duration():
+    """How long a booking holds its table."""
+    return timedelta(minutes=getattr(settings, 'RESERVATION_DURATION_MINUTES', 60))
+
+
+def reservation_span(reservation_date, reservation_time):
+    """Aware ``(start, end)`` of a booking from its local date and time."""
+    if isinstance(reservation_date, str):
+        reservation_date = parse_date(reservation_date)
+    if isinstance(reservation_time, str):
+        reservation_time = parse_time(reservation_time)
+    start = timezone.make_aware(datetime.combine(reservation_date, reservation_time))
+    return start, start + reservation_duration()
+
+
 class Table(models.Model):
     """Restaurant table model."""
     restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE, related_name='tables')
     table_number = models.CharField(_('table number'), max_length=50)
     capacity = models.PositiveIntegerField(_('capacity'))
     is_available = models.BooleanField(_('is available'), default=True)
+    # Tables sharing a non-empty group can be pushed together for large parties
+    combine_group = models.CharField(_('combine group'), max_length=50, blank=True)
     created_at = models.DateTimeField(_('created at'), auto_now_add=True)
     
     class Meta:
@@ -37,15 +58,25 @@ class Reservation(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='reservations')
     restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE, related_name='reservations')
     table = models.ForeignKey(Table, on_delete=models.SET_NULL, null=True, blank=True, related_name='reservations')
+    # Ids of the tables pushed together with ``table`` for a large party
+    joined_tables = models.JSONField(_('joined tables'), default=list, blank=True)
     
     reservation_number = models.CharField(_('reservation number'), max_length=50, unique=True, blank=True)
     reservation_date = models.DateField(_('reservation date'))
     reservation_time = models.TimeField(_('reservation time'))
     guest_count = models.PositiveIntegerField(_('guest count'))
+    # reservation_date + reservation_time as one aware instant, and when the table frees up
+    reservation_at = models.DateTimeField(_('reservation at'), null=True, editable=False)
+    ends_at = models.DateTimeField(_('ends at'), null=True, editable=False)
     
     status = models.CharField(_('status'), max_length=20, choices=Status.choices, default=Status.PENDING)
     special_requests = models.TextField(_('special requests'), blank=True)
     
+    # Reminder scheduling (reservations/reminders.py)
+    reminder_at = models.DateTimeField(_('reminder at'), null=True, blank=True)
+    reminder_sent_at = models.DateTimeField(_('reminder sent at'), null=True, blank=True)
+    reminder_task_id = models.CharField(_('reminder task id'), max_length=255, blank=True)
+    
     created_at = models.DateTimeField(_('created at'), auto_now_add=True)
     updated_at = models.DateTimeField(_('updated at'), auto_now=True)
     
@@ -54,8 +85,17 @@ class Reservation(models.Model):
         verbose_name_plural = _('reservations')
         db_table = 'reservations'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'reminder_at'], name='reservation_reminder_idx'),
+            models.Index(fields=['restaurant', 'reservation_at'], name='reservation_restaurant_at_idx'),
+            models.Index(fields=['status', 'reservation_at'], name='reservation_status_at_idx'),
+        ]
     
     def save(self, *args, **kwargs):
+        self.reservation_at, self.ends_at = reservation_span(self.reservation_date, self.reservation_time)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'reservation_date', 'reservation_time'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'reservation_at', 'ends_at'}
         # ✅ Автоматическая генерация уникального номера бронирования
         if not self.reservation_number:
             # Генерируем номер вида: RES-20260211-A1B2C3D4
@@ -63,7 +103,69 @@ class Reservation(models.Model):
             date_part = datetime.now().strftime('%Y%m%d')
             unique_part = uuid.uuid4().hex[:8].upper()
             self.reservation_number = f'RES-{date_part}-{unique_part}'
-        super().save(*args, **kwargs)
+        # The post_save handler claims the table slots; a taken slot rolls the save back
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+    
+    def __str__(self):
+        return f'Reservation #{self.reservation_number} - {self.user.email}'
+
+
+class TableSlotClaim(models.Model):
+    """One table slot held by an active reservation; unique per table, date and slot."""
+    table = models.ForeignKey(Table, on_delete=models.CASCADE, related_name='slot_claims')
+    reservation = models.ForeignKey(Reservation, on_delete=models.CASCADE, related_name='slot_claims')
+    date = models.DateField(_('date'))
+    slot = models.PositiveSmallIntegerField(_('slot'))
+    
+    class Meta:
+        verbose_name = _('table slot claim')
+        verbose_name_plural = _('table slot claims')
+        db_table = 'reservation_slot_claims'
+        constraints = [
+            models.UniqueConstraint(fields=['table', 'date', 'slot'], name='unique_table_slot_claim'),
+        ]
+        indexes = [
+            models.Index(fields=['date'], name='slot_claim_date_idx'),
+        ]
+    
+    def __str__(self):
+        return f'Table {self.table_id} on {self.date} slot {self.slot}'
+
+
+class WaitlistEntry(models.Model):
+    """A request for a table that was not free, waiting for a cancellation."""
+    
+    class Status(models.TextChoices):
+        WAITING = 'WAITING', _('Waiting')
+        PROMOTED = 'PROMOTED', _('Promoted')
+        CANCELLED = 'CANCELLED', _('Cancelled')
+        EXPIRED = 'EXPIRED', _('Expired')
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='waitlist_entries')
+    restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE, related_name='waitlist_entries')
+    reservation_date = models.DateField(_('reservation date'))
+    reservation_time = models.TimeField(_('reservation time'))
+    # reservation_time as a grid slot, so promotion can match by slot range
+    slot = models.PositiveSmallIntegerField(_('slot'), editable=False)
+    guest_count = models.PositiveIntegerField(_('guest count'))
+    special_requests = models.TextField(_('special requests'), blank=True)
+    
+    status = models.CharField(_('status'), max_length=20, choices=Status.choices, default=Status.WAITING)
+    reservation = models.OneToOneField(
+        Reservation, on_delete=models.SET_NULL, null=True, blank=True, related_name='waitlist_entry'
+    )
+    promoted_at = models.DateTimeField(_('promoted at'), null=True, blank=True)
+    created_at = models.DateTimeField(_('created at'), auto_now_add=True)
+    
+    class Meta:
+        verbose_name = _('waitlist entry')
+        verbose_name_plural = _('waitlist entries')
+        db_table = 'reservation_waitlist'
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['restaurant', 'reservation_date', 'status', 'slot'], name='waitlist_slot_idx'),
+        ]
     
     def __str__(self):
-        return f'Reservation #{self.reservation_number} - {self.user.email}'
\ No newline at end of file
+        return f'Waitlist {self.restaurant_id} {self.reservation_date} {self.reservation_time} ({self.guest_count})'
@@ -0,0 +1,120 @@
+"""
+Reservation reminder scheduling.
+
+A confirmed reservation stores when its reminder is due in ``reminder_at``
+(``RESERVATION_REMINDER_LEAD_MINUTES`` before it starts). Reminders due
+within ``RESERVATION_REMINDER_HORIZON_MINUTES`` are queued right away with
+a Celery ``eta``; the id of the queued task is kept so it can be revoked
+when the reservation is moved or leaves CONFIRMED. Reminders further out
+are queued by the sweep, which runs every 15 minutes and, through the
+``(status, reminder_at)`` index, also re-queues any reminder that is
+overdue and still unsent (a lost task or a worker restart).
+
+The horizon stays below the Redis broker's visibility timeout, so eta
+tasks are not redelivered while they wait. Duplicates are harmless
+anyway: the task claims the reminder by setting ``reminder_sent_at`` only
+if ``reminder_at`` is still the one it was queued for.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Reservation
+
+GRACE = timedelta(minutes=5)
+
+
+def lead():
+    return timedelta(minutes=getattr(settings, 'RESERVATION_REMINDER_LEAD_MINUTES', 60))
+
+
+def horizon():
+    return timedelta(minutes=getattr(settings, 'RESERVATION_REMINDER_HORIZON_MINUTES', 45))
+
+
+def due_at(reservation):
+    """When the reminder of ``reservation`` is due, or ``None`` if it gets none."""
+    if reservation.status != Reservation.Status.CONFIRMED:
+        return None
+    return reservation.reservation_at - lead()
+
+
+def enqueue(reservation_id, reminder_at, now=None):
+    """Queue the reminder for ``reminder_at`` and remember the task id."""
+    from .tasks import send_reservation_reminder
+
+    now = now or timezone.now()
+    result = send_reservation_reminder.apply_async(
+        (reservation_id, reminder_at.isoformat()),
+        eta=reminder_at if reminder_at > now else None,
+    )
+    Reservation.objects.filter(pk=reservation_id, reminder_at=reminder_at).update(reminder_task_id=result.id)
+
+
+def revoke(task_id):
+    from config.celery import app
+
+    app.control.revoke(task_id)
+
+
+def reschedule(reservation, now=None):
+    """Point the reminder at the reservation's current time, or drop it; effective on commit."""
+    now = now or timezone.now()
+    previous_task = reservation.reminder_task_id
+    reminder_at = due_at(reservation)
+    # Nothing to remind about once the reservation itself has started
+    if reminder_at is not None and reminder_at + lead() <= now:
+        reminder_at = None
+
+    Reservation.objects.filter(pk=reservation.pk).update(
+        reminder_at=reminder_at, reminder_sent_at=None, reminder_task_id='',
+    )
+    reservation.reminder_at = reminder_at
+    reservation.reminder_sent_at = None
+    reservation.reminder_task_id = ''
+
+    if previous_task:
+        transaction.on_commit(lambda: revoke(previous_task))
+    if reminder_at is not None and reminder_at <= now + horizon():
+        reservation_id = reservation.pk
+        transaction.on_commit(lambda: enqueue(reservation_id, reminder_at))
+
+
+def claim(reservation_id, reminder_at, now=None):
+    """Mark the reminder sent if it is still the one queued for ``reminder_at``; returns whether it was."""
+    now = now or timezone.now()
+    return bool(
+        Reservation.objects
+        .filter(
+            pk=reservation_id,
+            status=Reservation.Status.CONFIRMED,
+            reminder_at=reminder_at,
+            reminder_sent_at__isnull=True,
+        )
+        .update(reminder_sent_at=now)
+    )
+
+
+def sweep(now=None):
+    """Queue reminders coming into the horizon and re-queue overdue ones; returns how many."""
+    now = now or timezone.now()
+    due = (
+        Reservation.objects
+        .filter(
+            status=Reservation.Status.CONFIRMED,
+            reminder_at__gt=now - lead(),
+            reminder_at__lte=now + horizon(),
+            reservation_at__gt=now,
+            reminder_sent_at__isnull=True,
+        )
+        .filter(Q(reminder_task_id='') | Q(reminder_at__lte=now - GRACE))
+        .values_list('id', 'reminder_at')
+    )
+    count = 0
+    for reservation_id, reminder_at in due:
+        enqueue(reservation_id, reminder_at, now)
+        count += 1
+    return count
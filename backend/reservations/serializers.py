@@ -1,19 +1,25 @@
 from rest_framework import serializers
-from .models import Table, Reservation
+from config.fieldsets import DynamicFieldsMixin
+from django.utils import timezone
+from . import assignment, waitlist
+from .models import Table, Reservation, WaitlistEntry
 
 
-class TableSerializer(serializers.ModelSerializer):
+class TableSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Table
         fields = '__all__'
         read_only_fields = ['id', 'created_at']
 
 
-class ReservationSerializer(serializers.ModelSerializer):
+class ReservationSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Reservation
-        fields = '__all__'
-        read_only_fields = ['id', 'reservation_number', 'user', 'status', 'created_at', 'updated_at']
+        exclude = ['reminder_task_id']
+        read_only_fields = [
+            'id', 'reservation_number', 'user', 'status', 'joined_tables',
+            'reminder_at', 'reminder_sent_at', 'created_at', 'updated_at',
+        ]
 
 
 class ReservationCreateSerializer(serializers.ModelSerializer):
@@ -24,4 +30,36 @@ class ReservationCreateSerializer(serializers.ModelSerializer):
         fields = [
             'restaurant', 'table', 'reservation_date', 
             'reservation_time', 'guest_count', 'special_requests'
-        ]
\ No newline at end of file
+        ]
+    
+    def validate(self, attrs):
+        table = attrs.get('table')
+        if table is not None and table.restaurant_id != attrs['restaurant'].id:
+            raise serializers.ValidationError({'table': 'This table belongs to another restaurant'})
+        return attrs
+    
+    def create(self, validated_data):
+        # Claims the table slots atomically; raises claims.SlotTaken if they are held
+        return assignment.seat(Reservation(**validated_data))
+
+
+class WaitlistEntrySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = WaitlistEntry
+        fields = [
+            'id', 'restaurant', 'reservation_date', 'reservation_time', 'guest_count', 'special_requests',
+            'status', 'reservation', 'promoted_at', 'created_at',
+        ]
+        read_only_fields = ['id', 'status', 'reservation', 'promoted_at', 'created_at']
+    
+    def validate_reservation_date(self, value):
+        if value < timezone.localdate():
+            raise serializers.ValidationError('Cannot join the waitlist for a past date')
+        return value
+    
+    def create(self, validated_data):
+        return waitlist.join(
+            validated_data.pop('user'),
+            validated_data.pop('restaurant').id,
+            **validated_data,
+        )
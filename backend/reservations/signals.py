@@ -1,7 +1,57 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
 from django.dispatch import receiver
-from .models import Reservation
-from .tasks import send_reservation_confirmation
+from . import claims, grid, reminders
+from .models import Reservation, Table
+from .tasks import repack_reservations, send_reservation_confirmation
+
+
+def _grid_slot(instance):
+    """The ``(restaurant_id, table_ids, date, time)`` the reservation holds, or ``None``."""
+    # Read __dict__ so deferred fields are not loaded one query at a time
+    values = instance.__dict__
+    if values.get('status') not in grid.ACTIVE_STATUSES or values.get('table_id') is None:
+        return None
+    if values.get('reservation_date') is None or values.get('reservation_time') is None:
+        return None
+    return (
+        values.get('restaurant_id'),
+        grid.held_tables(values['table_id'], values.get('joined_tables')),
+        values['reservation_date'],
+        values['reservation_time'],
+    )
+
+
+def _reminder_key(instance):
+    """What the reminder depends on: confirmation and start time"""
+    values = instance.__dict__
+    return values.get('status') == 'CONFIRMED', values.get('reservation_date'), values.get('reservation_time')
+
+
+@receiver(post_init, sender=Reservation)
+def reservation_grid_snapshot(sender, instance, **kwargs):
+    """Remember the slot a loaded reservation holds and when it is reminded"""
+    instance._grid_slot = _grid_slot(instance)
+    instance._reminder_key = _reminder_key(instance)
+
+
+@receiver([post_save, post_delete], sender=Reservation)
+def reservation_grid_handler(sender, instance, **kwargs):
+    """Move the reservation's slot claims and patch the cached slot grid"""
+    # Connected before the other Reservation receivers below, so a SlotTaken
+    # rolls the save back before they schedule anything.
+    # A new instance's snapshot was taken before it was ever saved
+    old = None if kwargs.get('created') else getattr(instance, '_grid_slot', None)
+    deleted = kwargs.get('signal') is post_delete
+    new = None if deleted else _grid_slot(instance)
+    if old != new:
+        if not deleted:
+            # Runs inside Reservation.save()'s transaction: SlotTaken rolls the save back
+            claims.sync(instance.pk, new)
+        for held in {old, new} - {None}:
+            restaurant_id, table_ids, reserved_on, reserved_at = held
+            grid.touch(restaurant_id, [(table_id, reserved_on, reserved_at) for table_id in table_ids])
+    instance._grid_slot = new
 
 
 @receiver(post_save, sender=Reservation)
@@ -12,4 +62,23 @@ def reservation_confirmed_handler(sender, instance, created, update_fields, **kw
     # 2. Status was updated to CONFIRMED (update_fields contains 'status' or is None)
     if instance.status == 'CONFIRMED':
         if created or update_fields is None or 'status' in update_fields:
-            send_reservation_confirmation.delay(instance.id)
+            reservation_id = instance.id
+            transaction.on_commit(lambda: send_reservation_confirmation.delay(reservation_id))
+
+
+@receiver(post_save, sender=Reservation)
+def reservation_reminder_handler(sender, instance, created, **kwargs):
+    """Schedule, move or revoke the reminder when confirmation or start time changes"""
+    key = _reminder_key(instance)
+    old = None if created else getattr(instance, '_reminder_key', None)
+    if key != old and (key[0] or (old and old[0]) or instance.reminder_at is not None):
+        reminders.reschedule(instance)
+    instance._reminder_key = key
+
+
+@receiver([post_save, post_delete], sender=Table)
+def table_grid_handler(sender, instance, **kwargs):
+    """Invalidate the cached slot grids and re-seat upcoming bookings when a table changes"""
+    grid.bump_version(instance.restaurant_id)
+    restaurant_id = instance.restaurant_id
+    transaction.on_commit(lambda: repack_reservations.delay(restaurant_id))
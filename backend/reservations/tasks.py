@@ -43,10 +43,17 @@ def send_reservation_confirmation(reservation_id):
 
 
 @shared_task
-def send_reservation_reminder(reservation_id):
+def send_reservation_reminder(reservation_id, reminder_at=None):
     """Send reminder 1 hour before reservation"""
+    from datetime import datetime
+    from reservations import reminders
     from reservations.models import Reservation
     
+    # Queued for a reminder_at that has since moved, was revoked too late or
+    # was delivered twice: only the run that claims the current one sends it
+    if reminder_at is not None and not reminders.claim(reservation_id, datetime.fromisoformat(reminder_at)):
+        return
+    
     try:
         reservation = Reservation.objects.get(id=reservation_id)
     except Reservation.DoesNotExist:
@@ -76,49 +83,142 @@ def send_reservation_reminder(reservation_id):
 
 @shared_task
 def send_reservation_reminders():
-    """Send reminders for upcoming reservations (runs every 30 min)"""
-    from reservations.models import Reservation
-    from datetime import datetime, timedelta
-    
-    now = timezone.now()
-    reminder_start = now + timedelta(hours=1)
-    reminder_end = now + timedelta(hours=1, minutes=30)
-    
-    # Find reservations in the next hour (between 1 hour and 1.5 hours from now)
-    # Get all confirmed reservations and check in Python to handle datetime properly
-    upcoming_reservations = Reservation.objects.filter(
-        status='CONFIRMED',
-        reservation_date__gte=reminder_start.date(),
-        reservation_date__lte=reminder_end.date()
-    )
-    
-    # Filter in Python for accurate datetime comparison
-    reservations_to_remind = []
-    for reservation in upcoming_reservations:
-        res_datetime = datetime.combine(reservation.reservation_date, reservation.reservation_time)
-        # Make timezone-aware if needed
-        if timezone.is_naive(res_datetime):
-            res_datetime = timezone.make_aware(res_datetime)
-        
-        if reminder_start <= res_datetime <= reminder_end:
-            reservations_to_remind.append(reservation)
+    """Queue reminders coming due and re-queue missed ones (runs every 15 min)"""
+    from reservations import reminders
     
-    for reservation in reservations_to_remind:
-        send_reservation_reminder.delay(reservation.id)
+    # Indexed range scan on (status, reminder_at); the reminders themselves
+    # fire at their exact time through Celery eta
+    return {'queued': reminders.sweep()}
 
 
 @shared_task
-def auto_cancel_expired_reservations():
+def auto_cancel_expired_reservations(chunk_size=500):
     """Auto-cancel reservations that weren't confirmed"""
+    from collections import defaultdict
+    from django.db import transaction
+    from config.locks import task_lock
+    from notifications.models import Notification
+    from reservations import claims, grid, waitlist
     from reservations.models import Reservation
     
-    cutoff_time = timezone.now() - timedelta(hours=24)
+    with task_lock('auto-cancel-reservations', timeout=60 * 60) as acquired:
+        if not acquired:
+            return {'skipped': True, 'cancelled': 0}
+        
+        now = timezone.now()
+        cutoff_time = now - timedelta(hours=24)
+        expired_reservations = Reservation.objects.filter(
+            status='PENDING',
+            created_at__lte=cutoff_time
+        )
+        
+        # Set-based in chunks: one UPDATE and one notification INSERT per
+        # chunk instead of a save() (and its signal) per reservation
+        cancelled = 0
+        last_id = 0
+        while True:
+            with transaction.atomic():
+                chunk = list(
+                    expired_reservations.filter(id__gt=last_id)
+                    .select_for_update(skip_locked=True, of=('self',))
+                    .order_by('id')
+                    .values(
+                        'id', 'user_id', 'restaurant_id', 'table_id', 'joined_tables',
+                        'reservation_number', 'reservation_date', 'reservation_time',
+                    )[:chunk_size]
+                )
+                if not chunk:
+                    break
+                last_id = chunk[-1]['id']
+                ids = [row['id'] for row in chunk]
+                updated = Reservation.objects.filter(id__in=ids, status='PENDING').update(status='CANCELLED', updated_at=now)
+                if updated == len(ids):
+                    changed = set(ids)
+                else:
+                    # Only possible without row locks (SQLite): keep the rows this UPDATE changed
+                    changed = set(
+                        Reservation.objects.filter(id__in=ids, status='CANCELLED', updated_at=now)
+                        .values_list('id', flat=True)
+                    )
+                Notification.objects.bulk_create(
+                    Notification(
+                        user_id=row['user_id'],
+                        type=Notification.Type.RESERVATION,
+                        title='Reservation Cancelled',
+                        message=(
+                            f"Reservation #{row['reservation_number']} for {row['reservation_date']} "
+                            f"at {row['reservation_time']:%H:%M} was not confirmed and has been cancelled."
+                        ),
+                        data={'reservation_id': row['id']},
+                    )
+                    for row in chunk if row['id'] in changed
+                )
+                # The UPDATE skips the model signals, so release the slots here
+                claims.release(changed)
+                released = defaultdict(list)
+                freed = defaultdict(list)
+                for row in chunk:
+                    if row['id'] in changed and row['table_id'] is not None:
+                        table_ids = grid.held_tables(row['table_id'], row['joined_tables'])
+                        released[row['restaurant_id']].extend(
+                            (table_id, row['reservation_date'], row['reservation_time'])
+                            for table_id in table_ids
+                        )
+                        freed[row['restaurant_id']].append(
+                            (table_ids, row['reservation_date'], row['reservation_time'])
+                        )
+                for restaurant_id, entries in released.items():
+                    grid.touch(restaurant_id, entries)
+                    # Same transaction as the cancellation: waiters get the freed tables
+                    waitlist.promote(restaurant_id, freed[restaurant_id])
+                cancelled += len(changed)
+        
+        return {'skipped': False, 'cancelled': cancelled}
+
+
+@shared_task
+def repack_reservations(restaurant_id):
+    """Re-seat a restaurant's upcoming bookings after its tables changed"""
+    from reservations import assignment, claims
+    from reservations.models import Reservation
     
-    expired_reservations = Reservation.objects.filter(
-        status='PENDING',
-        created_at__lte=cutoff_time
+    days = (
+        Reservation.objects
+        .filter(
+            restaurant_id=restaurant_id,
+            status__in=assignment.MOVABLE_STATUSES,
+            reservation_at__gte=timezone.now() - timedelta(days=1),
+        )
+        .values_list('reservation_date', flat=True)
+        .distinct()
+        .order_by('reservation_date')
     )
+    moved = 0
+    unseated = []
+    conflicted = []
+    for day in list(days):
+        try:
+            result = assignment.repack(restaurant_id, day)
+        except claims.SlotTaken:
+            # Too busy to re-seat right now; the day keeps its seating
+            conflicted.append(day.isoformat())
+            continue
+        moved += result['moved']
+        unseated += result['unseated']
+    return {'moved': moved, 'unseated': unseated, 'conflicted': conflicted}
+
+
+@shared_task
+def purge_slot_claims():
+    """Delete table slot claims of past days"""
+    from reservations import claims
+    
+    return {'deleted': claims.purge()}
+
+
+@shared_task
+def expire_waitlist():
+    """Close waitlist entries for days that are over"""
+    from reservations import waitlist
     
-    for reservation in expired_reservations:
-        reservation.status = 'CANCELLED'
-        reservation.save()
+    return {'expired': waitlist.expire()}
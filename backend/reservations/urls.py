@@ -1,9 +1,10 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import TableViewSet, ReservationViewSet
+from .views import TableViewSet, ReservationViewSet, WaitlistViewSet
 
 router = DefaultRouter()
 router.register(r'tables', TableViewSet, basename='table')
+router.register(r'waitlist', WaitlistViewSet, basename='waitlist')
 router.register(r'', ReservationViewSet, basename='reservation')
 
 urlpatterns = [
@@ -1,25 +1,30 @@
-from rest_framework import viewsets, permissions, status
+from rest_framework import mixins, viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from datetime import datetime, timedelta
-from django.db.models import Q
+from datetime import datetime
 from django.utils import timezone
-from .models import Table, Reservation
+from restaurants.models import Restaurant
+from . import grid, waitlist
+from .claims import SlotTaken
+from .models import Table, Reservation, WaitlistEntry
 from .serializers import (
     TableSerializer, 
     ReservationSerializer,
-    ReservationCreateSerializer  # ✅ ДОБАВИЛ ИМПОРТ
+    ReservationCreateSerializer,  # ✅ ДОБАВИЛ ИМПОРТ
+    WaitlistEntrySerializer,
 )
 from .tasks import send_reservation_confirmation
+from config.fieldsets import SparseFieldsetMixin
+from idempotency.keys import idempotent
 
 
-class TableViewSet(viewsets.ModelViewSet):
+class TableViewSet(SparseFieldsetMixin, viewsets.ModelViewSet):
     queryset = Table.objects.all()
     serializer_class = TableSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
 
-class ReservationViewSet(viewsets.ModelViewSet):
+class ReservationViewSet(SparseFieldsetMixin, viewsets.ModelViewSet):
     queryset = Reservation.objects.all()
     permission_classes = [permissions.IsAuthenticated]
     
@@ -29,74 +34,153 @@ class ReservationViewSet(viewsets.ModelViewSet):
         return ReservationSerializer
     
     def get_queryset(self):
+        queryset = super().get_queryset()
         user = self.request.user
         if user.role in ['ADMIN', 'STAFF', 'RESTAURANT_OWNER']:
-            return Reservation.objects.all()
-        return Reservation.objects.filter(user=user)
+            return queryset
+        return queryset.filter(user=user)
+    
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        try:
+            return super().create(request, *args, **kwargs)
+        except SlotTaken as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_409_CONFLICT)
+    
+    def update(self, request, *args, **kwargs):
+        try:
+            return super().update(request, *args, **kwargs)
+        except SlotTaken as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_409_CONFLICT)
     
     def perform_create(self, serializer):
         # Автоматически устанавливаем user
         serializer.save(user=self.request.user)
     
+    def _grid_params(self, params, *required):
+        """Parse the restaurant/date/time/guests booking-widget parameters."""
+        missing = [name for name in required if not params.get(name)]
+        if missing:
+            raise ValueError(f'{", ".join(required)} are required')
+        parsed = {}
+        try:
+            restaurant_id = int(params['restaurant'])
+            if 'guests' in required:
+                parsed['guests'] = int(params['guests'])
+                if parsed['guests'] < 1:
+                    raise ValueError
+        except (TypeError, ValueError):
+            raise ValueError('restaurant and guests must be positive integers')
+        try:
+            if 'date' in required:
+                parsed['day'] = grid.parse_day(params['date'])
+            if 'time' in required:
+                parsed['slot'] = grid.parse_slot(params['time'])
+        except ValueError:
+            raise ValueError('date must be YYYY-MM-DD and time HH:MM')
+        restaurant = Restaurant.objects.only('id', 'business_hours').filter(pk=restaurant_id).first()
+        if restaurant is None:
+            raise LookupError('Restaurant not found')
+        parsed['restaurant'] = restaurant
+        return parsed
+    
+    def _grid_request(self, params, *required):
+        try:
+            return self._grid_params(params, *required), None
+        except ValueError as exc:
+            return None, Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        except LookupError as exc:
+            return None, Response({'error': str(exc)}, status=status.HTTP_404_NOT_FOUND)
+    
+    @staticmethod
+    def _slot_payload(found):
+        if found is None:
+            return None
+        day, slot = found
+        return {'date': day.isoformat(), 'time': grid.time_of(slot).strftime('%H:%M')}
+    
     @action(detail=False, methods=['post'])
     def check_availability(self, request):
         """Check table availability for given date/time"""
-        restaurant_id = request.data.get('restaurant')
-        date = request.data.get('date')
-        time = request.data.get('time')
-        guests = request.data.get('guests')
+        params, error = self._grid_request(request.data, 'restaurant', 'date', 'time', 'guests')
+        if error:
+            return error
         
-        if not all([restaurant_id, date, time, guests]):
-            return Response(
-                {'error': 'restaurant, date, time, and guests are required'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        # Bitmap checks against the cached slot grid of the day
+        restaurant, day, slot, guests = params['restaurant'], params['day'], params['slot'], params['guests']
+        available_tables = grid.free_seatings(restaurant.id, day, slot, guests)
         
-        # Parse date and time
-        reservation_date = datetime.strptime(date, '%Y-%m-%d').date()
-        reservation_time = datetime.strptime(time, '%H:%M').time()
-        reservation_datetime = datetime.combine(reservation_date, reservation_time)
-        
-        # Find suitable tables
-        suitable_tables = Table.objects.filter(
-            restaurant_id=restaurant_id,
-            capacity__gte=guests,
-            is_available=True
-        )
-        
-        # Check for conflicting reservations (2 hour window)
-        time_window_start_dt = reservation_datetime - timedelta(hours=1)
-        time_window_end_dt = reservation_datetime + timedelta(hours=1)
-        
-        conflicting_reservations = Reservation.objects.filter(
-            restaurant_id=restaurant_id,
-            status__in=['PENDING', 'CONFIRMED', 'SEATED']
-        )
-        
-        conflicts = []
-        for res in conflicting_reservations:
-            res_datetime = datetime.combine(res.reservation_date, res.reservation_time)
-            if timezone.is_naive(res_datetime):
-                res_datetime = timezone.make_aware(res_datetime)
-            
-            if time_window_start_dt <= res_datetime <= time_window_end_dt:
-                conflicts.append(res.table_id)
-        
-        available_tables = suitable_tables.exclude(id__in=conflicts)
-        
-        if available_tables.exists():
+        if available_tables:
             return Response({
                 'available': True,
                 'message': f'Tables available for {guests} guests',
-                'available_tables': available_tables.count()
+                'available_tables': len(available_tables)
             })
         else:
             return Response({
                 'available': False,
                 'message': 'No tables available for this time slot',
-                'suggestion': 'Try a different time or fewer guests'
+                'suggestion': 'Try a different time or fewer guests, or join the waitlist',
+                'next_available': self._slot_payload(grid.next_available(restaurant, day, slot, guests)),
             })
     
+    @action(detail=False, methods=['get'])
+    def slots(self, request):
+        """Bookable start times of a day with the number of free tables"""
+        params, error = self._grid_request(request.query_params, 'restaurant', 'date', 'guests')
+        if error:
+            return error
+        
+        day = params['day']
+        now = timezone.localtime()
+        after = None
+        if day < now.date():
+            return Response({'date': day.isoformat(), 'slots': []})
+        if day == now.date():
+            after = grid.slot_of(now.time()) + 1
+        slots = grid.day_slots(params['restaurant'], day, params['guests'], after=after)
+        return Response({
+            'date': day.isoformat(),
+            'slot_minutes': grid.SLOT_MINUTES,
+            'slots': [
+                {'time': grid.time_of(slot).strftime('%H:%M'), 'available_tables': count}
+                for slot, count in slots
+            ],
+        })
+    
+    @action(detail=False, methods=['get'])
+    def next_available(self, request):
+        """First free slot at or after the given date/time"""
+        params, error = self._grid_request(request.query_params, 'restaurant', 'date', 'time', 'guests')
+        if error:
+            return error
+        
+        day, slot = params['day'], params['slot']
+        now = timezone.localtime()
+        if (day, slot) <= (now.date(), grid.slot_of(now.time())):
+            day, slot = now.date(), grid.slot_of(now.time()) + 1
+        found = grid.next_available(params['restaurant'], day, slot, params['guests'])
+        return Response({'next_available': self._slot_payload(found)})
+    
+    @action(detail=False, methods=['get'])
+    def calendar(self, request):
+        """Number of bookable start times for every day of a month"""
+        params, error = self._grid_request(request.query_params, 'restaurant', 'guests')
+        if error:
+            return error
+        try:
+            month = datetime.strptime(request.query_params.get('month', ''), '%Y-%m').date()
+        except ValueError:
+            return Response({'error': 'month must be YYYY-MM'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        days = grid.calendar(
+            params['restaurant'], month.year, month.month, params['guests'], today=timezone.localdate(),
+        )
+        return Response({
+            'month': month.strftime('%Y-%m'),
+            'days': [{'date': day.isoformat(), 'available_slots': count} for day, count in days.items()],
+        })
+    
     @action(detail=True, methods=['post'])
     def confirm(self, request, pk=None):
         """Confirm a reservation"""
@@ -127,7 +211,37 @@ class ReservationViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        reservation.status = 'CANCELLED'
-        reservation.save()
+        # Frees the tables and books the best-fitting waitlisted guest onto them
+        waitlist.cancel_and_promote(reservation, 'CANCELLED')
         
-        return Response({'message': 'Reservation cancelled'})
\ No newline at end of file
+        return Response({'message': 'Reservation cancelled'})
+
+
+class WaitlistViewSet(
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
+):
+    """The current user's waitlist entries."""
+    serializer_class = WaitlistEntrySerializer
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get_queryset(self):
+        return WaitlistEntry.objects.filter(user=self.request.user).order_by('-created_at')
+    
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+    
+    @action(detail=True, methods=['post'])
+    def leave(self, request, pk=None):
+        """Leave the waitlist"""
+        updated = WaitlistEntry.objects.filter(
+            pk=self.get_object().pk, status=WaitlistEntry.Status.WAITING,
+        ).update(status=WaitlistEntry.Status.CANCELLED)
+        if not updated:
+            return Response(
+                {'error': 'Only waiting entries can be cancelled'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response({'message': 'Left the waitlist'})
@@ -0,0 +1,147 @@
+"""
+Reservation waitlist.
+
+A guest who finds no free table can join the waitlist for a restaurant,
+date and time. When a booking is cancelled (by the guest, by the owner's
+reject, or by the auto-cancel job), ``promote`` runs in the same
+transaction. It looks up waiting entries whose start slot overlaps the
+freed booking, through the ``(restaurant, reservation_date, status, slot)``
+index, so its cost does not grow with the waitlist. It then books the
+best-fitting one, the party that wastes the fewest of the freed seats and
+the earliest request among equals, onto the freed tables. The booking goes
+through the slot claims like any other, so a waiter is only promoted if
+the tables are really free for their whole stay. Promoted guests get a
+notification and a PENDING reservation the restaurant confirms as usual.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from notifications.models import Notification
+
+from . import claims, grid
+from .models import Reservation, WaitlistEntry
+
+# Waiting entries considered per freed booking
+CANDIDATES = 50
+
+
+def join(user, restaurant_id, reservation_date, reservation_time, guest_count, special_requests=''):
+    return WaitlistEntry.objects.create(
+        user=user,
+        restaurant_id=restaurant_id,
+        reservation_date=reservation_date,
+        reservation_time=reservation_time,
+        slot=grid.slot_of(reservation_time),
+        guest_count=guest_count,
+        special_requests=special_requests,
+    )
+
+
+def freed_by(reservation):
+    """The ``(table_ids, date, time)`` a reservation held, for ``promote``."""
+    if reservation.table_id is None:
+        return None
+    return (
+        grid.held_tables(reservation.table_id, reservation.joined_tables),
+        reservation.reservation_date,
+        reservation.reservation_time,
+    )
+
+
+def _waste(seatings, capacities, guests):
+    return sum(capacities[table_id] for table_id in seatings[0]) - guests
+
+
+def _notify(entry, reservation):
+    Notification.objects.create(
+        user_id=entry.user_id,
+        type=Notification.Type.RESERVATION,
+        title='A table opened up',
+        message=(
+            f'You are off the waitlist: reservation #{reservation.reservation_number} for '
+            f'{reservation.reservation_date} at {reservation.reservation_time:%H:%M} is waiting for confirmation.'
+        ),
+        data={'reservation_id': reservation.id, 'waitlist_entry_id': entry.id},
+    )
+
+
+def promote(restaurant_id, freed, now=None):
+    """
+    Book waiting guests onto tables freed by cancelled bookings.
+
+    ``freed`` is a list of ``(table_ids, date, time)``; at most one waiter is
+    promoted per freed booking. Must run inside the cancelling transaction.
+    Returns the promoted entries.
+    """
+    freed = [item for item in freed if item is not None]
+    if not freed:
+        return []
+    now = now or timezone.now()
+    length = grid.duration_slots()
+    tables = {table[0]: table for table in grid.tables_of(restaurant_id)}
+    capacities = {table_id: table[1] for table_id, table in tables.items()}
+    promoted = []
+
+    for table_ids, day, reserved_at in freed:
+        options = [tables[table_id] for table_id in table_ids if table_id in tables]
+        if not options:
+            continue
+        start = grid.slot_of(reserved_at)
+        candidates = list(
+            WaitlistEntry.objects
+            .select_for_update(skip_locked=True)
+            .filter(
+                restaurant_id=restaurant_id,
+                reservation_date=day,
+                status=WaitlistEntry.Status.WAITING,
+                slot__gt=start - length,
+                slot__lt=start + length,
+            )
+            .order_by('created_at', 'id')[:CANDIDATES]
+        )
+        ranked = []
+        for entry in candidates:
+            seatings = grid.seatings(options, entry.guest_count)
+            if seatings:
+                ranked.append((_waste(seatings, capacities, entry.guest_count), entry.created_at, entry.id, entry, seatings))
+        ranked.sort(key=lambda item: item[:3])
+
+        for _, _, _, entry, seatings in ranked:
+            reservation = Reservation(
+                user_id=entry.user_id,
+                restaurant_id=restaurant_id,
+                reservation_date=day,
+                reservation_time=entry.reservation_time,
+                guest_count=entry.guest_count,
+                special_requests=entry.special_requests,
+            )
+            try:
+                claims.book(reservation, seatings)
+            except claims.SlotTaken:
+                # Overlaps another booking on the freed tables
+                continue
+            entry.status = WaitlistEntry.Status.PROMOTED
+            entry.reservation = reservation
+            entry.promoted_at = now
+            entry.save(update_fields=['status', 'reservation', 'promoted_at'])
+            _notify(entry, reservation)
+            promoted.append(entry)
+            break
+    return promoted
+
+
+def cancel_and_promote(reservation, new_status):
+    """Move ``reservation`` to a cancelled status and promote a waiter onto its tables."""
+    with transaction.atomic():
+        freed = freed_by(reservation) if reservation.status in grid.ACTIVE_STATUSES else None
+        reservation.status = new_status
+        reservation.save()
+        return promote(reservation.restaurant_id, [freed])
+
+
+def expire(today=None):
+    """Close waiting entries for days that are over; returns how many."""
+    today = today or timezone.localdate()
+    return WaitlistEntry.objects.filter(
+        status=WaitlistEntry.Status.WAITING, reservation_date__lt=today,
+    ).update(status=WaitlistEntry.Status.EXPIRED)
@@ -1,5 +1,6 @@
 from django.contrib import admin
 from .models import Restaurant, RestaurantImage, Review
+from .ratings import moderate_reviews
 
 
 @admin.register(Restaurant)
@@ -23,7 +24,7 @@ class RestaurantAdmin(admin.ModelAdmin):
             'fields': ('address_line1', 'address_line2', 'city', 'state', 'postal_code', 'country', 'latitude', 'longitude')
         }),
         ('Business Info', {
-            'fields': ('cuisine_types', 'price_range', 'rating', 'total_reviews')
+            'fields': ('cuisine_types', 'price_range', 'rating', 'total_reviews', 'rating_sum')
         }),
         ('Features', {
             'fields': ('delivery_available', 'takeout_available', 'reservation_available')
@@ -37,7 +38,7 @@ class RestaurantAdmin(admin.ModelAdmin):
         }),
     )
     
-    readonly_fields = ('rating', 'total_reviews', 'created_at', 'updated_at')
+    readonly_fields = ('rating', 'total_reviews', 'rating_sum', 'created_at', 'updated_at')
 
 
 @admin.register(RestaurantImage)
@@ -59,18 +60,18 @@ class ReviewAdmin(admin.ModelAdmin):
     
     def approve_reviews(self, request, queryset):
         """Approve selected reviews."""
-        updated = queryset.update(is_approved=True)
+        updated = moderate_reviews(queryset, is_approved=True)
         self.message_user(request, f'{updated} review(s) approved.')
     approve_reviews.short_description = "Approve selected reviews"
     
     def flag_reviews(self, request, queryset):
         """Flag selected reviews."""
-        updated = queryset.update(is_flagged=True)
+        updated = moderate_reviews(queryset, is_flagged=True)
         self.message_user(request, f'{updated} review(s) flagged.')
     flag_reviews.short_description = "Flag selected reviews"
     
     def unflag_reviews(self, request, queryset):
         """Unflag selected reviews."""
-        updated = queryset.update(is_flagged=False)
+        updated = moderate_reviews(queryset, is_flagged=False)
         self.message_user(request, f'{updated} review(s) unflagged.')
     unflag_reviews.short_description = "Unflag selected reviews"
@@ -0,0 +1,84 @@
+"""
+Cached restaurant page bundle.
+
+The bundle is the restaurant with its images, latest reviews and active
+menu, loaded with a fixed number of queries and rendered to JSON once.
+The rendered bytes are cached under a per-restaurant version that every
+write to the restaurant or its related rows bumps, and the version doubles
+as the ETag so unchanged pages are answered with 304 without touching the
+blob.
+"""
+from django.conf import settings
+from django.db.models import Prefetch
+from rest_framework.renderers import JSONRenderer
+
+from config import versioned_cache
+from menu.models import MenuCategory, MenuItem
+from menu.serializers import MenuCategorySerializer, MenuItemSerializer
+from .models import Restaurant, Review
+from .serializers import RestaurantSerializer, RestaurantImageSerializer, ReviewSerializer
+
+BUNDLE_REVIEW_LIMIT = 20
+
+CACHE_PREFIX = 'restaurant-bundle'
+
+
+def _timeout():
+    return getattr(settings, 'RESTAURANT_BUNDLE_CACHE_TIMEOUT', 60 * 60)
+
+
+def bump_version(restaurant_id):
+    """Invalidate the cached bundle of a restaurant once the write commits."""
+    versioned_cache.bump_version(CACHE_PREFIX, restaurant_id)
+
+
+def load_restaurant(restaurant_id):
+    """Load the restaurant graph for the bundle in five queries."""
+    return (
+        Restaurant.objects
+        .prefetch_related(
+            'images',
+            Prefetch(
+                'reviews',
+                queryset=Review.objects.filter(is_approved=True, is_flagged=False)[:BUNDLE_REVIEW_LIMIT],
+                to_attr='bundle_reviews',
+            ),
+            Prefetch(
+                'menu_categories',
+                queryset=MenuCategory.objects.filter(is_active=True).prefetch_related(
+                    Prefetch(
+                        'items',
+                        queryset=MenuItem.objects.filter(is_deleted=False),
+                        to_attr='bundle_items',
+                    )
+                ),
+                to_attr='bundle_categories',
+            ),
+        )
+        .get(pk=restaurant_id)
+    )
+
+
+def render_bundle(restaurant):
+    """Serialize a restaurant loaded by ``load_restaurant`` to JSON bytes."""
+    menu = []
+    for category in restaurant.bundle_categories:
+        data = MenuCategorySerializer(category).data
+        data['items'] = MenuItemSerializer(category.bundle_items, many=True).data
+        menu.append(data)
+
+    return JSONRenderer().render({
+        'restaurant': RestaurantSerializer(restaurant).data,
+        'images': RestaurantImageSerializer(restaurant.images.all(), many=True).data,
+        'reviews': ReviewSerializer(restaurant.bundle_reviews, many=True).data,
+        'menu': menu,
+    })
+
+
+def bundle_response(request, restaurant_id):
+    """The rendered bundle, built on a cache miss, or 304 for a current ETag."""
+    return versioned_cache.json_response(
+        request, CACHE_PREFIX, restaurant_id,
+        lambda: render_bundle(load_restaurant(restaurant_id)),
+        _timeout(),
+    )
@@ -0,0 +1,178 @@
+"""
+Geohash spatial index helpers for the nearby restaurant search.
+
+Restaurants carry a geohash of their coordinates. A radius query is
+answered in two steps: the search circle's bounding box is covered by a
+handful of geohash cells which become indexed range scans on the
+``geohash`` column, then the exact haversine distance is computed in SQL
+for the surviving candidates only.
+"""
+import math
+
+from django.db.models import FloatField, Q
+from django.db.models.functions import ASin, Cast, Cos, Power, Radians, Sin, Sqrt
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+GEOHASH_PRECISION = 12
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = 111.32
+
+# Upper bound of geohash cells used to cover a search box; the coarsest
+# precision that stays under this is picked, so each query is at most
+# this many index range scans.
+MAX_COVERING_CELLS = 16
+
+
+def encode(latitude, longitude, precision=GEOHASH_PRECISION):
+    """Encode a coordinate pair into a geohash string."""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    geohash = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(geohash) < precision:
+        if even:
+            mid = (lng_range[0] + lng_range[1]) / 2
+            if longitude >= mid:
+                bits = (bits << 1) | 1
+                lng_range[0] = mid
+            else:
+                bits <<= 1
+                lng_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if latitude >= mid:
+                bits = (bits << 1) | 1
+                lat_range[0] = mid
+            else:
+                bits <<= 1
+                lat_range[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            geohash.append(BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return ''.join(geohash)
+
+
+def cell_size(precision):
+    """Return the ``(lat_degrees, lng_degrees)`` size of a geohash cell."""
+    total_bits = precision * 5
+    lng_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lng_bits)
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """Return ``(min_lat, max_lat, min_lng, max_lng)`` enclosing the circle.
+
+    Longitudes are not wrapped, so the box may extend past +/-180 when
+    the circle crosses the antimeridian.
+    """
+    lat_delta = radius_km / KM_PER_DEGREE_LAT
+    min_lat = max(latitude - lat_delta, -90.0)
+    max_lat = min(latitude + lat_delta, 90.0)
+
+    cos_lat = math.cos(math.radians(max(abs(min_lat), abs(max_lat))))
+    if cos_lat <= 1e-9:
+        return min_lat, max_lat, -180.0, 180.0
+    lng_delta = radius_km / (KM_PER_DEGREE_LAT * cos_lat)
+    if lng_delta >= 180.0:
+        return min_lat, max_lat, -180.0, 180.0
+    return min_lat, max_lat, longitude - lng_delta, longitude + lng_delta
+
+
+def longitude_ranges(min_lng, max_lng):
+    """Split a possibly wrapping longitude span into plain ranges."""
+    if min_lng < -180.0:
+        return [(min_lng + 360.0, 180.0), (-180.0, max_lng)]
+    if max_lng > 180.0:
+        return [(min_lng, 180.0), (-180.0, max_lng - 360.0)]
+    return [(min_lng, max_lng)]
+
+
+def covering_cells(min_lat, max_lat, min_lng, max_lng):
+    """Return the geohash prefixes covering a bounding box.
+
+    Uses the finest precision whose covering stays within
+    ``MAX_COVERING_CELLS`` cells.
+    """
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        lat_step, lng_step = cell_size(precision)
+        columns_total = int(round(360.0 / lng_step))
+        first_row = int(math.floor((min_lat + 90.0) / lat_step))
+        last_row = min(int(math.floor((max_lat + 90.0) / lat_step)), int(round(180.0 / lat_step)) - 1)
+        first_col = int(math.floor((min_lng + 180.0) / lng_step))
+        last_col = int(math.floor((max_lng + 180.0) / lng_step))
+        columns = min(last_col - first_col + 1, columns_total)
+        if (last_row - first_row + 1) * columns > MAX_COVERING_CELLS:
+            continue
+
+        cells = set()
+        for row in range(first_row, last_row + 1):
+            cell_lat = -90.0 + (row + 0.5) * lat_step
+            for offset in range(columns):
+                col = (first_col + offset) % columns_total
+                cell_lng = -180.0 + (col + 0.5) * lng_step
+                cells.add(encode(cell_lat, cell_lng, precision))
+        return sorted(cells)
+    return ['']
+
+
+def prefix_successor(prefix):
+    """Return the smallest geohash greater than every hash with ``prefix``.
+
+    Returns ``None`` when the prefix has no upper bound (all ``z``).
+    """
+    stripped = prefix.rstrip(BASE32[-1])
+    if not stripped:
+        return None
+    return stripped[:-1] + BASE32[BASE32.index(stripped[-1]) + 1]
+
+
+def cells_q(cells, field='geohash'):
+    """Build a ``Q`` matching any of the given geohash prefixes as ranges."""
+    query = Q()
+    for cell in cells:
+        bounds = Q(**{f'{field}__gte': cell})
+        upper = prefix_successor(cell)
+        if upper is not None:
+            bounds &= Q(**{f'{field}__lt': upper})
+        query |= bounds
+    return query
+
+
+def haversine_expression(latitude, longitude, lat_field='latitude', lng_field='longitude'):
+    """Return an ORM expression for the great-circle distance in km."""
+    lat1 = math.radians(latitude)
+    lat2 = Radians(Cast(lat_field, FloatField()))
+    lng2 = Radians(Cast(lng_field, FloatField()))
+    a = (
+        Power(Sin((lat2 - lat1) / 2), 2)
+        + math.cos(lat1) * Cos(lat2) * Power(Sin((lng2 - math.radians(longitude)) / 2), 2)
+    )
+    return 2 * EARTH_RADIUS_KM * ASin(Sqrt(a))
+
+
+def within_radius(queryset, latitude, longitude, radius_km):
+    """Filter ``queryset`` to restaurants within ``radius_km``, nearest first.
+
+    The result is annotated with ``distance_km``.
+    """
+    min_lat, max_lat, min_lng, max_lng = bounding_box(latitude, longitude, radius_km)
+    cells = covering_cells(min_lat, max_lat, min_lng, max_lng)
+
+    lng_q = Q()
+    for low, high in longitude_ranges(min_lng, max_lng):
+        lng_q |= Q(longitude__gte=low, longitude__lte=high)
+
+    return (
+        queryset
+        .filter(cells_q(cells))
+        .filter(lng_q, latitude__gte=min_lat, latitude__lte=max_lat)
+        .annotate(distance_km=haversine_expression(latitude, longitude))
+        .filter(distance_km__lte=radius_km)
+        .order_by('distance_km', 'id')
+    )
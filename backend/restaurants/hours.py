@@ -0,0 +1,113 @@
+"""
+Normalization of ``Restaurant.business_hours`` into minute-of-week ranges.
+
+``business_hours`` is free-form JSON keyed by weekday, e.g.::
+
+    {"monday": {"open": "11:00", "close": "22:00"},
+     "friday": [{"open": "11:00", "close": "15:00"},
+                {"open": "18:00", "close": "02:00"}],
+     "sunday": "closed"}
+
+Every shift becomes a half-open ``[start, end)`` range of minutes since
+Monday 00:00. Shifts closing at or before their opening time run past
+midnight, and ranges running past Sunday midnight are split so that all
+of them fit inside ``[0, MINUTES_PER_WEEK)``.
+"""
+from datetime import datetime, time
+
+from django.utils import timezone
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+WEEKDAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+
+def _weekday_index(key):
+    key = str(key).strip().lower()
+    for index, name in enumerate(WEEKDAYS):
+        if key == name or key == name[:3]:
+            return index
+    return None
+
+
+def _parse_minutes(value):
+    """Parse ``HH:MM`` into minutes since midnight; ``24:00`` is allowed."""
+    try:
+        hours, minutes = str(value).strip().split(':')[:2]
+        hours, minutes = int(hours), int(minutes)
+    except (TypeError, ValueError):
+        return None
+    if not (0 <= minutes < 60 and 0 <= hours <= 24) or (hours == 24 and minutes):
+        return None
+    return hours * 60 + minutes
+
+
+def _shifts(value):
+    """Yield ``(open, close)`` minute pairs from one weekday entry."""
+    if isinstance(value, dict):
+        value = [value]
+    if not isinstance(value, list):
+        return
+    for shift in value:
+        if not isinstance(shift, dict) or shift.get('closed'):
+            continue
+        opens = _parse_minutes(shift.get('open'))
+        closes = _parse_minutes(shift.get('close'))
+        if opens is not None and closes is not None:
+            yield opens, closes
+
+
+def build_intervals(business_hours):
+    """Return merged, sorted ``(start_minute, end_minute)`` week ranges."""
+    if not isinstance(business_hours, dict):
+        return []
+
+    ranges = []
+    for key, value in business_hours.items():
+        day = _weekday_index(key)
+        if day is None:
+            continue
+        for opens, closes in _shifts(value):
+            start = day * MINUTES_PER_DAY + opens
+            end = day * MINUTES_PER_DAY + closes
+            if closes <= opens:
+                end += MINUTES_PER_DAY
+            if end > MINUTES_PER_WEEK:
+                ranges.append((start, MINUTES_PER_WEEK))
+                ranges.append((0, end - MINUTES_PER_WEEK))
+            else:
+                ranges.append((start, end))
+
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def minute_of_week(moment):
+    """Return the minute-of-week of a ``datetime``."""
+    return moment.weekday() * MINUTES_PER_DAY + moment.hour * 60 + moment.minute
+
+
+def parse_open_at(value, now):
+    """Resolve an ``open_at`` query value to a minute-of-week.
+
+    Accepts ``HH:MM`` (that time on the day of ``now``) or an ISO 8601
+    datetime, read in the current time zone. Returns ``None`` when the
+    value cannot be parsed.
+    """
+    minutes = _parse_minutes(value)
+    if minutes is not None and minutes < MINUTES_PER_DAY:
+        moment = datetime.combine(now.date(), time(minutes // 60, minutes % 60))
+        return minute_of_week(moment)
+    try:
+        moment = datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+    if timezone.is_aware(moment):
+        moment = timezone.localtime(moment)
+    return minute_of_week(moment)
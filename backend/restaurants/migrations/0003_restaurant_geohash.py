@@ -0,0 +1,71 @@
+# Generated by Django 5.1.14 on 2026-10-18 04:35
+
+from django.db import migrations, models
+
+# Frozen copy of restaurants.geo.encode, so later changes there do not
+# rewrite history
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+GEOHASH_PRECISION = 12
+
+
+def encode(latitude, longitude):
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    geohash = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(geohash) < GEOHASH_PRECISION:
+        if even:
+            mid = (lng_range[0] + lng_range[1]) / 2
+            if longitude >= mid:
+                bits = (bits << 1) | 1
+                lng_range[0] = mid
+            else:
+                bits <<= 1
+                lng_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if latitude >= mid:
+                bits = (bits << 1) | 1
+                lat_range[0] = mid
+            else:
+                bits <<= 1
+                lat_range[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            geohash.append(BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return ''.join(geohash)
+
+
+def backfill_geohash(apps, schema_editor):
+    Restaurant = apps.get_model('restaurants', 'Restaurant')
+    located = Restaurant.objects.filter(latitude__isnull=False, longitude__isnull=False)
+    batch = []
+    for restaurant in located.only('id', 'latitude', 'longitude').iterator(chunk_size=2000):
+        restaurant.geohash = encode(float(restaurant.latitude), float(restaurant.longitude))
+        batch.append(restaurant)
+        if len(batch) >= 2000:
+            Restaurant.objects.bulk_update(batch, ['geohash'])
+            batch = []
+    if batch:
+        Restaurant.objects.bulk_update(batch, ['geohash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurants', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='restaurant',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=12, verbose_name='geohash'),
+        ),
+        migrations.RunPython(backfill_geohash, migrations.RunPython.noop),
+    ]
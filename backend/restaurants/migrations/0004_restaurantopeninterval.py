@@ -0,0 +1,115 @@
+# Generated by Django 5.1.14 on 2026-10-18 04:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Frozen copy of restaurants.hours.build_intervals, so later changes there
+# do not rewrite history
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+WEEKDAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+
+def _weekday_index(key):
+    key = str(key).strip().lower()
+    for index, name in enumerate(WEEKDAYS):
+        if key == name or key == name[:3]:
+            return index
+    return None
+
+
+def _parse_minutes(value):
+    try:
+        hours, minutes = str(value).strip().split(':')[:2]
+        hours, minutes = int(hours), int(minutes)
+    except (TypeError, ValueError):
+        return None
+    if not (0 <= minutes < 60 and 0 <= hours <= 24) or (hours == 24 and minutes):
+        return None
+    return hours * 60 + minutes
+
+
+def _shifts(value):
+    if isinstance(value, dict):
+        value = [value]
+    if not isinstance(value, list):
+        return
+    for shift in value:
+        if not isinstance(shift, dict) or shift.get('closed'):
+            continue
+        opens = _parse_minutes(shift.get('open'))
+        closes = _parse_minutes(shift.get('close'))
+        if opens is not None and closes is not None:
+            yield opens, closes
+
+
+def build_intervals(business_hours):
+    if not isinstance(business_hours, dict):
+        return []
+
+    ranges = []
+    for key, value in business_hours.items():
+        day = _weekday_index(key)
+        if day is None:
+            continue
+        for opens, closes in _shifts(value):
+            start = day * MINUTES_PER_DAY + opens
+            end = day * MINUTES_PER_DAY + closes
+            if closes <= opens:
+                end += MINUTES_PER_DAY
+            if end > MINUTES_PER_WEEK:
+                ranges.append((start, MINUTES_PER_WEEK))
+                ranges.append((0, end - MINUTES_PER_WEEK))
+            else:
+                ranges.append((start, end))
+
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def build_open_intervals(apps, schema_editor):
+    Restaurant = apps.get_model('restaurants', 'Restaurant')
+    RestaurantOpenInterval = apps.get_model('restaurants', 'RestaurantOpenInterval')
+    batch = []
+    for restaurant in Restaurant.objects.only('id', 'business_hours').iterator(chunk_size=2000):
+        batch.extend(
+            RestaurantOpenInterval(restaurant_id=restaurant.id, start_minute=start, end_minute=end)
+            for start, end in build_intervals(restaurant.business_hours)
+        )
+        if len(batch) >= 2000:
+            RestaurantOpenInterval.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        RestaurantOpenInterval.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurants', '0003_restaurant_geohash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RestaurantOpenInterval',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_minute', models.PositiveIntegerField(verbose_name='start minute of week')),
+                ('end_minute', models.PositiveIntegerField(verbose_name='end minute of week')),
+                ('restaurant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='open_intervals', to='restaurants.restaurant')),
+            ],
+            options={
+                'verbose_name': 'restaurant open interval',
+                'verbose_name_plural': 'restaurant open intervals',
+                'db_table': 'restaurant_open_intervals',
+                'ordering': ['restaurant', 'start_minute'],
+                'indexes': [models.Index(fields=['start_minute', 'end_minute'], name='restaurant__start_m_6ff193_idx')],
+            },
+        ),
+        migrations.RunPython(build_open_intervals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.1.14 on 2026-10-18 04:40
+
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def backfill_rating_aggregates(apps, schema_editor):
+    Restaurant = apps.get_model('restaurants', 'Restaurant')
+    counted = Q(reviews__is_approved=True, reviews__is_flagged=False)
+    restaurants = Restaurant.objects.annotate(
+        actual_sum=Sum('reviews__rating', filter=counted),
+        actual_count=Count('reviews', filter=counted),
+    ).values_list('id', 'actual_sum', 'actual_count')
+    for restaurant_id, actual_sum, actual_count in restaurants.iterator(chunk_size=2000):
+        rating = Decimal(0)
+        if actual_count:
+            rating = (Decimal(actual_sum) / actual_count).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+        Restaurant.objects.filter(pk=restaurant_id).update(
+            rating_sum=actual_sum or 0,
+            total_reviews=actual_count,
+            rating=rating,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurants', '0004_restaurantopeninterval'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='restaurant',
+            name='rating_sum',
+            field=models.IntegerField(default=0, verbose_name='rating sum'),
+        ),
+        migrations.RunPython(backfill_rating_aggregates, migrations.RunPython.noop),
+    ]
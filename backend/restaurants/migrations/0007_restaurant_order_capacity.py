@@ -0,0 +1,18 @@
+# Generated by Django 5.1.14 on 2026-10-18 05:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurants', '0006_remove_review_reviews_created_53b5d6_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='restaurant',
+            name='order_capacity',
+            field=models.PositiveIntegerField(blank=True, help_text='Orders accepted per admission window; empty uses ORDER_ADMISSION_CAPACITY', null=True, verbose_name='order capacity'),
+        ),
+    ]
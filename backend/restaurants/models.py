@@ -1,6 +1,7 @@
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 from users.models import User
+from . import geo
 
 
 class Restaurant(models.Model):
@@ -29,6 +30,7 @@ class Restaurant(models.Model):
     country = models.CharField(_('country'), max_length=100)
     latitude = models.DecimalField(_('latitude'), max_digits=9, decimal_places=6, blank=True, null=True)
     longitude = models.DecimalField(_('longitude'), max_digits=9, decimal_places=6, blank=True, null=True)
+    geohash = models.CharField(_('geohash'), max_length=12, blank=True, db_index=True, editable=False)
     
     # Images
     logo = models.ImageField(_('logo'), upload_to='restaurants/logos/', blank=True, null=True)
@@ -39,14 +41,19 @@ class Restaurant(models.Model):
     price_range = models.IntegerField(_('price range'), choices=[(1, '$'), (2, '$$'), (3, '$$$'), (4, '$$$$')], default=2)
     status = models.CharField(_('status'), max_length=20, choices=Status.choices, default=Status.PENDING)
     
-    # Rating
+    # Rating (maintained incrementally by restaurants.ratings)
     rating = models.DecimalField(_('rating'), max_digits=3, decimal_places=2, default=0.00)
     total_reviews = models.IntegerField(_('total reviews'), default=0)
+    rating_sum = models.IntegerField(_('rating sum'), default=0)
     
     # Features
     delivery_available = models.BooleanField(_('delivery available'), default=True)
     takeout_available = models.BooleanField(_('takeout available'), default=True)
     reservation_available = models.BooleanField(_('reservation available'), default=True)
+    order_capacity = models.PositiveIntegerField(
+        _('order capacity'), blank=True, null=True,
+        help_text='Orders accepted per admission window; empty uses ORDER_ADMISSION_CAPACITY'
+    )
     
     # Business hours (stored as JSON for flexibility)
     business_hours = models.JSONField(_('business hours'), default=dict)
@@ -69,10 +76,51 @@ class Restaurant(models.Model):
             models.Index(fields=['rating']),
         ]
     
+    # Columns only ever written through atomic F() updates
+    AGGREGATE_FIELDS = ('rating', 'total_reviews', 'rating_sum')
+    
+    def save(self, *args, **kwargs):
+        # Never write back possibly stale aggregates on a full-row save
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.AGGREGATE_FIELDS
+            ]
+        
+        # Keep the geohash cell in sync with the coordinates for nearby search
+        if self.latitude is not None and self.longitude is not None:
+            self.geohash = geo.encode(float(self.latitude), float(self.longitude))
+        else:
+            self.geohash = ''
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'latitude', 'longitude'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'geohash'}
+        super().save(*args, **kwargs)
+    
     def __str__(self):
         return self.name
 
 
+class RestaurantOpenInterval(models.Model):
+    """Weekly opening range derived from Restaurant.business_hours."""
+    
+    restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE, related_name='open_intervals')
+    start_minute = models.PositiveIntegerField(_('start minute of week'))
+    end_minute = models.PositiveIntegerField(_('end minute of week'))
+    
+    class Meta:
+        verbose_name = _('restaurant open interval')
+        verbose_name_plural = _('restaurant open intervals')
+        db_table = 'restaurant_open_intervals'
+        ordering = ['restaurant', 'start_minute']
+        indexes = [
+            models.Index(fields=['start_minute', 'end_minute']),
+        ]
+    
+    def __str__(self):
+        return f'{self.restaurant.name} [{self.start_minute}, {self.end_minute})'
+
+
 class RestaurantImage(models.Model):
     """Restaurant gallery images."""
     
@@ -120,7 +168,8 @@ class Review(models.Model):
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['restaurant', 'rating']),
-            models.Index(fields=['created_at']),
+            models.Index(fields=['created_at', 'id']),
+            models.Index(fields=['restaurant', 'created_at', 'id']),
         ]
     
     def __str__(self):
@@ -1,15 +1,30 @@
+import os
+from datetime import timedelta
+
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from django.core.files.storage import default_storage
+from django.http import FileResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 from restaurants.models import Restaurant
 from restaurants.serializers import RestaurantSerializer
 from menu.models import MenuItem, MenuCategory
 from menu.serializers import MenuItemSerializer, MenuCategorySerializer
+from reservations import assignment, waitlist
+from reservations.claims import SlotTaken
 from reservations.models import Table, Reservation
 from reservations.serializers import TableSerializer, ReservationSerializer
-from orders.models import Order
-from orders.serializers import OrderSerializer
+from orders.models import Order, OrderStatusEvent
+from orders import archive, exports, kitchen
+from orders.serializers import ArchivedOrderSerializer, OrderSerializer, KitchenOrderSerializer
+from orders.transitions import InvalidTransition, TransitionConflict, transition
+from orders.views import history_page, serialize_history
+
+ARCHIVED_ORDERS_PAGE_SIZE = 20
 
 
 class IsRestaurantOwner(permissions.BasePermission):
@@ -232,6 +247,32 @@ class OwnerTableViewSet(viewsets.ViewSet):
         table = get_object_or_404(Table, pk=pk, restaurant=restaurant)
         table.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
+    
+    @action(detail=False, methods=['post'])
+    def repack(self, request):
+        """Re-seat a day's pending and confirmed bookings on the best-fit tables."""
+        restaurant = self._get_owner_restaurant(request)
+        if not restaurant:
+            return Response(
+                {'error': 'No restaurant found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        try:
+            day = parse_date(request.data['date']) if request.data.get('date') else timezone.localdate()
+        except ValueError:
+            day = None
+        if day is None:
+            return Response(
+                {'error': 'date must be YYYY-MM-DD'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            result = assignment.repack(restaurant.id, day)
+        except SlotTaken as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_409_CONFLICT)
+        return Response({'date': day.isoformat(), **result})
 
 
 class OwnerOrderViewSet(viewsets.ViewSet):
@@ -247,7 +288,10 @@ class OwnerOrderViewSet(viewsets.ViewSet):
             return None
     
     def list(self, request):
-        """Get all orders for owner's restaurant."""
+        """
+        Get all live orders for owner's restaurant, followed by the newest
+        page of archived ones (page further with ``history``).
+        """
         restaurant = self._get_owner_restaurant(request)
         if not restaurant:
             return Response(
@@ -255,9 +299,53 @@ class OwnerOrderViewSet(viewsets.ViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        orders = Order.objects.filter(restaurant=restaurant).order_by('-created_at')
-        serializer = OrderSerializer(orders, many=True)
-        return Response(serializer.data)
+        orders = Order.objects.filter(restaurant=restaurant).prefetch_related('items').order_by('-created_at', '-id')
+        entries = [(False, order) for order in orders]
+        entries += archive.history(ARCHIVED_ORDERS_PAGE_SIZE, live=False, restaurant=restaurant)
+        return Response(serialize_history(entries))
+    
+    @action(detail=False, methods=['get'])
+    def history(self, request):
+        """
+        Live and archived orders of owner's restaurant, newest first.
+        
+        ?page_size= (max 100) and ?before=<next_before of the previous page>
+        """
+        restaurant = self._get_owner_restaurant(request)
+        if not restaurant:
+            return Response(
+                {'error': 'No restaurant found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        return history_page(request, restaurant=restaurant)
+    
+    @action(detail=False, methods=['get'])
+    def queue(self, request):
+        """Active kitchen queue; pass ?since=<sequence> for changes only."""
+        restaurant = self._get_owner_restaurant(request)
+        if not restaurant:
+            return Response(
+                {'error': 'No restaurant found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        since = request.query_params.get('since')
+        if since is not None:
+            try:
+                since = int(since)
+            except ValueError:
+                return Response(
+                    {'error': 'since must be an integer sequence'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        
+        sequence, orders, removed = kitchen.queue(restaurant, since)
+        return Response({
+            'sequence': sequence,
+            'orders': KitchenOrderSerializer(orders, many=True).data,
+            'removed': removed,
+        })
     
     def retrieve(self, request, pk=None):
         """Get a specific order."""
@@ -268,7 +356,13 @@ class OwnerOrderViewSet(viewsets.ViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        order = get_object_or_404(Order, pk=pk, restaurant=restaurant)
+        order = Order.objects.filter(pk=pk, restaurant=restaurant).first()
+        if order is None:
+            # Old completed/cancelled orders live in the archive
+            archived = archive.find(pk)
+            if archived is None or archived.restaurant_id != restaurant.id:
+                return Response({'error': 'Order not found'}, status=status.HTTP_404_NOT_FOUND)
+            return Response(ArchivedOrderSerializer(archived).data)
         serializer = OrderSerializer(order)
         return Response(serializer.data)
     
@@ -291,19 +385,107 @@ class OwnerOrderViewSet(viewsets.ViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Validate status
-        valid_statuses = [choice[0] for choice in Order.Status.choices]
-        if new_status not in valid_statuses:
+        try:
+            transition(order, new_status, actor=request.user, source=OrderStatusEvent.Source.RESTAURANT)
+        except InvalidTransition as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        except TransitionConflict as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_409_CONFLICT)
+        
+        serializer = OrderSerializer(order)
+        return Response(serializer.data)
+    
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Export orders, order items or payments over a date range.
+        
+        ?dataset=orders|items|payments&file_format=csv|xlsx&date_from=&date_to=
+        (dates inclusive, default the last 30 days). Large exports, or any
+        with ?async=true, are queued and answered with 202 and a job id.
+        """
+        restaurant = self._get_owner_restaurant(request)
+        if not restaurant:
+            return Response(
+                {'error': 'No restaurant found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        dataset = request.query_params.get('dataset', 'orders')
+        file_format = request.query_params.get('file_format', 'csv')
+        if file_format not in exports.FORMATS:
             return Response(
-                {'error': f'Invalid status. Must be one of: {valid_statuses}'},
+                {'error': f'file_format must be one of: {", ".join(exports.FORMATS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            date_to = parse_date(request.query_params.get('date_to', '')) or timezone.localdate()
+            date_from = parse_date(request.query_params.get('date_from', '')) or date_to - timedelta(days=30)
+        except ValueError:
+            return Response(
+                {'error': 'date_from and date_to must be YYYY-MM-DD dates'},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        order.status = new_status
-        order.save()
+        try:
+            total = exports.count(dataset, restaurant.id, date_from, date_to)
+        except exports.ExportError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
         
-        serializer = OrderSerializer(order)
-        return Response(serializer.data)
+        if request.query_params.get('async') == 'true' or total > exports.sync_max_rows():
+            job_id = exports.start_job(request.user.id, restaurant.id, dataset, file_format, date_from, date_to)
+            return Response(
+                {
+                    'job_id': job_id,
+                    'rows': total,
+                    'status_url': reverse('owner-order-export-status', kwargs={'job_id': job_id}),
+                },
+                status=status.HTTP_202_ACCEPTED
+            )
+        
+        name = exports.filename(dataset, date_from, date_to, file_format)
+        if file_format == 'csv':
+            response = StreamingHttpResponse(
+                exports.stream_csv(dataset, restaurant.id, date_from, date_to),
+                content_type=exports.CONTENT_TYPES['csv']
+            )
+            response['Content-Disposition'] = f'attachment; filename="{name}"'
+            return response
+        
+        path, _ = exports.write_file(dataset, file_format, restaurant.id, date_from, date_to)
+        output = open(path, 'rb')
+        # The open handle keeps the data until the response is sent
+        os.remove(path)
+        return FileResponse(output, as_attachment=True, filename=name, content_type=exports.CONTENT_TYPES[file_format])
+    
+    @action(detail=False, methods=['get'], url_path=r'exports/(?P<job_id>[0-9a-f]{32})', url_name='export-status')
+    def export_status(self, request, job_id=None):
+        """Status of a queued export, with its download link once ready."""
+        job = exports.get_job(job_id)
+        if not job or job['owner_id'] != request.user.id:
+            return Response({'error': 'Export not found'}, status=status.HTTP_404_NOT_FOUND)
+        
+        data = {'job_id': job_id, 'status': job['status'], 'filename': job['filename'], 'rows': job.get('rows')}
+        if job['status'] == 'READY':
+            data['download_url'] = reverse('owner-order-export-download', kwargs={'job_id': job_id})
+        return Response(data)
+    
+    @action(
+        detail=False, methods=['get'],
+        url_path=r'exports/(?P<job_id>[0-9a-f]{32})/download', url_name='export-download'
+    )
+    def export_download(self, request, job_id=None):
+        """Download a finished export."""
+        job = exports.get_job(job_id)
+        if not job or job['owner_id'] != request.user.id or job['status'] != 'READY':
+            return Response({'error': 'Export not found'}, status=status.HTTP_404_NOT_FOUND)
+        
+        return FileResponse(
+            default_storage.open(job['path'], 'rb'),
+            as_attachment=True,
+            filename=job['filename'],
+            content_type=exports.CONTENT_TYPES[job['filename'].rsplit('.', 1)[-1]]
+        )
 
 
 class OwnerReservationViewSet(viewsets.ViewSet):
@@ -329,7 +511,7 @@ class OwnerReservationViewSet(viewsets.ViewSet):
         
         reservations = Reservation.objects.filter(
             restaurant=restaurant
-        ).order_by('-reservation_date', '-reservation_time')
+        ).order_by('-reservation_at', '-id')
         serializer = ReservationSerializer(reservations, many=True)
         return Response(serializer.data)
     
@@ -388,8 +570,8 @@ class OwnerReservationViewSet(viewsets.ViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        reservation.status = 'CANCELLED'
-        reservation.save()
+        # Frees the tables and books the best-fitting waitlisted guest onto them
+        waitlist.cancel_and_promote(reservation, 'CANCELLED')
         
         serializer = ReservationSerializer(reservation)
         return Response(serializer.data)
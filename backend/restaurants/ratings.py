@@ -0,0 +1,114 @@
+"""
+Incremental maintenance of ``Restaurant.rating``.
+
+Each restaurant keeps a running ``rating_sum`` and ``total_reviews`` over
+its approved, unflagged reviews. Review writes apply the difference in a
+single atomic ``F()`` update that also recomputes ``rating``, so listings
+sorted by ``-rating`` never need an ``AVG()``. ``reconcile_ratings``
+recomputes the aggregates from scratch to repair any drift.
+"""
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import transaction
+from django.db.models import Case, Count, F, FloatField, Q, Sum, Value, When
+from django.db.models.functions import Cast
+
+from .bundle import bump_version
+from .models import Restaurant, Review
+
+COUNTED_REVIEWS = Q(is_approved=True, is_flagged=False)
+
+
+def contribution(rating, is_approved, is_flagged):
+    """Return the ``(sum, count)`` a review adds to its restaurant."""
+    if is_approved and not is_flagged:
+        return rating, 1
+    return 0, 0
+
+
+def apply_delta(restaurant_id, sum_delta, count_delta):
+    """Atomically shift a restaurant's running totals and rating."""
+    if not sum_delta and not count_delta:
+        return
+    new_sum = F('rating_sum') + sum_delta
+    new_count = F('total_reviews') + count_delta
+    Restaurant.objects.filter(pk=restaurant_id).update(
+        rating_sum=new_sum,
+        total_reviews=new_count,
+        rating=Case(
+            When(total_reviews__gt=-count_delta, then=Cast(new_sum, FloatField()) / new_count),
+            default=Value(0.0),
+        ),
+    )
+
+
+def apply_deltas(deltas):
+    """Apply a ``{restaurant_id: (sum_delta, count_delta)}`` mapping."""
+    for restaurant_id, (sum_delta, count_delta) in sorted(deltas.items()):
+        apply_delta(restaurant_id, sum_delta, count_delta)
+
+
+def _counted_totals(review_ids):
+    totals = (
+        Review.objects
+        .filter(COUNTED_REVIEWS, id__in=review_ids)
+        .values('restaurant_id')
+        .annotate(rating_sum=Sum('rating'), count=Count('id'))
+    )
+    return {row['restaurant_id']: (row['rating_sum'], row['count']) for row in totals}
+
+
+def moderate_reviews(queryset, **changes):
+    """Bulk update moderation flags and adjust the affected aggregates.
+
+    Replacement for ``queryset.update(...)`` on reviews that keeps restaurant
+    ratings consistent. Returns the number of updated reviews.
+    """
+    with transaction.atomic():
+        review_ids = list(queryset.select_for_update().values_list('id', flat=True))
+        before = _counted_totals(review_ids)
+        updated = Review.objects.filter(id__in=review_ids).update(**changes)
+        after = _counted_totals(review_ids)
+
+        deltas = {}
+        for restaurant_id in before.keys() | after.keys():
+            old_sum, old_count = before.get(restaurant_id, (0, 0))
+            new_sum, new_count = after.get(restaurant_id, (0, 0))
+            deltas[restaurant_id] = (new_sum - old_sum, new_count - old_count)
+        apply_deltas(deltas)
+        for restaurant_id in Review.objects.filter(id__in=review_ids).values_list('restaurant_id', flat=True).distinct():
+            bump_version(restaurant_id)
+    return updated
+
+
+def reconcile_ratings(chunk_size=1000):
+    """Recompute aggregates from reviews and fix drifted restaurants.
+
+    Returns the ids of the restaurants that were corrected.
+    """
+    corrected = []
+    restaurants = (
+        Restaurant.objects
+        .order_by('id')
+        .annotate(
+            actual_sum=Sum('reviews__rating', filter=Q(reviews__is_approved=True, reviews__is_flagged=False)),
+            actual_count=Count('reviews', filter=Q(reviews__is_approved=True, reviews__is_flagged=False)),
+        )
+        .values_list('id', 'rating', 'rating_sum', 'total_reviews', 'actual_sum', 'actual_count')
+    )
+    for row in restaurants.iterator(chunk_size=chunk_size):
+        restaurant_id, rating, rating_sum, total_reviews, actual_sum, actual_count = row
+        actual_sum = actual_sum or 0
+        actual_rating = Decimal(0)
+        if actual_count:
+            actual_rating = (Decimal(actual_sum) / actual_count).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+        # Tolerate rounding differences in how backends store the average
+        if (rating_sum, total_reviews) == (actual_sum, actual_count) and abs(rating - actual_rating) < Decimal('0.01'):
+            continue
+        Restaurant.objects.filter(pk=restaurant_id).update(
+            rating_sum=actual_sum,
+            total_reviews=actual_count,
+            rating=actual_rating,
+        )
+        corrected.append(restaurant_id)
+    return corrected
@@ -1,21 +1,50 @@
+from django.db import models
 from rest_framework import serializers
+from config.fieldsets import DynamicFieldsMixin
+from orders import admission
 from .models import Restaurant, RestaurantImage, Review
 
 
-class RestaurantSerializer(serializers.ModelSerializer):
+class RestaurantSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Restaurant
         fields = '__all__'
-        read_only_fields = ['id', 'created_at', 'updated_at', 'rating', 'total_reviews']
+        read_only_fields = ['id', 'created_at', 'updated_at', 'rating', 'total_reviews', 'rating_sum']
 
 
-class RestaurantImageSerializer(serializers.ModelSerializer):
+class RestaurantLoadListSerializer(serializers.ListSerializer):
+    """Reads the admission load of every restaurant on the page at once"""
+    
+    def to_representation(self, data):
+        restaurants = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        self.child.loads = admission.loads(restaurants)
+        return [self.child.to_representation(restaurant) for restaurant in restaurants]
+
+
+class RestaurantLoadSerializer(RestaurantSerializer):
+    """Restaurant with its live order load (never cached, unlike the bundle)"""
+    
+    load = serializers.SerializerMethodField()
+    
+    class Meta(RestaurantSerializer.Meta):
+        list_serializer_class = RestaurantLoadListSerializer
+    
+    def get_load(self, obj):
+        loads = getattr(self, 'loads', None) or {}
+        return loads[obj.id] if obj.id in loads else admission.load(obj)
+
+
+class NearbyRestaurantSerializer(RestaurantLoadSerializer):
+    distance_km = serializers.FloatField(read_only=True)
+
+
+class RestaurantImageSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = RestaurantImage
         fields = '__all__'
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Review
         fields = '__all__'
@@ -0,0 +1,80 @@
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from menu.models import MenuCategory, MenuItem
+from .models import Restaurant, RestaurantOpenInterval, RestaurantImage, Review
+from .bundle import bump_version
+from .hours import build_intervals
+from .ratings import apply_deltas, contribution
+
+
+@receiver(post_save, sender=Restaurant)
+def rebuild_open_intervals_handler(sender, instance, created, update_fields, **kwargs):
+    """Rebuild the open-interval index from business_hours"""
+    if update_fields is not None and 'business_hours' not in update_fields:
+        return
+    
+    intervals = [
+        RestaurantOpenInterval(restaurant=instance, start_minute=start, end_minute=end)
+        for start, end in build_intervals(instance.business_hours)
+    ]
+    with transaction.atomic():
+        if not created:
+            RestaurantOpenInterval.objects.filter(restaurant=instance).delete()
+        RestaurantOpenInterval.objects.bulk_create(intervals)
+
+
+@receiver(pre_save, sender=Review)
+def review_pre_save_handler(sender, instance, **kwargs):
+    """Remember the stored review's rating contribution before it changes"""
+    instance._previous_rating_state = None
+    if instance.pk:
+        instance._previous_rating_state = (
+            Review.objects
+            .filter(pk=instance.pk)
+            .values_list('restaurant_id', 'rating', 'is_approved', 'is_flagged')
+            .first()
+        )
+
+
+@receiver(post_save, sender=Review)
+def review_saved_handler(sender, instance, **kwargs):
+    """Apply the review's rating change to its restaurant aggregates"""
+    deltas = {}
+    previous = getattr(instance, '_previous_rating_state', None)
+    if previous:
+        restaurant_id, rating, is_approved, is_flagged = previous
+        old_sum, old_count = contribution(rating, is_approved, is_flagged)
+        deltas[restaurant_id] = (-old_sum, -old_count)
+    
+    new_sum, new_count = contribution(instance.rating, instance.is_approved, instance.is_flagged)
+    sum_delta, count_delta = deltas.get(instance.restaurant_id, (0, 0))
+    deltas[instance.restaurant_id] = (sum_delta + new_sum, count_delta + new_count)
+    apply_deltas(deltas)
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted_handler(sender, instance, **kwargs):
+    """Remove a deleted review from its restaurant aggregates"""
+    old_sum, old_count = contribution(instance.rating, instance.is_approved, instance.is_flagged)
+    apply_deltas({instance.restaurant_id: (-old_sum, -old_count)})
+
+
+@receiver([post_save, post_delete], sender=Restaurant)
+def restaurant_bundle_handler(sender, instance, **kwargs):
+    """Invalidate the cached page bundle of a changed restaurant"""
+    bump_version(instance.id)
+
+
+@receiver([post_save, post_delete], sender=RestaurantImage)
+@receiver([post_save, post_delete], sender=Review)
+@receiver([post_save, post_delete], sender=MenuCategory)
+def restaurant_child_bundle_handler(sender, instance, **kwargs):
+    """Invalidate the page bundle when an image, review or category changes"""
+    bump_version(instance.restaurant_id)
+
+
+@receiver([post_save, post_delete], sender=MenuItem)
+def menu_item_bundle_handler(sender, instance, **kwargs):
+    """Invalidate the page bundle when a menu item changes"""
+    bump_version(instance.category.restaurant_id)
@@ -0,0 +1,10 @@
+from celery import shared_task
+
+
+@shared_task
+def reconcile_restaurant_ratings():
+    """Recompute rating aggregates from reviews and repair drift (runs daily)"""
+    from restaurants.ratings import reconcile_ratings
+    
+    corrected = reconcile_ratings()
+    return {'corrected': len(corrected), 'restaurant_ids': corrected[:100]}
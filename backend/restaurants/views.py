@@ -1,21 +1,119 @@
-from rest_framework import viewsets, permissions
-from .models import Restaurant, RestaurantImage, Review
-from .serializers import RestaurantSerializer, RestaurantImageSerializer, ReviewSerializer
+from rest_framework import viewsets, permissions, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from .models import Restaurant, RestaurantOpenInterval, RestaurantImage, Review
+from .serializers import (
+    RestaurantLoadSerializer,
+    NearbyRestaurantSerializer,
+    RestaurantImageSerializer,
+    ReviewSerializer,
+)
+from . import bundle, geo
+from .hours import minute_of_week, parse_open_at
+from config.pagination import KeysetPagination
+from config.fieldsets import SparseFieldsetMixin
 
+DEFAULT_NEARBY_RADIUS_KM = 5
+MAX_NEARBY_RADIUS_KM = 50
 
-class RestaurantViewSet(viewsets.ModelViewSet):
+
+class RestaurantViewSet(SparseFieldsetMixin, viewsets.ModelViewSet):
     queryset = Restaurant.objects.all()
-    serializer_class = RestaurantSerializer
+    serializer_class = RestaurantLoadSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    filterset_fields = ['status', 'city', 'price_range']
+    
+    # Actions the opening hours filters apply to; detail routes ignore them
+    OPEN_FILTER_ACTIONS = ('list', 'nearby')
+    
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action not in self.OPEN_FILTER_ACTIONS:
+            return queryset
+        
+        # Opening hours filters resolve to a single range lookup on the
+        # precomputed open-interval index
+        open_at = self.request.query_params.get('open_at')
+        open_now = self.request.query_params.get('open_now', '').lower() in ('1', 'true', 'yes')
+        
+        if open_at:
+            minute = parse_open_at(open_at, timezone.localtime())
+            if minute is None:
+                raise ValidationError({'open_at': 'Use HH:MM or an ISO 8601 datetime'})
+        elif open_now:
+            minute = minute_of_week(timezone.localtime())
+        else:
+            return queryset
+        
+        open_restaurants = RestaurantOpenInterval.objects.filter(
+            start_minute__lte=minute,
+            end_minute__gt=minute
+        ).values('restaurant_id')
+        return queryset.filter(id__in=open_restaurants)
+    
+    @action(detail=False, methods=['get'])
+    def nearby(self, request):
+        """List restaurants within radius_km of lat/lng, nearest first"""
+        try:
+            latitude = float(request.query_params['lat'])
+            longitude = float(request.query_params['lng'])
+            radius_km = float(request.query_params.get('radius_km', DEFAULT_NEARBY_RADIUS_KM))
+        except (KeyError, ValueError):
+            return Response(
+                {'error': 'lat and lng are required and must be numbers'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            return Response(
+                {'error': 'lat must be within [-90, 90] and lng within [-180, 180]'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if not 0 < radius_km <= MAX_NEARBY_RADIUS_KM:
+            return Response(
+                {'error': f'radius_km must be greater than 0 and at most {MAX_NEARBY_RADIUS_KM}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        queryset = geo.within_radius(
+            self.filter_queryset(self.get_queryset()),
+            latitude,
+            longitude,
+            radius_km
+        )
+        
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = NearbyRestaurantSerializer(page, many=True, context=self.get_serializer_context())
+            return self.get_paginated_response(serializer.data)
+        
+        serializer = NearbyRestaurantSerializer(queryset, many=True, context=self.get_serializer_context())
+        return Response(serializer.data)
+    
+    @action(detail=False, methods=['get'], url_path=r'(?P<slug>[-\w]+)/bundle')
+    def bundle(self, request, slug=None):
+        """Restaurant page data (restaurant, images, reviews, menu) in one response"""
+        restaurant_id = get_object_or_404(
+            Restaurant.objects.values_list('id', flat=True),
+            slug=slug,
+            is_deleted=False
+        )
+        return bundle.bundle_response(request, restaurant_id)
 
 
-class RestaurantImageViewSet(viewsets.ModelViewSet):
+class RestaurantImageViewSet(SparseFieldsetMixin, viewsets.ModelViewSet):
     queryset = RestaurantImage.objects.all()
     serializer_class = RestaurantImageSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(SparseFieldsetMixin, viewsets.ModelViewSet):
     queryset = Review.objects.all()
     serializer_class = ReviewSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    pagination_class = KeysetPagination
+    filterset_fields = ['restaurant']
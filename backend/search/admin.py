@@ -0,0 +1,11 @@
+from django.contrib import admin
+from .models import SearchDocument
+
+
+@admin.register(SearchDocument)
+class SearchDocumentAdmin(admin.ModelAdmin):
+    list_display = ('title', 'kind', 'object_id', 'restaurant', 'updated_at')
+    list_filter = ('kind',)
+    search_fields = ('title', 'restaurant__name')
+    raw_id_fields = ('restaurant',)
+    readonly_fields = ('updated_at',)
@@ -0,0 +1,31 @@
+"""
+Builders turning restaurants and menu items into search document text.
+
+They only read plain model attributes so migrations can reuse them with
+historical models.
+"""
+
+
+def _join(values):
+    if not isinstance(values, (list, tuple)):
+        return ''
+    return ' '.join(str(value) for value in values if value)
+
+
+def restaurant_document(restaurant):
+    """Return ``(title, content)`` for a restaurant."""
+    content = ' '.join(filter(None, [
+        restaurant.description,
+        _join(restaurant.cuisine_types),
+        restaurant.city,
+    ]))
+    return restaurant.name, content
+
+
+def menu_item_document(menu_item):
+    """Return ``(title, content)`` for a menu item."""
+    content = ' '.join(filter(None, [
+        menu_item.description,
+        _join(menu_item.dietary_tags),
+    ]))
+    return menu_item.name, content
@@ -0,0 +1,135 @@
+"""
+Ranked full-text queries over ``search_documents``.
+
+PostgreSQL ranks with ``ts_rank`` over the GIN indexed ``search_vector``
+column, SQLite with ``bm25`` over the ``search_documents_fts`` FTS5 table.
+Other backends fall back to unranked ``icontains`` matching. Every query
+term is matched as a prefix so partially typed words still hit, and
+documents of soft-deleted restaurants are skipped.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import SearchDocument
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+MAX_QUERY_TERMS = 8
+
+
+def tokenize(query):
+    """Split a user query into at most ``MAX_QUERY_TERMS`` lowercase terms."""
+    return [token.lower() for token in TOKEN_RE.findall(query or '')][:MAX_QUERY_TERMS]
+
+
+class SearchResults:
+    """
+    Lazily evaluated, sliceable ranked hits for a query.
+    
+    Implements ``count()`` and slicing so it can be handed to the regular
+    DRF paginator; each page issues one ranked ``LIMIT``/``OFFSET`` query
+    plus one query loading the matching documents.
+    """
+    
+    def __init__(self, query, kind=None):
+        self.terms = tokenize(query)
+        self.kind = kind
+        self._count = None
+    
+    def _filters(self):
+        sql = ' AND r.is_deleted = %s'
+        params = [False]
+        if self.kind:
+            sql += ' AND d.kind = %s'
+            params.append(self.kind)
+        return sql, params
+    
+    def _ranked_sql(self):
+        """Return ``(sql, params)`` selecting ``(id, rank)``, best first."""
+        filters, filter_params = self._filters()
+        if connection.vendor == 'postgresql':
+            tsquery = ' & '.join(f'{term}:*' for term in self.terms)
+            sql = (
+                "SELECT d.id, ts_rank(d.search_vector, to_tsquery('simple', %s)) AS rank "
+                'FROM search_documents d JOIN restaurants r ON r.id = d.restaurant_id '
+                "WHERE d.search_vector @@ to_tsquery('simple', %s)" + filters +
+                ' ORDER BY rank DESC, d.id'
+            )
+            return sql, [tsquery, tsquery] + filter_params
+        
+        match = ' '.join(f'"{term}"*' for term in self.terms)
+        sql = (
+            'SELECT d.id, -bm25(search_documents_fts, 10.0, 1.0) AS rank '
+            'FROM search_documents_fts '
+            'JOIN search_documents d ON d.id = search_documents_fts.rowid '
+            'JOIN restaurants r ON r.id = d.restaurant_id '
+            'WHERE search_documents_fts MATCH %s' + filters +
+            ' ORDER BY rank DESC, d.id'
+        )
+        return sql, [match] + filter_params
+    
+    def _fallback_queryset(self):
+        queryset = SearchDocument.objects.filter(restaurant__is_deleted=False)
+        if self.kind:
+            queryset = queryset.filter(kind=self.kind)
+        for term in self.terms:
+            queryset = queryset.filter(Q(title__icontains=term) | Q(content__icontains=term))
+        return queryset.order_by('-updated_at', 'id')
+    
+    @property
+    def indexed(self):
+        return connection.vendor in ('postgresql', 'sqlite')
+    
+    def count(self):
+        if self._count is None:
+            if not self.terms:
+                self._count = 0
+            elif not self.indexed:
+                self._count = self._fallback_queryset().count()
+            else:
+                sql, params = self._ranked_sql()
+                with connection.cursor() as cursor:
+                    cursor.execute(f'SELECT COUNT(*) FROM ({sql}) ranked', params)
+                    self._count = cursor.fetchone()[0]
+        return self._count
+    
+    def __len__(self):
+        return self.count()
+    
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1][0]
+        offset = key.start or 0
+        limit = (key.stop - offset) if key.stop is not None else None
+        if not self.terms or (limit is not None and limit <= 0):
+            return []
+        
+        if not self.indexed:
+            documents = list(self._fallback_queryset().select_related('restaurant')[key])
+            for document in documents:
+                document.rank = None
+            return documents
+        
+        sql, params = self._ranked_sql()
+        if limit is not None:
+            sql += ' LIMIT %s'
+            params.append(limit)
+        elif connection.vendor == 'sqlite':
+            sql += ' LIMIT -1'
+        if offset:
+            sql += ' OFFSET %s'
+            params.append(offset)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            ranked = cursor.fetchall()
+        
+        documents = SearchDocument.objects.select_related('restaurant').in_bulk(
+            [document_id for document_id, _ in ranked]
+        )
+        hits = []
+        for document_id, rank in ranked:
+            document = documents[document_id]
+            document.rank = rank
+            hits.append(document)
+        return hits
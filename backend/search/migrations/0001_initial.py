@@ -0,0 +1,132 @@
+# Generated by Django 5.1.14 on 2026-10-18 04:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from search.documents import menu_item_document, restaurant_document
+
+POSTGRES_SQL = [
+    """
+    ALTER TABLE search_documents ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(content, '')), 'B')
+    ) STORED
+    """,
+    'CREATE INDEX search_documents_vector_idx ON search_documents USING GIN (search_vector)',
+]
+
+SQLITE_SQL = [
+    """
+    CREATE VIRTUAL TABLE search_documents_fts USING fts5(
+        title, content,
+        content='search_documents', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER search_documents_ai AFTER INSERT ON search_documents BEGIN
+        INSERT INTO search_documents_fts (rowid, title, content)
+        VALUES (new.id, new.title, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER search_documents_ad AFTER DELETE ON search_documents BEGIN
+        INSERT INTO search_documents_fts (search_documents_fts, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER search_documents_au AFTER UPDATE ON search_documents BEGIN
+        INSERT INTO search_documents_fts (search_documents_fts, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO search_documents_fts (rowid, title, content)
+        VALUES (new.id, new.title, new.content);
+    END
+    """,
+]
+
+SQLITE_REVERSE_SQL = [
+    'DROP TRIGGER IF EXISTS search_documents_au',
+    'DROP TRIGGER IF EXISTS search_documents_ad',
+    'DROP TRIGGER IF EXISTS search_documents_ai',
+    'DROP TABLE IF EXISTS search_documents_fts',
+]
+
+
+def create_fulltext_index(apps, schema_editor):
+    statements = {
+        'postgresql': POSTGRES_SQL,
+        'sqlite': SQLITE_SQL,
+    }.get(schema_editor.connection.vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def drop_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for statement in SQLITE_REVERSE_SQL:
+            schema_editor.execute(statement)
+
+
+def build_documents(apps, schema_editor):
+    Restaurant = apps.get_model('restaurants', 'Restaurant')
+    MenuItem = apps.get_model('menu', 'MenuItem')
+    SearchDocument = apps.get_model('search', 'SearchDocument')
+
+    def documents():
+        for restaurant in Restaurant.objects.iterator(chunk_size=2000):
+            title, content = restaurant_document(restaurant)
+            yield SearchDocument(
+                kind='RESTAURANT', object_id=restaurant.id, restaurant_id=restaurant.id,
+                title=title, content=content,
+            )
+        items = MenuItem.objects.filter(is_deleted=False).select_related('category')
+        for item in items.iterator(chunk_size=2000):
+            title, content = menu_item_document(item)
+            yield SearchDocument(
+                kind='MENU_ITEM', object_id=item.id, restaurant_id=item.category.restaurant_id,
+                title=title, content=content,
+            )
+
+    batch = []
+    for document in documents():
+        batch.append(document)
+        if len(batch) >= 2000:
+            SearchDocument.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        SearchDocument.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('menu', '0002_initial'),
+        ('restaurants', '0004_restaurantopeninterval'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('RESTAURANT', 'Restaurant'), ('MENU_ITEM', 'Menu Item')], max_length=20, verbose_name='kind')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='object ID')),
+                ('title', models.CharField(max_length=255, verbose_name='title')),
+                ('content', models.TextField(blank=True, verbose_name='content')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='updated at')),
+                ('restaurant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_documents', to='restaurants.restaurant')),
+            ],
+            options={
+                'verbose_name': 'search document',
+                'verbose_name_plural': 'search documents',
+                'db_table': 'search_documents',
+                'unique_together': {('kind', 'object_id')},
+            },
+        ),
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+        migrations.RunPython(build_documents, migrations.RunPython.noop),
+    ]
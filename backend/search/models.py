@@ -0,0 +1,34 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+from restaurants.models import Restaurant
+
+
+class SearchDocument(models.Model):
+    """
+    Denormalized full-text search document for a restaurant or menu item.
+    
+    The full-text index itself lives outside the ORM: a generated, GIN
+    indexed ``search_vector`` column on PostgreSQL and the
+    ``search_documents_fts`` FTS5 table (kept in sync by triggers) on
+    SQLite. Both are created in migration 0001.
+    """
+    
+    class Kind(models.TextChoices):
+        RESTAURANT = 'RESTAURANT', _('Restaurant')
+        MENU_ITEM = 'MENU_ITEM', _('Menu Item')
+    
+    kind = models.CharField(_('kind'), max_length=20, choices=Kind.choices)
+    object_id = models.PositiveBigIntegerField(_('object ID'))
+    restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE, related_name='search_documents')
+    title = models.CharField(_('title'), max_length=255)
+    content = models.TextField(_('content'), blank=True)
+    updated_at = models.DateTimeField(_('updated at'), auto_now=True)
+    
+    class Meta:
+        verbose_name = _('search document')
+        verbose_name_plural = _('search documents')
+        db_table = 'search_documents'
+        unique_together = [['kind', 'object_id']]
+    
+    def __str__(self):
+        return f'{self.kind} #{self.object_id} - {self.title}'
@@ -0,0 +1,12 @@
+from rest_framework import serializers
+from .models import SearchDocument
+
+
+class SearchHitSerializer(serializers.ModelSerializer):
+    restaurant_name = serializers.CharField(source='restaurant.name', read_only=True)
+    restaurant_slug = serializers.CharField(source='restaurant.slug', read_only=True)
+    rank = serializers.FloatField(read_only=True, allow_null=True)
+    
+    class Meta:
+        model = SearchDocument
+        fields = ['kind', 'object_id', 'title', 'restaurant', 'restaurant_name', 'restaurant_slug', 'rank']
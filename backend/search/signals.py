@@ -0,0 +1,58 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from restaurants.models import Restaurant
+from menu.models import MenuItem
+from .models import SearchDocument
+from .documents import restaurant_document, menu_item_document
+
+RESTAURANT_INDEXED_FIELDS = {'name', 'description', 'cuisine_types', 'city'}
+
+
+def index_restaurant(restaurant):
+    """Create or refresh the search document of a restaurant."""
+    title, content = restaurant_document(restaurant)
+    SearchDocument.objects.update_or_create(
+        kind=SearchDocument.Kind.RESTAURANT,
+        object_id=restaurant.id,
+        defaults={'restaurant': restaurant, 'title': title, 'content': content}
+    )
+
+
+def index_menu_item(menu_item, restaurant_id):
+    """Create or refresh the search document of a menu item."""
+    title, content = menu_item_document(menu_item)
+    SearchDocument.objects.update_or_create(
+        kind=SearchDocument.Kind.MENU_ITEM,
+        object_id=menu_item.id,
+        defaults={'restaurant_id': restaurant_id, 'title': title, 'content': content}
+    )
+
+
+@receiver(post_save, sender=Restaurant)
+def restaurant_saved_handler(sender, instance, update_fields, **kwargs):
+    """Keep the restaurant search document in sync"""
+    if update_fields is not None and not RESTAURANT_INDEXED_FIELDS & set(update_fields):
+        return
+    index_restaurant(instance)
+
+
+@receiver(post_save, sender=MenuItem)
+def menu_item_saved_handler(sender, instance, **kwargs):
+    """Keep menu item search documents in sync"""
+    if instance.is_deleted:
+        SearchDocument.objects.filter(
+            kind=SearchDocument.Kind.MENU_ITEM,
+            object_id=instance.id
+        ).delete()
+        return
+    
+    index_menu_item(instance, instance.category.restaurant_id)
+
+
+@receiver(post_delete, sender=MenuItem)
+def menu_item_deleted_handler(sender, instance, **kwargs):
+    """Drop the search document of a deleted menu item"""
+    SearchDocument.objects.filter(
+        kind=SearchDocument.Kind.MENU_ITEM,
+        object_id=instance.id
+    ).delete()
@@ -0,0 +1,37 @@
+from rest_framework import viewsets, permissions, status
+from rest_framework.response import Response
+from .engine import SearchResults
+from .models import SearchDocument
+from .serializers import SearchHitSerializer
+
+
+class SearchViewSet(viewsets.GenericViewSet):
+    """Ranked full-text search across restaurants and menu items."""
+    
+    serializer_class = SearchHitSerializer
+    permission_classes = [permissions.AllowAny]
+    
+    def list(self, request):
+        """Search with ?q=, optionally narrowed with ?type=RESTAURANT|MENU_ITEM"""
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response(
+                {'error': 'q is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        kind = request.query_params.get('type')
+        if kind and kind not in SearchDocument.Kind.values:
+            return Response(
+                {'error': f'Invalid type. Must be one of: {SearchDocument.Kind.values}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        results = SearchResults(query, kind=kind)
+        page = self.paginate_queryset(results)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        
+        serializer = self.get_serializer(results[:], many=True)
+        return Response(serializer.data)
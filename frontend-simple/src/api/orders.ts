@@ -1,18 +1,39 @@
 import api from './client';
 import type { Order, CreateOrderRequest, PaginatedResponse, OrderStatus } from './types';
 
+export interface OrderUpdate {
+  event: 'snapshot' | 'status' | 'eta';
+  order_id: number;
+  status: OrderStatus;
+  estimated_delivery_time: string | null;
+  at: string;
+}
+
+export interface OrderHistoryPage {
+  results: Array<Order & { archived: boolean }>;
+  next_before: string | null;
+}
+
 export const ordersApi = {
   // Получить список заказов
   getAll: async (params?: { status?: OrderStatus }): Promise<PaginatedResponse<Order>> => {
     const { data } = await api.get<PaginatedResponse<Order>>('/orders/', {
-      params,
+      params: { ...params, expand: 'items' },
     });
     return data;
   },
 
+  // История заказов, включая архивные (next_before -> следующая страница)
+  getHistory: async (params?: { before?: string; page_size?: number }): Promise<OrderHistoryPage> => {
+    const { data } = await api.get<OrderHistoryPage>('/orders/history/', { params });
+    return data;
+  },
+
   // Получить заказ по ID
   getById: async (id: number): Promise<Order> => {
-    const { data } = await api.get<Order>(`/orders/${id}/`);
+    const { data } = await api.get<Order>(`/orders/${id}/`, {
+      params: { expand: 'items' },
+    });
     return data;
   },
 
@@ -24,15 +45,30 @@ export const ordersApi = {
 
   // Отменить заказ
   cancel: async (id: number): Promise<Order> => {
-    const { data } = await api.patch<Order>(`/orders/${id}/`, {
-      status: 'CANCELLED',
-    });
-    return data;
+    await api.post(`/orders/${id}/cancel_order/`);
+    return ordersApi.getById(id);
   },
 
   // Обновить статус заказа
   updateStatus: async (id: number, status: OrderStatus): Promise<Order> => {
-    const { data } = await api.patch<Order>(`/orders/${id}/`, { status });
+    const { data } = await api.patch<Order>(`/orders/${id}/update_status/`, { status });
     return data;
   },
+
+  // Подписаться на обновления статуса и ETA (Server-Sent Events)
+  subscribe: (id: number, onUpdate: (update: OrderUpdate) => void): (() => void) => {
+    const token = localStorage.getItem('accessToken') ?? '';
+    const url = `${api.defaults.baseURL}/orders/${id}/stream/?token=${encodeURIComponent(token)}`;
+    const source = new EventSource(url);
+    const handler = (event: MessageEvent) => {
+      const update: OrderUpdate = JSON.parse(event.data);
+      onUpdate(update);
+      // Сервер закрывает поток на финальном статусе — не переподключаться
+      if (update.status === 'COMPLETED' || update.status === 'CANCELLED') {
+        source.close();
+      }
+    };
+    ['snapshot', 'status', 'eta'].forEach((name) => source.addEventListener(name, handler));
+    return () => source.close();
+  },
 };
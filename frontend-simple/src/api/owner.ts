@@ -7,11 +7,44 @@ import type {
   Reservation, 
   PaginatedResponse 
 } from './types';
+import type { OrderHistoryPage } from './orders';
 
 /**
  * Owner API for restaurant management
  * All endpoints require RESTAURANT_OWNER role
  */
+export interface KitchenQueue {
+  sequence: number;
+  orders: Array<{
+    id: number;
+    order_number: string;
+    status: string;
+    order_type: string;
+    estimated_delivery_time: string | null;
+    created_at: string;
+    delivery_instructions: string;
+    items: Array<{ name: string; quantity: number; special_instructions: string; modifiers: string[] }>;
+  }>;
+  removed: number[];
+}
+
+export interface ExportParams {
+  dataset?: 'orders' | 'items' | 'payments';
+  file_format?: 'csv' | 'xlsx';
+  date_from?: string;
+  date_to?: string;
+  async?: boolean;
+}
+
+export interface ExportJob {
+  job_id: string;
+  status?: 'PENDING' | 'RUNNING' | 'READY' | 'FAILED';
+  filename?: string;
+  rows: number | null;
+  status_url?: string;
+  download_url?: string;
+}
+
 export const ownerApi = {
   // ==========================================
   // RESTAURANT MANAGEMENT
@@ -111,15 +144,76 @@ export const ownerApi = {
     await api.delete(`/restaurants/owner/tables/${id}/`);
   },
 
+  /**
+   * Re-seat a day's bookings on the best-fit tables (date defaults to today)
+   */
+  repackTables: async (date?: string): Promise<{ date: string; moved: number; unseated: number[] }> => {
+    const { data } = await api.post('/restaurants/owner/tables/repack/', date ? { date } : {});
+    return data;
+  },
+
   // ==========================================
   // ORDER MANAGEMENT
   // ==========================================
   
   /**
-   * Get all orders for owner's restaurant
+   * Get all live orders for owner's restaurant, followed by the newest
+   * archived ones
+   */
+  getOrders: async (): Promise<Array<Order & { archived: boolean }>> => {
+    const { data } = await api.get<Array<Order & { archived: boolean }>>('/restaurants/owner/orders/');
+    return data;
+  },
+
+  /**
+   * Page through live and archived orders for owner's restaurant, newest first
+   */
+  getOrderHistory: async (params?: { before?: string; page_size?: number }): Promise<OrderHistoryPage> => {
+    const { data } = await api.get<OrderHistoryPage>('/restaurants/owner/orders/history/', { params });
+    return data;
+  },
+
+  /**
+   * Get the kitchen queue (CONFIRMED/PREPARING/READY), or only the changes
+   * since a previously returned sequence
+   */
+  getKitchenQueue: async (since?: number): Promise<KitchenQueue> => {
+    const { data } = await api.get<KitchenQueue>('/restaurants/owner/orders/queue/', {
+      params: since === undefined ? {} : { since },
+    });
+    return data;
+  },
+
+  /**
+   * Export orders, order items or payments. Small exports come back as a
+   * file; large ones are queued and return the export job instead
+   */
+  exportData: async (params: ExportParams = {}): Promise<Blob | ExportJob> => {
+    const response = await api.get<Blob>('/restaurants/owner/orders/export/', {
+      params: { ...params, async: params.async ? 'true' : undefined },
+      responseType: 'blob',
+    });
+    if (response.status === 202) {
+      return JSON.parse(await response.data.text()) as ExportJob;
+    }
+    return response.data;
+  },
+
+  /**
+   * Get the status of a queued export
+   */
+  getExportJob: async (jobId: string): Promise<ExportJob> => {
+    const { data } = await api.get<ExportJob>(`/restaurants/owner/orders/exports/${jobId}/`);
+    return data;
+  },
+
+  /**
+   * Download a finished export
    */
-  getOrders: async (): Promise<Order[]> => {
-    const { data } = await api.get<Order[]>('/restaurants/owner/orders/');
+  downloadExport: async (jobId: string): Promise<Blob> => {
+    const { data } = await api.get<Blob>(`/restaurants/owner/orders/exports/${jobId}/download/`, {
+      responseType: 'blob',
+    });
     return data;
   },
 
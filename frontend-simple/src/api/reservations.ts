@@ -9,6 +9,43 @@ export interface CreateReservationRequest {
   special_requests?: string;
 }
 
+export interface SlotRef {
+  date: string;
+  time: string;
+}
+
+export interface AvailabilityResponse {
+  available: boolean;
+  message: string;
+  available_tables?: number;
+  suggestion?: string;
+  next_available?: SlotRef | null;
+}
+
+export interface DaySlotsResponse {
+  date: string;
+  slot_minutes: number;
+  slots: { time: string; available_tables: number }[];
+}
+
+export interface CalendarResponse {
+  month: string;
+  days: { date: string; available_slots: number }[];
+}
+
+export interface WaitlistEntry {
+  id: number;
+  restaurant: number;
+  reservation_date: string;
+  reservation_time: string;
+  guest_count: number;
+  special_requests?: string;
+  status: 'WAITING' | 'PROMOTED' | 'CANCELLED' | 'EXPIRED';
+  reservation: number | null;
+  promoted_at: string | null;
+  created_at: string;
+}
+
 export const reservationsApi = {
   /**
    * Get all reservations for the current user
@@ -34,6 +71,61 @@ export const reservationsApi = {
     return data;
   },
 
+  /**
+   * Check whether a table is free at the given date and time
+   */
+  checkAvailability: async (params: { restaurant: number; date: string; time: string; guests: number }): Promise<AvailabilityResponse> => {
+    const { data } = await api.post<AvailabilityResponse>('/reservations/check_availability/', params);
+    return data;
+  },
+
+  /**
+   * Get the free start times of a day
+   */
+  getSlots: async (params: { restaurant: number; date: string; guests: number }): Promise<DaySlotsResponse> => {
+    const { data } = await api.get<DaySlotsResponse>('/reservations/slots/', { params });
+    return data;
+  },
+
+  /**
+   * Get the first free slot at or after the given date and time
+   */
+  getNextAvailable: async (params: { restaurant: number; date: string; time: string; guests: number }): Promise<SlotRef | null> => {
+    const { data } = await api.get<{ next_available: SlotRef | null }>('/reservations/next_available/', { params });
+    return data.next_available;
+  },
+
+  /**
+   * Get the number of free start times for each day of a month (YYYY-MM)
+   */
+  getCalendar: async (params: { restaurant: number; month: string; guests: number }): Promise<CalendarResponse> => {
+    const { data } = await api.get<CalendarResponse>('/reservations/calendar/', { params });
+    return data;
+  },
+
+  /**
+   * Join the waitlist when no table is free
+   */
+  joinWaitlist: async (request: CreateReservationRequest): Promise<WaitlistEntry> => {
+    const { data } = await api.post<WaitlistEntry>('/reservations/waitlist/', request);
+    return data;
+  },
+
+  /**
+   * Get the current user's waitlist entries
+   */
+  getWaitlist: async (): Promise<PaginatedResponse<WaitlistEntry>> => {
+    const { data } = await api.get<PaginatedResponse<WaitlistEntry>>('/reservations/waitlist/');
+    return data;
+  },
+
+  /**
+   * Leave the waitlist
+   */
+  leaveWaitlist: async (id: number): Promise<void> => {
+    await api.post(`/reservations/waitlist/${id}/leave/`);
+  },
+
   /**
    * Cancel a reservation
    */
@@ -63,6 +63,13 @@ export interface RegisterRequest {
 export type RestaurantStatus = 'ACTIVE' | 'INACTIVE' | 'PENDING' | 'SUSPENDED';
 export type PriceRange = 1 | 2 | 3 | 4;
 
+// Live order intake of a restaurant (admission control)
+export interface RestaurantLoad {
+  orders: number;
+  capacity: number | null;
+  state: 'ACCEPTING' | 'QUEUEING' | 'FULL';
+}
+
 export interface Restaurant {
   id: number;
   owner: number;
@@ -100,6 +107,8 @@ export interface Restaurant {
   delivery_available: boolean;
   takeout_available: boolean;
   reservation_available: boolean;
+  order_capacity?: number | null;
+  load?: RestaurantLoad;
   
   business_hours?: Record<string, any>;
   created_at: string;
@@ -195,6 +204,9 @@ export interface Order {
   estimated_delivery_time?: string;
   actual_delivery_time?: string;
   
+  // Only on the response to order creation
+  admission?: RestaurantLoad & { status: 'ADMITTED' | 'QUEUED' };
+  
   created_at: string;
   updated_at: string;
 }
@@ -230,8 +242,13 @@ export interface Reservation {
   restaurant: number;
   restaurant_details?: Restaurant;
   table?: number;
+  joined_tables?: number[];
   reservation_date: string;
   reservation_time: string;
+  reservation_at?: string;
+  ends_at?: string;
+  reminder_at?: string | null;
+  reminder_sent_at?: string | null;
   guest_count: number;
   status: ReservationStatus;
   special_requests?: string;
@@ -361,6 +378,7 @@ export interface Table {
   table_number: string;
   capacity: number;
   is_available: boolean;
+  combine_group?: string;
   location?: string;
   created_at: string;
   updated_at: string;